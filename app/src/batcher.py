@@ -0,0 +1,145 @@
+"""
+Micro-batching for the churn scoring service
+Concurrent single-customer requests are queued and scored together: a worker
+thread waits for the first request, collects whatever else arrives within a
+few milliseconds (up to a maximum batch size) and runs the ensemble once over
+the stacked feature vectors. Requests are encoded when submitted, so a bad
+feature value fails only its own request.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.src.predict import encode_row, predict_churn_batch
+from app.src.registry import get_model_bundle
+from services.instrumentation import LatencyHistogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Scores ``submit``-ted feature dicts in batches of up to ``max_batch`` rows,
+    waiting at most ``max_wait_ms`` after the first queued request. ``submit``
+    returns a Future resolving to (probability, prediction, model_version).
+    """
+
+    def __init__(self, max_batch: int = 64, max_wait_ms: float = 3.0, bundle_loader: Callable = get_model_bundle):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.bundle_loader = bundle_loader
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.batch_sizes = LatencyHistogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = LatencyHistogram()
+        self.batches = 0
+        self.failures = 0
+
+        self._thread = threading.Thread(target=self._run, name="churn-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features: Dict[str, Any], bundle=None) -> Future:
+        """Encode ``features`` now (ValueError for a bad value, raised here) and queue them"""
+        bundle = bundle or self.bundle_loader()
+        return self.submit_encoded(encode_row(features, bundle), bundle)
+
+    def submit_encoded(self, row: np.ndarray, bundle) -> Future:
+        """Queue a row already encoded with ``bundle`` (see predict.encode_row)"""
+        future: Future = Future()
+        self._queue.put((row, bundle, future, time.perf_counter()))
+        return future
+
+    def predict(self, features: Dict[str, Any], timeout: Optional[float] = None) -> Tuple[float, int, str]:
+        return self.submit(features).result(timeout)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    # ---------- worker ----------
+
+    def _collect(self) -> Tuple[List[Tuple], bool]:
+        """Block for one request, then drain until the batch is full or the window closes"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _score(self, batch: List[Tuple]):
+        started = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            self.batch_sizes.observe(len(batch))
+            for _, _, _, queued_at in batch:
+                self.queue_wait.observe(started - queued_at)
+
+        # rows are scored with the bundle they were encoded for; a model reload
+        # mid-window splits the batch in two
+        groups: Dict[int, List[Tuple]] = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+
+        for items in groups.values():
+            bundle = items[0][1]
+            try:
+                prob, pred = predict_churn_batch(np.vstack([row for row, _, _, _ in items]), bundle=bundle)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                if len(items) == 1:
+                    items[0][2].set_exception(e)
+                else:
+                    # find the row(s) at fault: the rest of the batch still gets scored
+                    self._score_rows(items, bundle)
+                continue
+
+            for i, (_, _, future, _) in enumerate(items):
+                future.set_result((float(prob[i]), int(pred[i]), bundle.version))
+
+    def _score_rows(self, items: List[Tuple], bundle):
+        for row, _, future, _ in items:
+            try:
+                prob, pred = predict_churn_batch(row[np.newaxis, :], bundle=bundle)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result((float(prob[0]), int(pred[0]), bundle.version))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._score(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "failures": self.failures,
+                "requests": int(self.batch_sizes.sum),
+                "mean_batch_size": self.batch_sizes.sum / self.batch_sizes.count if self.batch_sizes.count else 0.0,
+                "queue_depth": self._queue.qsize(),
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+            }
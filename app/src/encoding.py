@@ -0,0 +1,110 @@
+"""
+Categorical Encoding for ChurnGuard
+One encoder for training, evaluation and serving. Each categorical column's
+vocabulary is stored as a label -> code dict (codes are the sorted-label
+positions LabelEncoder assigned, so existing models keep their inputs) and a
+code -> label array. Whole columns are encoded with one hash factorization and
+an integer gather; unseen labels always map to ``unseen_code``.
+
+Written by 02_train_model.py as models/categorical_encoder.pkl; older model
+directories with label_encoders.pkl are converted on load.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ENCODER_FILE = "categorical_encoder.pkl"
+LEGACY_ENCODERS_FILE = "label_encoders.pkl"
+
+CATEGORICAL_COLUMNS = ["region", "customer_segment"]
+
+# unseen labels share the code of the first (alphabetical) class, which is what
+# serving has always done; training data never contains unseen labels
+UNSEEN_CODE = 0
+
+
+class CategoricalEncoder:
+    """Per-column vocabularies with vectorized encode and a single unseen-label policy"""
+
+    def __init__(self, classes: Mapping[str, Iterable[Any]], unseen_code: int = UNSEEN_CODE):
+        self.classes: Dict[str, np.ndarray] = {
+            col: np.asarray(sorted({str(label) for label in labels}), dtype=object)
+            for col, labels in classes.items()
+        }
+        self.vocabulary: Dict[str, Dict[str, int]] = {
+            col: {label: code for code, label in enumerate(labels)}
+            for col, labels in self.classes.items()
+        }
+        self.unseen_code = unseen_code
+
+    # ---------- construction ----------
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, columns: List[str] = CATEGORICAL_COLUMNS, **kwargs) -> "CategoricalEncoder":
+        return cls({col: pd.unique(df[col].astype(str)) for col in columns}, **kwargs)
+
+    @classmethod
+    def from_label_encoders(cls, encoders: Mapping[str, Any], **kwargs) -> "CategoricalEncoder":
+        """Convert a {column: fitted LabelEncoder} dict (pre-encoder model artifacts)"""
+        return cls({col: encoder.classes_ for col, encoder in encoders.items()}, **kwargs)
+
+    # ---------- encoding ----------
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.vocabulary)
+
+    def __contains__(self, col: str) -> bool:
+        return col in self.vocabulary
+
+    def n_classes(self, col: str) -> int:
+        return len(self.classes[col])
+
+    def encode(self, col: str, values) -> np.ndarray:
+        """int64 codes for a column of labels; only its distinct values touch the dict"""
+        vocabulary = self.vocabulary[col]
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+        # str() per distinct value, matching the astype(str) labels the vocabulary was built from
+        lookup = np.fromiter(
+            (vocabulary.get(str(label), self.unseen_code) for label in uniques),
+            dtype=np.int64, count=len(uniques)
+        )
+        return lookup[codes]
+
+    def encode_value(self, col: str, value: Any) -> int:
+        return self.vocabulary[col].get(str(value), self.unseen_code)
+
+    def decode(self, col: str, codes) -> np.ndarray:
+        return self.classes[col][np.asarray(codes, dtype=np.int64)]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of ``df`` with every encoder column present replaced by its codes"""
+        df = df.copy()
+        for col in self.columns:
+            if col in df.columns:
+                df[col] = self.encode(col, df[col])
+        return df
+
+    def __repr__(self) -> str:
+        sizes = ", ".join(f"{col}={len(labels)}" for col, labels in self.classes.items())
+        return f"CategoricalEncoder({sizes}, unseen_code={self.unseen_code})"
+
+
+def ensure_encoder(artifact: Any) -> CategoricalEncoder:
+    """A CategoricalEncoder from either artifact format"""
+    if isinstance(artifact, CategoricalEncoder):
+        return artifact
+    return CategoricalEncoder.from_label_encoders(artifact)
+
+
+def load_encoder(model_dir: Union[str, Path]) -> CategoricalEncoder:
+    """categorical_encoder.pkl from ``model_dir``, falling back to label_encoders.pkl"""
+    model_dir = Path(model_dir)
+    path = model_dir / ENCODER_FILE
+    if not path.exists():
+        path = model_dir / LEGACY_ENCODERS_FILE
+    return ensure_encoder(joblib.load(path))
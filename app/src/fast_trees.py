@@ -0,0 +1,296 @@
+"""
+Fast-path inference for the churn ensemble
+Flattens the XGBoost and LightGBM boosters into plain NumPy arrays and scores
+rows with vectorized tree traversal, bypassing the library wrappers
+"""
+
+import json
+import re
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+# missing-value handling per split node
+MISSING_NONE = 0   # NaN is treated as 0.0
+MISSING_ZERO = 1   # 0.0 (and NaN) follow the default direction
+MISSING_NAN = 2    # NaN follows the default direction
+
+_LGB_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+
+@dataclass
+class FlatForest:
+    """
+    All trees of one booster in flat node arrays.
+
+    Node ``i`` splits on ``feature[i]`` at ``threshold[i]``; rows go to ``left[i]``
+    when the comparison holds (``x < t`` for XGBoost, ``x <= t`` for LightGBM).
+    Leaves point to themselves, so extra traversal steps are no-ops.
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    default_left: np.ndarray
+    missing_type: np.ndarray
+    is_leaf: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    strict_less: bool
+    base_margin: float = 0.0
+    sigmoid_scale: float = 1.0
+    average_output: bool = False
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw score (log-odds) for each row of X"""
+        X = X.astype(self.threshold.dtype, copy=False)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            active = ~self.is_leaf[nodes]
+            if not active.any():
+                break
+
+            x = X[rows, self.feature[nodes]]
+            missing_type = self.missing_type[nodes]
+            is_nan = np.isnan(x)
+
+            x = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, x)
+            is_missing = (
+                ((missing_type == MISSING_NAN) & is_nan) |
+                ((missing_type == MISSING_ZERO) & (np.abs(x) <= _ZERO_THRESHOLD))
+            )
+
+            threshold = self.threshold[nodes]
+            with np.errstate(invalid="ignore"):
+                go_left = x < threshold if self.strict_less else x <= threshold
+            go_left = np.where(is_missing, self.default_left[nodes], go_left)
+
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        margin = self.value[nodes].sum(axis=1, dtype=np.float64)
+        if self.average_output:
+            margin /= self.n_trees
+        return margin + self.base_margin
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability for each row of X"""
+        return 1.0 / (1.0 + np.exp(-self.sigmoid_scale * self.predict_margin(X)))
+
+
+class _ForestBuilder:
+    """Accumulates nodes from many trees into one set of flat arrays"""
+
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.default_left, self.missing_type, self.is_leaf, self.value = [], [], [], []
+        self.roots = []
+        self.max_depth = 0
+
+    def add_node(self, feature=0, threshold=0.0, default_left=False, missing_type=MISSING_NAN,
+                 is_leaf=False, value=0.0) -> int:
+        index = len(self.feature)
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.left.append(index)
+        self.right.append(index)
+        self.default_left.append(default_left)
+        self.missing_type.append(missing_type)
+        self.is_leaf.append(is_leaf)
+        self.value.append(value)
+        return index
+
+    def build(self, threshold_dtype, strict_less, **kwargs) -> FlatForest:
+        return FlatForest(
+            feature=np.asarray(self.feature, dtype=np.int32),
+            threshold=np.asarray(self.threshold, dtype=threshold_dtype),
+            left=np.asarray(self.left, dtype=np.int32),
+            right=np.asarray(self.right, dtype=np.int32),
+            default_left=np.asarray(self.default_left, dtype=bool),
+            missing_type=np.asarray(self.missing_type, dtype=np.int8),
+            is_leaf=np.asarray(self.is_leaf, dtype=bool),
+            value=np.asarray(self.value, dtype=np.float64),
+            roots=np.asarray(self.roots, dtype=np.int32),
+            max_depth=self.max_depth,
+            strict_less=strict_less,
+            **kwargs
+        )
+
+
+# ======================================================
+# XGBOOST EXPORT
+# ======================================================
+def _parse_base_score(raw: str) -> float:
+    # "0.5" in older releases, "[5E-1]" (vector intercept) in XGBoost >= 3
+    return float(re.findall(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?", raw)[0])
+
+
+def flatten_xgboost(model) -> FlatForest:
+    """Export an XGBClassifier / Booster with a binary:logistic objective"""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective not in ("binary:logistic", "reg:logistic"):
+        raise NotImplementedError(f"Unsupported XGBoost objective: {objective}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise NotImplementedError(f"Unsupported XGBoost booster: {learner['gradient_booster']['name']}")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        trees = trees[:int(best_iteration) + 1]
+
+    builder = _ForestBuilder()
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise NotImplementedError("Categorical XGBoost splits are not supported by the fast path")
+
+        offset = len(builder.feature)
+        left_children = tree["left_children"]
+        depth = {0: 0}
+        for node, left in enumerate(left_children):
+            is_leaf = left == -1
+            index = builder.add_node(
+                feature=tree["split_indices"][node],
+                threshold=tree["split_conditions"][node],
+                default_left=bool(tree["default_left"][node]),
+                missing_type=MISSING_NAN,
+                is_leaf=is_leaf,
+                value=tree["split_conditions"][node] if is_leaf else 0.0,
+            )
+            if not is_leaf:
+                builder.left[index] = offset + left
+                builder.right[index] = offset + tree["right_children"][node]
+                depth[left] = depth[tree["right_children"][node]] = depth[node] + 1
+        builder.roots.append(offset)
+        builder.max_depth = max(builder.max_depth, max(depth.values()))
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    return builder.build(
+        threshold_dtype=np.float32,
+        strict_less=True,
+        base_margin=float(np.log(base_score / (1.0 - base_score))),
+    )
+
+
+# ======================================================
+# LIGHTGBM EXPORT
+# ======================================================
+def flatten_lightgbm(model) -> FlatForest:
+    """Export an LGBMClassifier / Booster with a binary objective"""
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+
+    objective = dump["objective"].split()
+    if objective[0] != "binary" or dump["num_tree_per_iteration"] != 1:
+        raise NotImplementedError(f"Unsupported LightGBM objective: {dump['objective']}")
+    sigmoid_scale = 1.0
+    for token in objective[1:]:
+        if token.startswith("sigmoid:"):
+            sigmoid_scale = float(token.split(":", 1)[1])
+
+    builder = _ForestBuilder()
+
+    def add_subtree(node, depth):
+        builder.max_depth = max(builder.max_depth, depth)
+        if "leaf_value" in node:
+            return builder.add_node(is_leaf=True, value=node["leaf_value"])
+        if node["decision_type"] != "<=":
+            raise NotImplementedError("Categorical LightGBM splits are not supported by the fast path")
+
+        index = builder.add_node(
+            feature=node["split_feature"],
+            threshold=node["threshold"],
+            default_left=node["default_left"],
+            missing_type=_LGB_MISSING_TYPES[node["missing_type"]],
+        )
+        builder.left[index] = add_subtree(node["left_child"], depth + 1)
+        builder.right[index] = add_subtree(node["right_child"], depth + 1)
+        return index
+
+    for tree in dump["tree_info"]:
+        builder.roots.append(add_subtree(tree["tree_structure"], 0))
+
+    return builder.build(
+        threshold_dtype=np.float64,
+        strict_less=False,
+        sigmoid_scale=sigmoid_scale,
+        average_output=bool(dump.get("average_output")),
+    )
+
+
+# ======================================================
+# COMPILED ENSEMBLE
+# ======================================================
+@dataclass
+class CompiledEnsemble:
+    """XGBoost + LightGBM + scaled logistic regression evaluated with NumPy only"""
+
+    xgb: FlatForest
+    lgb: FlatForest
+    lr_coef: np.ndarray
+    lr_intercept: float
+    scaler_mean: np.ndarray
+    scaler_scale: np.ndarray
+    weights: Sequence[float]
+
+    def predict_components(self, X: np.ndarray):
+        """(xgb_prob, lgb_prob, lr_prob) for a float matrix in the model's feature order"""
+        X = np.asarray(X, dtype=np.float64)
+        scaled = (X - self.scaler_mean) / self.scaler_scale
+        lr_margin = scaled @ self.lr_coef + self.lr_intercept
+        return (
+            self.xgb.predict_proba(X),
+            self.lgb.predict_proba(X),
+            1.0 / (1.0 + np.exp(-lr_margin)),
+        )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        xgb_prob, lgb_prob, lr_prob = self.predict_components(X)
+        w_xgb, w_lgb, w_lr = self.weights
+        return w_xgb * xgb_prob + w_lgb * lgb_prob + w_lr * lr_prob
+
+
+DEFAULT_WEIGHTS = (0.4, 0.4, 0.2)
+
+
+def compile_ensemble(bundle, weights: Sequence[float] = DEFAULT_WEIGHTS) -> CompiledEnsemble:
+    """Build a CompiledEnsemble from a registry ModelBundle"""
+    scaler = bundle.scaler
+    n_features = len(bundle.feature_names)
+    mean = scaler.mean_ if getattr(scaler, "with_mean", True) else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "with_std", True) else np.ones(n_features)
+
+    return CompiledEnsemble(
+        xgb=flatten_xgboost(bundle.xgb),
+        lgb=flatten_lightgbm(bundle.lgb),
+        lr_coef=np.asarray(bundle.lr.coef_, dtype=np.float64).ravel(),
+        lr_intercept=float(np.ravel(bundle.lr.intercept_)[0]),
+        scaler_mean=np.asarray(mean, dtype=np.float64),
+        scaler_scale=np.asarray(scale, dtype=np.float64),
+        weights=tuple(weights),
+    )
+
+
+def get_compiled_ensemble(bundle, weights: Optional[Sequence[float]] = None) -> CompiledEnsemble:
+    """
+    Compile the bundle once and keep the result on it. Other ``weights`` get a
+    copy sharing the flattened trees, so they never change what later callers
+    with the default weights receive.
+    """
+    if bundle.compiled is None:
+        bundle.compiled = compile_ensemble(bundle, DEFAULT_WEIGHTS)
+    weights = tuple(weights) if weights is not None else DEFAULT_WEIGHTS
+    if weights == tuple(bundle.compiled.weights):
+        return bundle.compiled
+    return replace(bundle.compiled, weights=weights)
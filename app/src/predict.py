@@ -1,74 +1,192 @@
-from pathlib import Path
+import os
+import numpy as np
 import pandas as pd
-import joblib
+
+from app.src.fast_trees import get_compiled_ensemble
+from app.src.prediction_cache import get_prediction_cache, vector_key
+from app.src.registry import get_model_bundle
 
 # ======================================================
-# PATHS (FIXED)
+# MODELS
 # ======================================================
-MODEL_DIR = Path(__file__).parent / "models"
+# Loaded lazily on the first prediction and shared by the whole process,
+# so importing this module (e.g. from main.py) costs nothing.
+
+# Optional NumPy tree-traversal engine for single rows / small batches
+# (see app/src/fast_trees.py and src/ml/06_verify_fast_path.py)
+FAST_PATH = os.getenv("CHURN_FAST_PATH", "0") == "1"
+FAST_PATH_MAX_ROWS = int(os.getenv("CHURN_FAST_PATH_MAX_ROWS", "16"))
+
+
+def _to_frame(batch, feature_names):
+    if isinstance(batch, pd.DataFrame):
+        return batch
+    if isinstance(batch, np.ndarray):
+        if batch.ndim != 2 or batch.shape[1] != len(feature_names):
+            raise ValueError(
+                f"Expected a 2-D matrix with {len(feature_names)} columns "
+                f"({', '.join(feature_names)}), got shape {batch.shape}"
+            )
+        return pd.DataFrame(batch, columns=feature_names, copy=False)
+    if hasattr(batch, "to_pandas"):
+        # pyarrow.Table / RecordBatch
+        return batch.to_pandas()
+    raise TypeError(f"Unsupported batch type: {type(batch).__name__}")
+
+
+def build_feature_matrix(batch, bundle=None, out=None):
+    """
+    Encode and align a batch into a float64 frame in the model's feature order.
+
+    Categorical columns are encoded with the bundle's CategoricalEncoder, except in numeric
+    NumPy matrices where they are taken to be encoded already. Missing feature
+    columns and missing values are filled with 0 (as training's fillna(0)),
+    extra columns are ignored; infinite values raise ValueError.
+    `out` is an optional (N x n_features) float64 array to encode into, e.g. a
+    shared-memory block (app/src/scoring_pool.py); the frame is a view of it.
+    """
+    bundle = bundle or get_model_bundle()
+    feature_names = bundle.feature_names
 
+    df = _to_frame(batch, feature_names)
+    pre_encoded = isinstance(batch, np.ndarray) and batch.dtype != object
+
+    if out is None:
+        X = np.zeros((len(df), len(feature_names)), dtype=np.float64)
+    else:
+        X = out
+        X[:] = 0
+    for i, col in enumerate(feature_names):
+        if col not in df.columns:
+            continue
+        if col in bundle.encoder and not pre_encoded:
+            X[:, i] = bundle.encoder.encode(col, df[col])
+        else:
+            try:
+                X[:, i] = df[col].to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError(f"{col}: expected numeric values") from None
+
+    finite = np.isfinite(X)
+    if not finite.all():
+        infinite = np.isinf(X).any(axis=0)
+        if infinite.any():
+            raise ValueError(f"{feature_names[int(np.argmax(infinite))]}: expected finite values")
+        X[~finite] = 0
+
+    return pd.DataFrame(X, columns=feature_names, copy=False)
+
+
+def encode_row(features: dict, bundle=None):
+    """
+    One customer's dict as a float64 vector, identical to the matching row of
+    build_feature_matrix but without building a DataFrame
+    """
+    bundle = bundle or get_model_bundle()
+    encoder = bundle.encoder
+
+    row = np.zeros(len(bundle.feature_names), dtype=np.float64)
+    for i, col in enumerate(bundle.feature_names):
+        if col not in features:
+            continue
+        value = features[col]
+        if col in encoder:
+            row[i] = encoder.encode_value(col, value)
+        else:
+            try:
+                number = 0.0 if value is None else float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{col}: expected a number, got {value!r}") from None
+            if np.isinf(number):
+                raise ValueError(f"{col}: expected a finite number, got {value!r}")
+            # missing -> 0, as training's fillna(0)
+            row[i] = 0.0 if np.isnan(number) else number
+    return row
 
 
 # ======================================================
-# LOAD MODELS
+# BATCH PREDICTION
 # ======================================================
-xgb = joblib.load(MODEL_DIR / "xgb_model.pkl")
-lgb = joblib.load(MODEL_DIR / "lgb_model.pkl")
-lr = joblib.load(MODEL_DIR / "lr_model.pkl")
+def predict_churn_batch(batch, fast_path=None, bundle=None):
+    """
+    Score N customers at once.
+
+    `batch` is a DataFrame, a pyarrow Table or an (N x n_features) NumPy
+    matrix in the model's feature order. Each model runs once over the whole batch.
+    `fast_path` forces the compiled NumPy engine on/off; by default it is used for
+    batches of up to FAST_PATH_MAX_ROWS rows when CHURN_FAST_PATH=1.
+    `bundle` overrides the process-wide model bundle (e.g. another model dir).
+
+    Returns (probabilities, predictions) as NumPy arrays of length N.
+    """
+    bundle = bundle or get_model_bundle()
+    X = build_feature_matrix(batch, bundle)
+
+    if fast_path is None:
+        fast_path = FAST_PATH and len(X) <= FAST_PATH_MAX_ROWS
+
+    if fast_path:
+        prob = get_compiled_ensemble(bundle).predict_proba(X.to_numpy())
+    else:
+        # scale for LR only
+        scaled = bundle.scaler.transform(X)
+
+        xgb_prob = bundle.xgb.predict_proba(X)[:, 1]
+        lgb_prob = bundle.lgb.predict_proba(X)[:, 1]
+        lr_prob = bundle.lr.predict_proba(scaled)[:, 1]
+
+        # ensemble (same weights as training)
+        prob = (
+            0.4 * xgb_prob +
+            0.4 * lgb_prob +
+            0.2 * lr_prob
+        )
+
+    pred = (prob >= bundle.threshold).astype(int)
+
+    return prob, pred
 
-scaler = joblib.load(MODEL_DIR / "scaler.pkl")
-encoders = joblib.load(MODEL_DIR / "label_encoders.pkl")
-threshold = joblib.load(MODEL_DIR / "threshold.pkl")
-EXPECTED_FEATURES = joblib.load(MODEL_DIR / "feature_names.pkl")
 
 # ======================================================
-# PREDICTION FUNCTION
+# RISK BANDS
 # ======================================================
-def predict_churn(features: dict):
-
-    df = pd.DataFrame([features])
-
-    # -----------------------------
-    # ENCODE CATEGORICALS
-    # -----------------------------
-    for col, encoder in encoders.items():
-        if col in df.columns:
-            df[col] = df[col].astype(str)
-            df[col] = df[col].apply(
-                lambda x: x if x in encoder.classes_ else encoder.classes_[0]
-            )
-            df[col] = encoder.transform(df[col])
+# Same cut-offs as the dashboard's single-customer prediction
+HIGH_RISK = 0.7
+MEDIUM_RISK = 0.4
 
-    # -----------------------------
-    # ALIGN FEATURES
-    # -----------------------------
-    for col in EXPECTED_FEATURES:
-        if col not in df.columns:
-            df[col] = 0
 
-    df = df[EXPECTED_FEATURES]
+def risk_band(prob):
+    """HIGH / MEDIUM / LOW for a probability or an array of them"""
+    prob = np.asarray(prob, dtype=np.float64)
+    bands = np.select([prob > HIGH_RISK, prob > MEDIUM_RISK], ["HIGH", "MEDIUM"], default="LOW")
+    return bands if bands.ndim else str(bands)
+
 
-    # -----------------------------
-    # SCALE FOR LR ONLY
-    # -----------------------------
-    scaled = scaler.transform(df)
+# ======================================================
+# PREDICTION FUNCTION
+# ======================================================
+def predict_churn(features: dict, use_cache: bool = True):
+    """
+    Score one customer. Results are memoized per encoded feature vector and model
+    version (app/src/prediction_cache.py), so unchanged inputs skip the ensemble.
+    """
+    bundle = get_model_bundle()
+    cache = get_prediction_cache()
 
-    # -----------------------------
-    # GET PROBABILITIES
-    # -----------------------------
-    xgb_prob = xgb.predict_proba(df)[0][1]
-    lgb_prob = lgb.predict_proba(df)[0][1]
-    lr_prob = lr.predict_proba(scaled)[0][1]
+    # encoded + aligned: key order, extra keys and unseen labels don't split entries
+    X = encode_row(features, bundle)[np.newaxis, :]
 
-    # -----------------------------
-    # ENSEMBLE (same weights as training)
-    # -----------------------------
-    prob = (
-        0.4 * xgb_prob +
-        0.4 * lgb_prob +
-        0.2 * lr_prob
-    )
+    key = None
+    if use_cache and cache.enabled:
+        cache.track_version(bundle.version)
+        key = vector_key(bundle.version, X[0])
+        hit, result = cache.get(key)
+        if hit:
+            return result
 
-    pred = int(prob >= threshold)
+    prob, pred = predict_churn_batch(X, bundle=bundle)
+    result = (prob[0], int(pred[0]))
 
-    return prob, pred
+    if key is not None:
+        cache.set(key, result)
+    return result
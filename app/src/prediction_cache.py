@@ -0,0 +1,97 @@
+"""
+Prediction Cache for ChurnGuard
+Bounded LRU + TTL memo of single-customer predictions, keyed by the encoded
+feature vector (so equivalent inputs share an entry) and the model version
+(so replaced artifacts never serve stale scores)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+PREDICTION_CACHE_SIZE = int(os.getenv("CHURN_PREDICTION_CACHE_SIZE", "4096"))  # 0 disables
+PREDICTION_CACHE_TTL = float(os.getenv("CHURN_PREDICTION_CACHE_TTL", "3600"))
+
+
+def vector_key(version: str, row: np.ndarray) -> str:
+    """Key for one encoded float64 feature row under model ``version``"""
+    # +0.0 folds -0.0 into 0.0 so both hash alike
+    canonical = np.ascontiguousarray(row, dtype=np.float64) + 0.0
+    digest = hashlib.blake2b(canonical.tobytes(), digest_size=16)
+    digest.update(version.encode())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return True, value
+                del self._entries[key]
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return False, None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def track_version(self, version: str):
+        """Drop every entry when the model version changes (their keys can no longer hit)"""
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._entries.clear()
+                    self._counters["invalidations"] += 1
+                self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+            stats["model_version"] = self._version
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_prediction_cache = PredictionCache()
+
+
+def get_prediction_cache() -> PredictionCache:
+    return _prediction_cache
@@ -0,0 +1,180 @@
+"""
+Model Registry for ChurnGuard
+Loads the churn ensemble lazily, once per process, from the bundle artifact,
+and reloads it when the artifacts on disk change
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+
+from app.src.encoding import LEGACY_ENCODERS_FILE, CategoricalEncoder, ensure_encoder
+
+MODEL_DIR = Path(__file__).parent / "models"
+BUNDLE_FILE = "churn_ensemble_bundle.pkl"
+
+# How often get_model_bundle stats the artifacts for changes (0 = every call)
+MODEL_CHECK_INTERVAL = float(os.getenv("CHURN_MODEL_CHECK_INTERVAL", "5"))
+
+# Individual artifacts written by 02_train_model.py (used when no bundle exists);
+# model dirs from before the CategoricalEncoder have label_encoders.pkl instead
+ARTIFACT_FILES = {
+    "xgb": "xgb_model.pkl",
+    "lgb": "lgb_model.pkl",
+    "lr": "lr_model.pkl",
+    "scaler": "scaler.pkl",
+    "encoder": "categorical_encoder.pkl",
+    "threshold": "threshold.pkl",
+    "feature_names": "feature_names.pkl",
+}
+
+
+@dataclass
+class ModelBundle:
+    """Everything predict.py needs to score customers"""
+
+    xgb: Any
+    lgb: Any
+    lr: Any
+    scaler: Any
+    encoder: CategoricalEncoder
+    threshold: float
+    feature_names: List[str]
+    source: str
+    load_times: Dict[str, float] = field(default_factory=dict)
+    compiled: Any = None  # fast-path CompiledEnsemble, built on demand by fast_trees
+    version: str = ""  # content fingerprint of the loaded artifacts
+
+    @property
+    def load_time(self) -> float:
+        return sum(self.load_times.values())
+
+
+def _load(path: Path, mmap: bool):
+    # mmap_mode maps the numpy arrays inside uncompressed pickles read-only
+    # instead of copying them onto the heap
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def artifact_fingerprint(paths) -> str:
+    """Short SHA-256 over the artifact files' names and bytes, used as the model version"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        digest.update(path.name.encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def artifact_signature(model_dir: Union[str, Path]) -> Tuple:
+    """(name, mtime, size) of every artifact present: cheap change detection, no reads"""
+    model_dir = Path(model_dir)
+    signature = []
+    for filename in (BUNDLE_FILE, *ARTIFACT_FILES.values(), LEGACY_ENCODERS_FILE):
+        try:
+            stat = (model_dir / filename).stat()
+        except FileNotFoundError:
+            continue
+        signature.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def load_model_bundle(model_dir: Union[str, Path] = MODEL_DIR, mmap: bool = True) -> ModelBundle:
+    """
+    Load the ensemble from ``model_dir``, preferring churn_ensemble_bundle.pkl and
+    falling back to the individual artifacts. Per-artifact load times are recorded.
+    """
+    model_dir = Path(model_dir)
+    bundle_path = model_dir / BUNDLE_FILE
+    load_times = {}
+    loaded_paths = []
+
+    if bundle_path.exists():
+        started = time.perf_counter()
+        artifacts = dict(_load(bundle_path, mmap))
+        load_times["bundle"] = time.perf_counter() - started
+        source = str(bundle_path)
+        loaded_paths.append(bundle_path)
+        if "encoders" in artifacts:
+            # bundles saved before the CategoricalEncoder hold LabelEncoders
+            artifacts["encoder"] = artifacts.pop("encoders")
+    else:
+        artifacts = {}
+        source = str(model_dir)
+
+    for name, filename in ARTIFACT_FILES.items():
+        if name in artifacts:
+            continue
+        path = model_dir / filename
+        if name == "encoder" and not path.exists():
+            path = model_dir / LEGACY_ENCODERS_FILE
+        started = time.perf_counter()
+        artifacts[name] = _load(path, mmap)
+        load_times[name] = time.perf_counter() - started
+        loaded_paths.append(path)
+
+    bundle = ModelBundle(
+        xgb=artifacts["xgb"],
+        lgb=artifacts["lgb"],
+        lr=artifacts["lr"],
+        scaler=artifacts["scaler"],
+        encoder=ensure_encoder(artifacts["encoder"]),
+        threshold=float(artifacts["threshold"]),
+        feature_names=list(artifacts["feature_names"]),
+        source=source,
+        load_times=load_times,
+        version=artifact_fingerprint(loaded_paths),
+    )
+
+    print(f"✓ Churn ensemble {bundle.version} loaded from {source} in {bundle.load_time:.3f}s")
+    return bundle
+
+
+# ==================== PROCESS-WIDE SINGLETON ====================
+
+_bundles: Dict[Path, ModelBundle] = {}
+_signatures: Dict[Path, Tuple[Tuple, float]] = {}  # artifact signature at load, last check time
+_bundles_lock = threading.Lock()
+
+
+def _is_current(key: Path) -> bool:
+    signature, checked_at = _signatures.get(key, ((), 0.0))
+    now = time.monotonic()
+    if now - checked_at < MODEL_CHECK_INTERVAL:
+        return True
+    current = artifact_signature(key)
+    _signatures[key] = (signature, now)
+    return current == signature
+
+
+def get_model_bundle(model_dir: Optional[Union[str, Path]] = None) -> ModelBundle:
+    """
+    Return the process-wide bundle for ``model_dir``, loading it on first use and
+    again when the artifacts were replaced (checked every MODEL_CHECK_INTERVAL seconds)
+    """
+    key = Path(model_dir or MODEL_DIR).resolve()
+
+    bundle = _bundles.get(key)
+    if bundle is None or not _is_current(key):
+        with _bundles_lock:
+            bundle = _bundles.get(key)
+            signature = artifact_signature(key)
+            if bundle is None or _signatures.get(key, ((),))[0] != signature:
+                bundle = load_model_bundle(key)
+                _bundles[key] = bundle
+                _signatures[key] = (signature, time.monotonic())
+    return bundle
+
+
+def clear_model_cache():
+    """Forget loaded bundles so the next prediction reloads the artifacts"""
+    with _bundles_lock:
+        _bundles.clear()
+        _signatures.clear()
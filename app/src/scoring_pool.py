@@ -0,0 +1,236 @@
+"""
+Process Scoring Pool for ChurnGuard
+Bulk scoring across worker processes. Workers are forked after the model
+bundle is loaded, so every process reads the same model pages copy-on-write
+instead of unpickling its own ensemble. Encoded feature chunks and the
+returned probabilities travel through shared-memory slots; only
+(slot, row count) tuples go through the queues.
+
+    bundle = load_model_bundle()
+    with ProcessScoringPool(bundle, workers=8) as pool:
+        for chunk, prob in pool.map(chunks):
+            ...
+
+Requires the ``fork`` start method (Linux, macOS); see ``fork_available``.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.src.predict import build_feature_matrix, predict_churn_batch
+
+SLOT_ROWS = int(os.getenv("CHURN_POOL_SLOT_ROWS", "50000"))
+WORKER_POLL_SECONDS = 1.0
+
+
+def fork_available() -> bool:
+    return "fork" in mp.get_all_start_methods()
+
+
+class _Slot:
+    """One in-flight chunk: a features block and a probabilities block in shared memory"""
+
+    def __init__(self, rows: int, n_features: int):
+        self.rows = rows
+        self.n_features = n_features
+        self._features = shared_memory.SharedMemory(create=True, size=max(1, rows * n_features * 8))
+        self._prob = shared_memory.SharedMemory(create=True, size=max(1, rows * 8))
+
+    def features(self, n: int) -> np.ndarray:
+        return np.ndarray((self.rows, self.n_features), dtype=np.float64, buffer=self._features.buf)[:n]
+
+    def probabilities(self, n: int) -> np.ndarray:
+        return np.ndarray((self.rows,), dtype=np.float64, buffer=self._prob.buf)[:n]
+
+    def release(self):
+        # unlink first: the segment is freed even if a view still pins the mapping
+        for block in (self._features, self._prob):
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                block.close()
+            except BufferError:
+                # a view of the block is still referenced (e.g. by a propagating
+                # exception); the mapping is dropped with that view
+                pass
+
+
+def _limit_threads(bundle, threads: int):
+    # one OpenMP pool per worker sized to its share of the cores, not one per core each
+    for model in (bundle.xgb, bundle.lgb):
+        if hasattr(model, "set_params"):
+            model.set_params(n_jobs=threads)
+
+
+def _worker(bundle, slots: List[_Slot], tasks, results, threads: int):
+    """Worker loop; inherits ``bundle`` and the slot mappings from the parent by fork"""
+    _limit_threads(bundle, threads)
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        slot, n = task
+        try:
+            prob, _ = predict_churn_batch(slots[slot].features(n), fast_path=False, bundle=bundle)
+            slots[slot].probabilities(n)[:] = prob
+            results.put((slot, None))
+        except Exception as e:
+            results.put((slot, f"{type(e).__name__}: {e}"))
+
+
+class ProcessScoringPool:
+    """
+    ``workers`` forked scoring processes sharing ``bundle``. ``map`` keeps
+    2 x workers chunks in flight and yields results in input order.
+    """
+
+    def __init__(self, bundle, workers: Optional[int] = None, slot_rows: int = SLOT_ROWS):
+        if not fork_available():
+            raise RuntimeError("ProcessScoringPool needs the 'fork' start method")
+
+        self.bundle = bundle
+        self.workers = workers or os.cpu_count() or 1
+        self.slot_rows = slot_rows
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        n_features = len(bundle.feature_names)
+        self._slots = [_Slot(slot_rows, n_features) for _ in range(2 * self.workers)]
+
+        ctx = mp.get_context("fork")
+        self._tasks = ctx.SimpleQueue()
+        self._results = ctx.Queue()
+        self._processes = [
+            ctx.Process(target=_worker, args=(bundle, self._slots, self._tasks, self._results, threads),
+                        name=f"churn-score-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._processes:
+            return
+        try:
+            for _ in self._processes:
+                self._tasks.put(None)
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        finally:
+            self._processes = []
+            for slot in self._slots:
+                slot.release()
+
+    def _wait(self, slot: int, done: set):
+        """Block until ``slot`` has been scored, failing fast if a worker died"""
+        while slot not in done:
+            try:
+                finished, error = self._results.get(timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Scoring worker(s) exited unexpectedly: {', '.join(dead)}")
+                continue
+            if error is not None:
+                raise RuntimeError(f"Scoring worker failed: {error}")
+            done.add(finished)
+        done.discard(slot)
+
+    def map(self, chunks: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+        """
+        Yield (chunk, probabilities) per chunk of at most ``slot_rows`` rows
+        (larger chunks are split). The probabilities are copied out of the
+        slot (8 bytes a row) so no caller reference can outlive the shared
+        block, which the pool frees on close.
+        """
+        free = deque(range(len(self._slots)))
+        in_flight = deque()
+        done: set = set()
+
+        def pieces():
+            for chunk in chunks:
+                for start in range(0, len(chunk), self.slot_rows):
+                    yield chunk.iloc[start:start + self.slot_rows]
+
+        def head():
+            piece, slot = in_flight.popleft()
+            self._wait(slot, done)
+            return piece, slot
+
+        for piece in pieces():
+            if not free:
+                done_piece, slot = head()
+                yield done_piece, self._slots[slot].probabilities(len(done_piece)).copy()
+                free.append(slot)
+
+            slot = free.popleft()
+            build_feature_matrix(piece, self.bundle, out=self._slots[slot].features(len(piece)))
+            self._tasks.put((slot, len(piece)))
+            in_flight.append((piece, slot))
+
+        while in_flight:
+            done_piece, slot = head()
+            yield done_piece, self._slots[slot].probabilities(len(done_piece)).copy()
+            free.append(slot)
+
+    def predict(self, chunks: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+        """Like ``map`` but yields (chunk, probabilities, predictions)"""
+        for chunk, prob in self.map(chunks):
+            yield chunk, prob, (prob >= self.bundle.threshold).astype(int)
+
+
+# ======================================================
+# SCALING CHECK
+# ======================================================
+if __name__ == "__main__":
+    import argparse
+
+    from app.src.registry import MODEL_DIR, load_model_bundle
+    from src.ml.dataset import load_training_frame
+
+    parser = argparse.ArgumentParser(description="Score the training dataset with 1..N worker processes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--rows", type=int, default=200_000, help="rows to score (the dataset is tiled)")
+    parser.add_argument("--slot-rows", type=int, default=10_000)
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    args = parser.parse_args()
+
+    bundle = load_model_bundle(args.model_dir)
+    base = load_training_frame()
+    df = pd.concat([base] * -(-args.rows // len(base)), ignore_index=True).head(args.rows)
+    chunks = [df.iloc[i:i + args.slot_rows] for i in range(0, len(df), args.slot_rows)]
+
+    # forked before this process runs any prediction (OpenMP state must not be inherited)
+    results = {}
+    for workers in sorted(set(args.workers)):
+        with ProcessScoringPool(bundle, workers=workers, slot_rows=args.slot_rows) as pool:
+            start = time.perf_counter()
+            prob = np.concatenate([p for _, p in pool.map(chunks)])
+            elapsed = time.perf_counter() - start
+        results[workers] = (elapsed, prob)
+
+    reference, _ = predict_churn_batch(df.head(args.slot_rows), fast_path=False, bundle=bundle)
+    single = results[min(results)][0]
+
+    print(f"{len(df):,} rows · {os.cpu_count()} CPUs")
+    for workers, (elapsed, prob) in results.items():
+        match = np.allclose(prob[:len(reference)], reference)
+        print(f"  {workers:>3} workers  {elapsed:7.2f}s  {len(df) / elapsed:>10,.0f} rows/s  "
+              f"speed-up {single / elapsed:4.2f}x  {'✓' if match else '❌'} matches predict_churn_batch")
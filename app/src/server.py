@@ -0,0 +1,212 @@
+"""
+Churn Scoring Service for ChurnGuard
+Standalone HTTP API around the churn ensemble. The bundle is loaded once at
+startup; concurrent /predict calls are micro-batched (app/src/batcher.py) so
+each model runs one vectorized predict_proba per batch.
+
+    python -m app.src.server --port 8080
+    gunicorn -w 1 --threads 32 -b 0.0.0.0:8080 "app.src.server:create_app()"
+
+Endpoints:
+    POST /predict         one customer's features -> probability, prediction, risk level
+    POST /predict/batch   {"customers": [...]} -> one result per customer
+    GET  /health          model version and batcher state
+    GET  /metrics         Prometheus text: request latency, batch sizes, queue wait
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from flask import Flask, Response, g, jsonify, request
+from flask_cors import CORS
+
+from app.src.batcher import MicroBatcher
+from app.src.prediction_cache import get_prediction_cache, vector_key
+from app.src.predict import build_feature_matrix, encode_row, predict_churn_batch, risk_band
+from app.src.registry import get_model_bundle
+from services.instrumentation import LatencyHistogram
+
+MAX_BATCH_ROWS = int(os.getenv("SCORING_MAX_BATCH_ROWS", "10000"))
+MICRO_BATCH_SIZE = int(os.getenv("SCORING_MICRO_BATCH_SIZE", "64"))
+MICRO_BATCH_WAIT_MS = float(os.getenv("SCORING_MICRO_BATCH_WAIT_MS", "3"))
+REQUEST_TIMEOUT = float(os.getenv("SCORING_REQUEST_TIMEOUT", "10"))
+
+
+class RequestMetrics:
+    """Latency histogram and status counts per endpoint"""
+
+    def __init__(self):
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._status: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, status: int, seconds: float):
+        with self._lock:
+            self._latency.setdefault(endpoint, LatencyHistogram()).observe(seconds)
+            self._status[(endpoint, status)] = self._status.get((endpoint, status), 0) + 1
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP churnguard_scoring_request_duration_seconds Request latency by endpoint",
+            "# TYPE churnguard_scoring_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for endpoint, histogram in sorted(self._latency.items()):
+                label = f'endpoint="{endpoint}"'
+                for bound, running in histogram.cumulative():
+                    lines.append(f'churnguard_scoring_request_duration_seconds_bucket{{{label},le="{bound}"}} {running}')
+                lines.append(f"churnguard_scoring_request_duration_seconds_sum{{{label}}} {histogram.sum:.6f}")
+                lines.append(f"churnguard_scoring_request_duration_seconds_count{{{label}}} {histogram.count}")
+            lines.append("# TYPE churnguard_scoring_requests_total counter")
+            for (endpoint, status), count in sorted(self._status.items()):
+                lines.append(f'churnguard_scoring_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        return lines
+
+
+def _histogram_lines(name: str, help_text: str, histogram: LatencyHistogram) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for bound, running in histogram.cumulative():
+        lines.append(f'{name}_bucket{{le="{bound}"}} {running}')
+    lines.append(f"{name}_sum {histogram.sum:.6f}")
+    lines.append(f"{name}_count {histogram.count}")
+    return lines
+
+
+def _result(prob: float, pred: int, version: str) -> Dict[str, Any]:
+    # same response shape as src/ml/05_predict_api_ready.py
+    return {
+        "churn_probability": round(float(prob), 4),
+        "prediction": int(pred),
+        "risk_level": risk_band(prob),
+        "model_version": version,
+    }
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+    CORS(app)
+
+    bundle = get_model_bundle()  # fail fast on missing artifacts
+    batcher = MicroBatcher(max_batch=MICRO_BATCH_SIZE, max_wait_ms=MICRO_BATCH_WAIT_MS)
+    cache = get_prediction_cache()
+    metrics = RequestMetrics()
+    app.extensions["churn_batcher"] = batcher
+
+    @app.before_request
+    def start_timer():
+        g.started = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        if request.endpoint not in (None, "metrics_endpoint"):
+            metrics.observe(request.endpoint, response.status_code, time.perf_counter() - g.started)
+        return response
+
+    @app.errorhandler(BadRequest)
+    def bad_request(e):
+        return jsonify({"error": str(e)}), 400
+
+    def json_body():
+        payload = request.get_json(silent=True)
+        if payload is None:
+            raise BadRequest("Expected a JSON body")
+        return payload
+
+    @app.post("/predict")
+    def predict():
+        features = json_body()
+        if not isinstance(features, dict):
+            raise BadRequest("Expected a JSON object of features")
+
+        current = get_model_bundle()
+        try:
+            row = encode_row(features, current)
+        except (TypeError, ValueError) as e:
+            raise BadRequest(str(e))
+
+        key = None
+        if cache.enabled:
+            cache.track_version(current.version)
+            key = vector_key(current.version, row)
+            hit, value = cache.get(key)
+            if hit:
+                return jsonify(_result(value[0], value[1], current.version))
+
+        prob, pred, version = batcher.submit_encoded(row, current).result(REQUEST_TIMEOUT)
+        if key is not None:
+            cache.set(key, (prob, pred))
+        return jsonify(_result(prob, pred, version))
+
+    @app.post("/predict/batch")
+    def predict_batch():
+        payload = json_body()
+        customers = payload.get("customers") if isinstance(payload, dict) else payload
+        if not isinstance(customers, list) or not all(isinstance(c, dict) for c in customers):
+            raise BadRequest('Expected {"customers": [{...}, ...]}')
+        if len(customers) > MAX_BATCH_ROWS:
+            return jsonify({"error": f"At most {MAX_BATCH_ROWS} customers per request"}), 413
+        if not customers:
+            return jsonify({"results": []})
+
+        current = get_model_bundle()
+        try:
+            X = build_feature_matrix(pd.DataFrame.from_records(customers), current)
+        except (TypeError, ValueError) as e:
+            raise BadRequest(str(e))
+        # already a batch: score directly, one predict_proba per model
+        prob, pred = predict_churn_batch(X.to_numpy(), bundle=current)
+        bands = risk_band(prob)
+        return jsonify({
+            "model_version": current.version,
+            "results": [
+                {"churn_probability": round(float(p), 4), "prediction": int(y), "risk_level": str(b)}
+                for p, y, b in zip(prob, pred, np.atleast_1d(bands))
+            ],
+        })
+
+    @app.get("/health")
+    def health():
+        current = get_model_bundle()
+        return jsonify({
+            "status": "ok",
+            "model_version": current.version,
+            "model_source": current.source,
+            "batcher": batcher.stats(),
+            "prediction_cache": cache.stats(),
+        })
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        lines = metrics.render()
+        lines += _histogram_lines("churnguard_scoring_batch_size", "Rows per micro-batch", batcher.batch_sizes)
+        lines += _histogram_lines("churnguard_scoring_queue_wait_seconds",
+                                  "Time from submit to batch start", batcher.queue_wait)
+        cache_stats = cache.stats()
+        lines.append("# TYPE churnguard_scoring_prediction_cache_total counter")
+        for counter in ("hits", "misses", "evictions"):
+            lines.append(f'churnguard_scoring_prediction_cache_total{{result="{counter}"}} {cache_stats[counter]}')
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+    print(f"✓ Scoring service ready: model {bundle.version}, micro-batches of ≤{MICRO_BATCH_SIZE} "
+          f"within {MICRO_BATCH_WAIT_MS:g} ms")
+    return app
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Churn scoring HTTP service")
+    parser.add_argument("--host", default=os.getenv("SCORING_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SCORING_PORT", "8080")))
+    args = parser.parse_args()
+
+    # threaded: each request waits on its micro-batch future in its own thread
+    create_app().run(host=args.host, port=args.port, threaded=True)
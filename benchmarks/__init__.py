@@ -0,0 +1,8 @@
+"""
+Benchmarks for ChurnGuard
+Query, prediction, training-dataset and page-render hot paths measured against
+a synthetic database of configurable scale.
+
+    python -m benchmarks.run --scale 100k
+    python -m benchmarks.compare benchmarks/results/BASE.json benchmarks/results/HEAD.json
+"""
@@ -0,0 +1,74 @@
+"""
+Benchmark Comparison for ChurnGuard
+Compares two benchmarks.run result files by median per-call time and exits
+non-zero when any benchmark regressed by more than the threshold.
+
+    python -m benchmarks.compare BASE.json HEAD.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# runs shorter than this are dominated by noise; never flagged
+MIN_MEDIAN_MS = 0.05
+
+
+def load(path: str) -> Dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> Tuple[List[Tuple], List[str]]:
+    """(rows of name, base ms, head ms, change %, status) and the regressed names"""
+    rows, regressions = [], []
+    names = list(base["results"]) + [name for name in head["results"] if name not in base["results"]]
+    for name in names:
+        before, after = base["results"].get(name), head["results"].get(name)
+        if not before or not after or "error" in before or "error" in after:
+            status = "error" if (before and "error" in before) or (after and "error" in after) else "missing"
+            rows.append((name, before and before.get("median_ms"), after and after.get("median_ms"), None, status))
+            continue
+
+        change = (after["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 if before["median_ms"] else 0.0
+        status = "ok"
+        if max(before["median_ms"], after["median_ms"]) >= MIN_MEDIAN_MS:
+            if change > threshold:
+                status = "REGRESSED"
+                regressions.append(name)
+            elif change < -threshold:
+                status = "improved"
+        rows.append((name, before["median_ms"], after["median_ms"], change, status))
+    return rows, regressions
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed median slowdown in percent")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+
+    for key in ("customers", "months", "cpus", "postgres"):
+        if base["meta"].get(key) != head["meta"].get(key):
+            print(f"⚠ {key} differs: {base['meta'].get(key)} vs {head['meta'].get(key)}")
+
+    print(f"base {base['meta'].get('commit', '')[:10]}  →  head {head['meta'].get('commit', '')[:10]}")
+    rows, regressions = compare(base, head, args.threshold)
+    print(f"{'benchmark':<50}{'base ms':>12}{'head ms':>12}{'change':>10}  status")
+    for name, before, after, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1f}%"
+        print(f"{name:<50}{_ms(before):>12}{_ms(after):>12}{change_text:>10}  {status}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed more than {args.threshold:.0f}%")
+        sys.exit(1)
+    print(f"\n✓ No regressions over {args.threshold:.0f}%")
@@ -0,0 +1,138 @@
+"""
+Postgres Fixture for the ChurnGuard benchmarks
+A throwaway database for one benchmark run: either a fresh database on an
+existing server (BENCH_DATABASE_URL), or an ephemeral cluster created with
+initdb in a temp directory and removed afterwards.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+from psycopg2 import sql
+from sqlalchemy.engine import make_url
+
+# Durability is irrelevant for a throwaway cluster
+EPHEMERAL_SETTINGS = {
+    "fsync": "off",
+    "synchronous_commit": "off",
+    "full_page_writes": "off",
+    "shared_buffers": "256MB",
+    "max_wal_size": "4GB",
+}
+
+
+def find_pg_bin() -> Optional[Path]:
+    """Directory holding initdb/pg_ctl: BENCH_PG_BIN, PATH, then pg_config --bindir"""
+    if os.getenv("BENCH_PG_BIN"):
+        return Path(os.environ["BENCH_PG_BIN"])
+    initdb = shutil.which("initdb")
+    if initdb:
+        return Path(initdb).parent
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = subprocess.run([pg_config, "--bindir"], capture_output=True, text=True).stdout.strip()
+        if bindir and (Path(bindir) / "initdb").exists():
+            return Path(bindir)
+    return None
+
+
+def _libpq_url(url: str) -> str:
+    # psycopg2 takes plain postgresql:// URLs, not SQLAlchemy driver URLs
+    parsed = make_url(url).set(drivername="postgresql")
+    return parsed.render_as_string(hide_password=False)
+
+
+class PostgresFixture:
+    """
+    Context manager yielding the URL of an empty, dedicated database.
+
+    With ``server_url`` a database named ``churnguard_bench_<id>`` is created on
+    that server (never touching existing databases); otherwise a cluster is
+    initialised in a temp directory and listens on a Unix socket only.
+    ``keep`` leaves the database (and cluster) in place for inspection.
+    """
+
+    def __init__(self, server_url: Optional[str] = None, keep: bool = False):
+        self.server_url = server_url or os.getenv("BENCH_DATABASE_URL")
+        self.keep = keep
+        self.database = f"churnguard_bench_{uuid.uuid4().hex[:8]}"
+        self._data_dir: Optional[str] = None
+        self._pg_bin: Optional[Path] = None
+        self.url: Optional[str] = None
+
+    # ---------- ephemeral cluster ----------
+
+    def _start_cluster(self) -> str:
+        self._pg_bin = find_pg_bin()
+        if self._pg_bin is None:
+            raise RuntimeError("initdb not found: set BENCH_PG_BIN, or BENCH_DATABASE_URL to use an existing server")
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            raise RuntimeError("initdb refuses to run as root: run as another user, or set BENCH_DATABASE_URL")
+
+        self._data_dir = tempfile.mkdtemp(prefix="churnguard_pg_")
+        subprocess.run(
+            [str(self._pg_bin / "initdb"), "-D", self._data_dir, "-U", "postgres", "-A", "trust", "-E", "UTF8"],
+            check=True, capture_output=True
+        )
+        options = " ".join(f"-c {key}={value}" for key, value in EPHEMERAL_SETTINGS.items())
+        subprocess.run(
+            [str(self._pg_bin / "pg_ctl"), "-D", self._data_dir, "-w", "-l", f"{self._data_dir}/server.log",
+             "-o", f"-k {self._data_dir} -h '' {options}", "start"],
+            check=True, capture_output=True
+        )
+        return f"postgresql://postgres@/postgres?host={self._data_dir}"
+
+    def _stop_cluster(self):
+        subprocess.run(
+            [str(self._pg_bin / "pg_ctl"), "-D", self._data_dir, "-m", "immediate", "stop"],
+            capture_output=True
+        )
+        shutil.rmtree(self._data_dir, ignore_errors=True)
+
+    # ---------- database ----------
+
+    def _admin(self, statement):
+        conn = psycopg2.connect(_libpq_url(self.server_url))
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(statement)
+        finally:
+            conn.close()
+
+    def __enter__(self) -> str:
+        if not self.server_url:
+            self.server_url = self._start_cluster()
+        self._admin(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(self.database)))
+
+        url = make_url(_libpq_url(self.server_url)).set(database=self.database)
+        self.url = url.render_as_string(hide_password=False)
+        return self.url
+
+    def __exit__(self, *exc):
+        if self.keep:
+            print(f"⚠ Keeping benchmark database: {self.url}")
+            return False
+
+        from services.db import close_db_service
+        from services.engines import dispose_engines
+
+        # the services hold pooled connections to the database being dropped
+        close_db_service()
+        dispose_engines()
+        for _ in range(10):
+            try:
+                self._admin(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(self.database)))
+                break
+            except psycopg2.OperationalError:
+                time.sleep(0.5)
+        if self._data_dir:
+            self._stop_cluster()
+        return False
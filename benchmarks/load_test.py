@@ -0,0 +1,168 @@
+"""
+Scoring Service Load Test for ChurnGuard
+Drives a running app/src/server.py with concurrent clients and reports
+throughput, latency percentiles and the service's mean micro-batch size.
+
+    python -m app.src.server --port 8080 &
+    python -m benchmarks.load_test --url http://localhost:8080 --concurrency 32 --duration 20
+    python -m benchmarks.load_test --mode batch --batch-size 500 --concurrency 4
+
+Payloads are rows of the training dataset (src/ml/data, or --data). Each
+request picks a different row, so with more rows than requests the
+service's prediction cache is bypassed; --repeat-row sends one row to
+measure cache hits instead.
+"""
+
+import argparse
+import json
+import math
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from src.ml.dataset import load_training_frame, resolve_dataset_path
+
+
+def load_payloads(path: Optional[str], limit: int) -> List[Dict]:
+    df = load_training_frame(path).drop(columns=["customer_id", "churn_flag"], errors="ignore").head(limit)
+    records = df.to_dict(orient="records")
+    # NaN is not valid JSON
+    return [{k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in row.items()} for row in records]
+
+
+def post(url: str, payload, timeout: float) -> int:
+    body = json.dumps(payload, default=str).encode()
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def scrape_metric(base_url: str, name: str) -> float:
+    with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+        text = response.read().decode()
+    match = re.search(rf"^{name} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run(args, payloads: List[Dict]) -> Dict:
+    url = f"{args.url}/predict" if args.mode == "single" else f"{args.url}/predict/batch"
+    deadline = time.perf_counter() + args.duration
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    counter = iter(range(sys.maxsize))
+
+    def next_payload():
+        i = next(counter)
+        if args.mode == "batch":
+            start = i * args.batch_size
+            return {"customers": [payloads[(start + j) % len(payloads)] for j in range(args.batch_size)]}
+        return payloads[0] if args.repeat_row else payloads[i % len(payloads)]
+
+    def client():
+        while time.perf_counter() < deadline:
+            payload = next_payload()
+            started = time.perf_counter()
+            try:
+                status = post(url, payload, args.timeout)
+            except Exception:
+                status = 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    batches_before = scrape_metric(args.url, "churnguard_scoring_batch_size_count")
+    rows_before = scrape_metric(args.url, "churnguard_scoring_batch_size_sum")
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    batches = scrape_metric(args.url, "churnguard_scoring_batch_size_count") - batches_before
+    rows = scrape_metric(args.url, "churnguard_scoring_batch_size_sum") - rows_before
+
+    latencies.sort()
+    requests = len(latencies)
+    return {
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status != 200),
+        "statuses": statuses,
+        "seconds": wall,
+        "requests_per_second": requests / wall,
+        "customers_per_second": requests * (args.batch_size if args.mode == "batch" else 1) / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "micro_batches": int(batches),
+        "mean_micro_batch": rows / batches if batches else 0.0,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load-test the churn scoring service")
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--mode", choices=("single", "batch"), default="single")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--batch-size", type=int, default=100, help="customers per /predict/batch request")
+    parser.add_argument("--rows", type=int, default=50000, help="distinct payload rows to cycle through")
+    parser.add_argument("--repeat-row", action="store_true", help="always send the same row (cache hits)")
+    parser.add_argument("--data", help="dataset path (default: the training dataset)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        payloads = load_payloads(args.data, args.rows)
+    except FileNotFoundError:
+        print(f"❌ No dataset at {resolve_dataset_path(args.data)}; run src/ml/01_build_training_dataset.py or pass --data")
+        sys.exit(1)
+
+    try:
+        with urllib.request.urlopen(f"{args.url}/health", timeout=5) as response:
+            health = json.loads(response.read())
+    except Exception as e:
+        print(f"❌ Scoring service not reachable at {args.url}: {str(e)}")
+        sys.exit(1)
+
+    print(f"✓ {len(payloads):,} payload rows · model {health['model_version']} · "
+          f"{args.concurrency} clients · {args.mode} · {args.duration:g}s")
+
+    result = run(args, payloads)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"  requests      {result['requests']:,} ({result['errors']:,} errors)")
+        print(f"  throughput    {result['requests_per_second']:,.0f} req/s · "
+              f"{result['customers_per_second']:,.0f} customers/s")
+        print(f"  latency       p50 {result['p50_ms']:.1f} ms · p95 {result['p95_ms']:.1f} ms · "
+              f"p99 {result['p99_ms']:.1f} ms")
+        if args.mode == "single":
+            print(f"  micro-batches {result['micro_batches']:,} · mean size {result['mean_micro_batch']:.1f}")
+    if result["errors"]:
+        print(f"⚠ Non-200 responses: {result['statuses']}")
@@ -0,0 +1,262 @@
+"""
+Benchmark Runner for ChurnGuard
+Seeds a throwaway database at the requested scale, then times every fetch_*
+function, every services/queries.py view, single and batch prediction, the
+training-dataset export and the Streamlit page scripts. Results are written as
+JSON (benchmarks/results/ by default) for benchmarks.compare.
+
+    python -m benchmarks.run --scale 10k
+    BENCH_DATABASE_URL=postgresql://postgres@localhost/postgres python -m benchmarks.run --scale 1M --skip pages
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fixture import PostgresFixture
+from benchmarks.synthetic import generate, parse_scale
+
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+GROUPS = ("fetch", "queries", "predict", "dataset", "pages")
+
+
+@dataclass
+class Benchmark:
+    """``fn`` is timed ``number`` times per sample; ``setup`` runs untimed before each sample"""
+
+    name: str
+    group: str
+    fn: Callable[[], object]
+    setup: Optional[Callable[[], None]] = None
+    number: int = 1
+    repeat: Optional[int] = None
+
+
+def measure(bench: Benchmark, repeat: int, warmup: int = 1) -> Dict[str, object]:
+    """Per-call milliseconds over ``repeat`` samples, plus whether any query failed"""
+    from services.instrumentation import get_query_metrics
+
+    metrics = get_query_metrics()
+    errors_before = sum(stats.errors for stats in metrics.snapshot())
+
+    samples = []
+    for i in range(warmup + (bench.repeat or repeat)):
+        if bench.setup:
+            bench.setup()
+        started = time.perf_counter()
+        for _ in range(bench.number):
+            bench.fn()
+        elapsed = (time.perf_counter() - started) * 1000 / bench.number
+        if i >= warmup:
+            samples.append(elapsed)
+
+    samples.sort()
+    return {
+        "group": bench.group,
+        "samples": len(samples),
+        "number": bench.number,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "mean_ms": statistics.fmean(samples),
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        # fetch_* functions swallow errors and return fallback data
+        "query_errors": sum(stats.errors for stats in metrics.snapshot()) - errors_before,
+    }
+
+
+# ==================== BENCHMARKS ====================
+
+def build_benchmarks(groups, batch_size: int, dataset_dir: Path) -> List[Benchmark]:
+    from app.src.predict import predict_churn, predict_churn_batch
+    from app.src.registry import get_model_bundle
+    from services import async_db, db, queries
+    from services.snapshot import invalidate_dashboard_snapshot
+    from src.ml.dataset import export_parquet, iter_query_frames
+
+    dataset = importlib.import_module("src.ml.01_build_training_dataset")
+
+    benchmarks = []
+    if "fetch" in groups:
+        # the shared result cache is disabled for the run; the in-process snapshot is
+        # dropped before every sample so each call pays for its query
+        for name in ("fetch_kpis", "fetch_segment_data", "fetch_regional_data",
+                     "fetch_revenue_breakdown", "fetch_churn_reasons", "fetch_model_risk"):
+            benchmarks.append(Benchmark(f"db.{name}", "fetch", getattr(db, name),
+                                        setup=invalidate_dashboard_snapshot))
+
+        # one page's independent queries: one after another vs gathered on the async pool
+        def sequential():
+            return [db.fetch_kpis(), db.fetch_revenue_breakdown(), db.fetch_churn_reasons(), db.fetch_model_risk()]
+
+        def gathered():
+            return async_db.fetch_all(kpis=async_db.fetch_kpis(), revenue=async_db.fetch_revenue_breakdown(),
+                                      reasons=async_db.fetch_churn_reasons(), risk=async_db.fetch_model_risk())
+
+        benchmarks.append(Benchmark("db.page_fetches[sequential]", "fetch", sequential,
+                                    setup=invalidate_dashboard_snapshot))
+        benchmarks.append(Benchmark("async_db.fetch_all[page_fetches]", "fetch", gathered,
+                                    setup=invalidate_dashboard_snapshot))
+
+    if "queries" in groups:
+        for name in ("load_kpis", "churn_by_region", "revenue_by_region", "segment_metrics"):
+            benchmarks.append(Benchmark(f"queries.{name}", "queries", getattr(queries, name),
+                                        setup=invalidate_dashboard_snapshot))
+        benchmarks.append(Benchmark("queries.churn_by_region[snapshot cached]", "queries",
+                                    queries.churn_by_region, number=100))
+
+    if "predict" in groups:
+        try:
+            get_model_bundle()
+        except Exception as e:
+            print(f"⚠ Skipping prediction benchmarks, no model bundle: {str(e)}")
+        else:
+            # real feature rows from the synthetic database
+            query = f"SELECT * FROM ({dataset.QUERY}) q LIMIT {batch_size}"
+            features = next(iter_query_frames(db.get_engine(), query))
+            single = features.drop(columns=["customer_id", "churn_flag"]).iloc[0].to_dict()
+            benchmarks.append(Benchmark("predict.predict_churn", "predict",
+                                        lambda: predict_churn(single, use_cache=False), number=50))
+            benchmarks.append(Benchmark("predict.predict_churn[cached]", "predict",
+                                        lambda: predict_churn(single), number=50))
+            benchmarks.append(Benchmark(f"predict.predict_churn_batch[{len(features)}]", "predict",
+                                        lambda: predict_churn_batch(features)))
+
+    if "dataset" in groups:
+        parquet_path = dataset_dir / "bench_training.parquet"
+        benchmarks.append(Benchmark("dataset.export_parquet", "dataset",
+                                    lambda: export_parquet(db.get_engine(), dataset.QUERY, parquet_path), repeat=3))
+
+    if "pages" in groups:
+        pages = sorted(str(p.relative_to(BASE_DIR)) for p in (BASE_DIR / "pages").glob("[0-9]_*.py"))
+        for page in ("main.py", *pages):
+            benchmarks.append(Benchmark(f"pages.{Path(page).stem}", "pages", _page_runner(page),
+                                        setup=invalidate_dashboard_snapshot))
+    return benchmarks
+
+
+def _page_runner(page: str) -> Callable[[], object]:
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        app = AppTest.from_file(str(BASE_DIR / page), default_timeout=300)
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"{page}: {app.exception[0].message}")
+    return run
+
+
+# ==================== METADATA ====================
+
+def git_revision() -> Dict[str, object]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def server_version(url: str) -> str:
+    import psycopg2
+
+    conn = psycopg2.connect(url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run the ChurnGuard benchmarks against a synthetic database")
+    parser.add_argument("--scale", default="10k", help="customers to generate, e.g. 10k, 1M, 10M")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5, help="timed samples per benchmark")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows for the batch prediction benchmark")
+    parser.add_argument("--skip", nargs="*", default=[], choices=GROUPS, help="benchmark groups to leave out")
+    parser.add_argument("--filter", default=None, help="regex on benchmark names")
+    parser.add_argument("--server-url", default=None, help="existing server to create the database on "
+                                                           "(default: BENCH_DATABASE_URL, else an initdb cluster)")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database afterwards")
+    parser.add_argument("--out", default=None, help="result file (default: benchmarks/results/<scale>-<commit>.json)")
+    args = parser.parse_args()
+
+    customers = parse_scale(args.scale)
+    revision = git_revision()
+    scratch = Path(tempfile.mkdtemp(prefix="churnguard_bench_"))
+
+    print("=" * 60)
+    print(f"CHURNGUARD BENCHMARKS · {customers:,} customers")
+    print("=" * 60)
+
+    with PostgresFixture(args.server_url, keep=args.keep) as url:
+        # before services/ is imported: every service reads its config at import time
+        os.environ["DATABASE_URL"] = url
+        os.environ["CHURNGUARD_CACHE"] = "0"
+        os.environ["CHURNGUARD_CACHE_PATH"] = str(scratch / "cache.sqlite3")
+        os.environ["DB_STATEMENT_TIMEOUT_MS"] = "0"
+
+        started = time.perf_counter()
+        timings = generate(url, customers, months=args.months)
+        print(f"✓ Generated synthetic data in {time.perf_counter() - started:.1f}s")
+
+        from services.rollups import ensure_rollups
+        from services.schema import migrate
+
+        migrate()
+        ensure_rollups()
+        print("✓ Indexes and rollups built")
+
+        results = {}
+        groups = [group for group in GROUPS if group not in args.skip]
+        for bench in build_benchmarks(groups, args.batch_size, scratch):
+            if args.filter and not re.search(args.filter, bench.name):
+                continue
+            try:
+                result = measure(bench, args.repeat)
+            except Exception as e:
+                print(f"❌ {bench.name}: {str(e)}")
+                results[bench.name] = {"group": bench.group, "error": str(e)}
+                continue
+            results[bench.name] = result
+            flag = "⚠" if result["query_errors"] else "✓"
+            print(f"{flag} {bench.name:<48}{result['median_ms']:>10.2f} ms  (p95 {result['p95_ms']:.2f})")
+
+        report = {
+            "meta": {
+                **revision,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "customers": customers,
+                "months": args.months,
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "postgres": server_version(url),
+                "generate_seconds": timings,
+            },
+            "results": results,
+        }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{args.scale}-{revision['commit'][:10] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, default=str))
+    print("Saved →", out)
@@ -0,0 +1,153 @@
+"""
+Synthetic Data for the ChurnGuard benchmarks
+Generates dim/fact/staging/mart tables with the shapes the dashboard and ML
+queries expect, entirely server-side (generate_series), so 10M customers do
+not go through Python. Deterministic for a given seed.
+"""
+
+import re
+import time
+from typing import Dict
+
+import psycopg2
+
+REGIONS = ("North", "South", "East", "West")
+CHANNELS = ("Online", "Store", "Agent")
+CHURN_REASONS = ("Service Quality Issues", "Competitive Pricing", "Poor Customer Service", "Lack of Engagement")
+
+_SCALE = re.compile(r"^(\d+(?:\.\d+)?)([kKmM]?)$")
+
+
+def parse_scale(value: str) -> int:
+    """'10k' -> 10_000, '1.5M' -> 1_500_000, '2500' -> 2500"""
+    match = _SCALE.match(str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid scale: {value!r} (expected e.g. 10k, 1M, 250000)")
+    number, suffix = match.groups()
+    return int(float(number) * {"": 1, "k": 1_000, "m": 1_000_000}[suffix.lower()])
+
+
+def _array(values) -> str:
+    return "ARRAY[" + ", ".join(f"'{value}'" for value in values) + "]"
+
+
+def table_statements(customers: int, months: int = 12, churn_rate: float = 0.2) -> Dict[str, str]:
+    """CREATE TABLE ... AS statements in dependency order"""
+    return {
+        "dim_customers": f"""
+            CREATE TABLE dim_customers AS
+            SELECT
+                'C' || g AS customer_id,
+                ({_array(REGIONS)})[1 + (random() * {len(REGIONS) - 1})::int] AS region,
+                CASE WHEN random() < 0.12 THEN 'SME' ELSE 'Retail' END AS customer_segment,
+                (DATE '2018-01-01' + (random() * 2500)::int) AS join_date
+            FROM generate_series(1, {customers}) g
+        """,
+        "stg_customers": f"""
+            CREATE TABLE stg_customers AS
+            SELECT customer_id, ({_array(CHANNELS)})[1 + (random() * {len(CHANNELS) - 1})::int] AS acquisition_channel
+            FROM dim_customers
+        """,
+        "fact_billing": f"""
+            CREATE TABLE fact_billing AS
+            SELECT
+                c.customer_id,
+                (DATE '2024-01-01' + make_interval(months => m))::date AS billing_month,
+                round((20 + random() * 100)::numeric, 2) AS monthly_charges,
+                round((100 + random() * 1000)::numeric, 2) AS total_charges
+            FROM dim_customers c, generate_series(0, {months - 1}) m
+        """,
+        "stg_billing": "CREATE TABLE stg_billing AS SELECT customer_id, monthly_charges FROM fact_billing",
+        "fact_support": f"""
+            CREATE TABLE fact_support AS
+            SELECT
+                c.customer_id,
+                (DATE '2024-01-01' + make_interval(months => m))::date AS month,
+                (random() * 5)::int AS tickets_count,
+                round((1 + random() * 4)::numeric, 1) AS csat_score
+            FROM dim_customers c, generate_series(0, {months - 1}) m
+        """,
+        "fact_network_quality": f"""
+            CREATE TABLE fact_network_quality AS
+            SELECT
+                c.customer_id,
+                (DATE '2024-01-01' + make_interval(months => m))::date AS month,
+                round((random() * 120)::numeric, 1) AS downtime_minutes,
+                round((10 + random() * 90)::numeric, 1) AS avg_latency,
+                round((random() * 3)::numeric, 2) AS packet_loss
+            FROM dim_customers c, generate_series(0, {months - 1}) m
+        """,
+        "fact_churn": f"""
+            CREATE TABLE fact_churn AS
+            SELECT customer_id, CASE WHEN random() < {churn_rate} THEN '1' ELSE '0' END AS churn_flag
+            FROM dim_customers
+        """,
+        "stg_churn": f"""
+            CREATE TABLE stg_churn AS
+            SELECT
+                customer_id,
+                churn_flag,
+                CASE WHEN churn_flag = '1' AND random() < 0.9
+                     THEN ({_array(CHURN_REASONS)})[1 + (random() * {len(CHURN_REASONS) - 1})::int]
+                END AS churn_reason
+            FROM fact_churn
+        """,
+        "mart_retention_kpis": """
+            CREATE TABLE mart_retention_kpis AS
+            SELECT
+                c.region,
+                c.customer_segment,
+                b.billing_month AS kpi_month,
+                COUNT(*) AS total_customers,
+                COUNT(*) FILTER (WHERE ch.churn_flag = '1') AS churned_customers,
+                ROUND(100.0 * COUNT(*) FILTER (WHERE ch.churn_flag = '1') / COUNT(*), 2) AS churn_rate,
+                ROUND(100.0 * COUNT(*) FILTER (WHERE ch.churn_flag = '0') / COUNT(*), 2) AS retention_rate,
+                SUM(b.monthly_charges) AS total_revenue,
+                COALESCE(SUM(b.monthly_charges) FILTER (WHERE ch.churn_flag = '1'), 0) AS revenue_at_risk
+            FROM fact_billing b
+            JOIN dim_customers c USING (customer_id)
+            JOIN fact_churn ch USING (customer_id)
+            GROUP BY c.region, c.customer_segment, b.billing_month
+        """,
+        "churn_scores": """
+            CREATE TABLE churn_scores AS
+            SELECT
+                customer_id,
+                p AS churn_probability,
+                (p >= 0.5)::int::smallint AS churn_prediction,
+                CASE WHEN p >= 0.7 THEN 'HIGH' WHEN p >= 0.4 THEN 'MEDIUM' ELSE 'LOW' END AS risk_band,
+                round((20 + random() * 100)::numeric, 2) AS monthly_revenue,
+                'synthetic'::text AS model_version,
+                now() AS scored_at
+            FROM (SELECT customer_id, random() ^ 2 AS p FROM dim_customers) s
+        """,
+    }
+
+
+def generate(url: str, customers: int, months: int = 12, seed: float = 0.42) -> Dict[str, float]:
+    """Create and ANALYZE every table; returns seconds per table"""
+    timings = {}
+    conn = psycopg2.connect(url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = 0")
+            # parallel workers have their own random() state
+            cursor.execute("SET max_parallel_workers_per_gather = 0")
+            cursor.execute("SELECT setseed(%s)", (seed,))
+            for table, statement in table_statements(customers, months).items():
+                started = time.perf_counter()
+                cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+                cursor.execute(statement)
+                timings[table] = time.perf_counter() - started
+            cursor.execute("CREATE UNIQUE INDEX churn_scores_customer_id ON churn_scores (customer_id)")
+        conn.commit()
+
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = 0")
+            started = time.perf_counter()
+            cursor.execute("VACUUM ANALYZE")
+            timings["vacuum_analyze"] = time.perf_counter() - started
+    finally:
+        conn.close()
+    return timings
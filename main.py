@@ -1,21 +1,11 @@
-import base64
-from pathlib import Path
 import streamlit as st
 import streamlit.components.v1 as components
 from services.db import fetch_kpis
+from services.snapshot import SNAPSHOT_CACHE_TAG, SNAPSHOT_TTL_SECONDS
+from services.cache import tag_generation
+from services.assets import build_all_variants, fullscreen_src, picture_html, static_serving_enabled
 from app.src.predict import predict_churn
-
-
-def img_to_base64(path):
-    img_bytes = Path(path).read_bytes()
-    return base64.b64encode(img_bytes).decode()
-
-
-architecture_img = img_to_base64("assets/architecture.png")
-dash_overview = img_to_base64("assets/churn_overview.jpg")
-dash_trends = img_to_base64("assets/churn_trends.jpg")
-dash_revenue = img_to_base64("assets/revenue_risk.jpg")
-dash_segment = img_to_base64("assets/segment_deep_dive.jpg")
+from services.profiler import start_profile
 
 # ================= PAGE CONFIG =================
 st.set_page_config(
@@ -24,6 +14,43 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# ?profile=1 or CHURNGUARD_PROFILE=1: per-phase timings and payload sizes in the sidebar
+profiler = start_profile(__file__)
+
+
+# ================= IMAGE ASSETS =================
+# Resized WebP/AVIF variants are encoded once per content hash and served from
+# ./static, so a rerun ships <img> tags instead of megabytes of base64.
+@st.cache_resource
+def load_images():
+    return build_all_variants()
+
+
+with profiler.phase("images"):
+    images = load_images()
+    use_static = static_serving_enabled()
+
+    architecture_img = picture_html(images["architecture"], "Telecom Customer Churn Analytics Architecture",
+                                    "architecture-image", sizes="(max-width: 1600px) 100vw, 1600px",
+                                    use_static_urls=use_static)
+
+
+def dashboard_img(name, alt):
+    return picture_html(images[name], alt, "dashboard-image",
+                        sizes="(max-width: 900px) 100vw, 50vw", use_static_urls=use_static)
+
+
+with profiler.phase("image markup"):
+    dash_overview = dashboard_img("churn_overview", "Churn Overview")
+    dash_trends = dashboard_img("churn_trends", "Churn Trends")
+    dash_revenue = dashboard_img("revenue_risk", "Revenue at Risk")
+    dash_segment = dashboard_img("segment_deep_dive", "Segment Deep Dive")
+
+    full_overview = fullscreen_src(images["churn_overview"], use_static)
+    full_trends = fullscreen_src(images["churn_trends"], use_static)
+    full_revenue = fullscreen_src(images["revenue_risk"], use_static)
+    full_segment = fullscreen_src(images["segment_deep_dive"], use_static)
+
 # ================= REMOVE STREAMLIT UI LIMITS =================
 st.markdown("""
 <style>
@@ -46,12 +73,17 @@ header, footer {
 
 
 # ================= LOAD KPI DATA =================
-@st.cache_data(ttl=300)
-def load_kpis():
+# fetch_kpis reads the shared snapshot (services/cache.py), which every worker
+# process reuses and which is invalidated when mart_retention_kpis is refreshed.
+# Reruns in this process are served from st.cache_data; keying it on the tag
+# generation drops the in-process copy as soon as the snapshot is invalidated.
+@st.cache_data(ttl=SNAPSHOT_TTL_SECONDS, show_spinner=False)
+def load_kpis(generation):
     return fetch_kpis()
 
 
-kpis = load_kpis()
+with profiler.phase("kpis"):
+    kpis = load_kpis(tag_generation(SNAPSHOT_CACHE_TAG))
 
 total_customers = kpis["total_customers"] or 0
 total_revenue = kpis["total_revenue"] or 0
@@ -102,7 +134,8 @@ if st.button("Predict Churn Risk"):
         "downtime_last_30d": downtime
     }
 
-    prob, pred = predict_churn(features)
+    with profiler.phase("predict"):
+        prob, pred = predict_churn(features)
 
     st.markdown("### Prediction Result")
     st.metric("Churn Probability", f"{prob:.2%}")
@@ -115,8 +148,9 @@ if st.button("Predict Churn Risk"):
         st.success("LOW RISK")
 
 # ================= SINGLE PAGE HTML =================
-components.html(
-    f"""
+with profiler.phase("landing html"):
+    components.html(
+        f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -707,6 +741,7 @@ body {{
 
 .dashboard-image {{
   width: 100%;
+  height: auto;
   border-radius: 12px;
   display: block;
   object-fit: cover;
@@ -981,11 +1016,7 @@ body {{
     </div>
 
 <div class="architecture-image-wrapper">
-  <img
-    src="data:image/png;base64,{architecture_img}"
-    alt="Telecom Customer Churn Analytics Architecture"
-    class="architecture-image"
-  />
+  {architecture_img}
 </div>
 
 </section>
@@ -1007,38 +1038,38 @@ body {{
   <div class="dashboards-grid">
       <div class="dashboard-card">
         <div class="img-actions">
-          <button class="img-btn" onclick="openFullscreen('data:image/jpeg;base64,{dash_overview}')">Fullscreen</button>
+          <button class="img-btn" onclick="openFullscreen('{full_overview}')">Fullscreen</button>
         </div>
         <h3>Churn Overview</h3>
         <p>High-level churn metrics, KPIs, and customer health indicators.</p>
-        <img class="dashboard-image" src="data:image/jpeg;base64,{dash_overview}" alt="Churn Overview" />
+        {dash_overview}
       </div>
 
       <div class="dashboard-card">
         <div class="img-actions">
-          <button class="img-btn" onclick="openFullscreen('data:image/jpeg;base64,{dash_trends}')">Fullscreen</button>
+          <button class="img-btn" onclick="openFullscreen('{full_trends}')">Fullscreen</button>
         </div>
         <h3>Churn Trends</h3>
         <p>Monthly churn patterns, seasonality, and behavioral changes.</p>
-        <img class="dashboard-image" src="data:image/jpeg;base64,{dash_trends}" alt="Churn Trends" />
+        {dash_trends}
       </div>
 
       <div class="dashboard-card">
         <div class="img-actions">
-          <button class="img-btn" onclick="openFullscreen('data:image/jpeg;base64,{dash_revenue}')">Fullscreen</button>
+          <button class="img-btn" onclick="openFullscreen('{full_revenue}')">Fullscreen</button>
         </div>
         <h3>Revenue at Risk</h3>
         <p>Revenue exposure analysis with churn probability and ARPU impact.</p>
-        <img class="dashboard-image" src="data:image/jpeg;base64,{dash_revenue}" alt="Revenue at Risk" />
+        {dash_revenue}
       </div>
 
       <div class="dashboard-card">
         <div class="img-actions">
-          <button class="img-btn" onclick="openFullscreen('data:image/jpeg;base64,{dash_segment}')">Fullscreen</button>
+          <button class="img-btn" onclick="openFullscreen('{full_segment}')">Fullscreen</button>
         </div>
         <h3>Segment Deep Dive</h3>
         <p>Cohort analysis by plan, tenure, geography, and usage behavior.</p>
-        <img class="dashboard-image" src="data:image/jpeg;base64,{dash_segment}" alt="Segment Deep Dive" />
+        {dash_segment}
       </div>
     </div>
 
@@ -1093,6 +1124,8 @@ document.querySelector('.modal-close').addEventListener('click', function(event)
 </body>
 </html>
 """,
-    height=4500,
-    scrolling=True
-)
\ No newline at end of file
+        height=4500,
+        scrolling=True
+    )
+
+profiler.finish()
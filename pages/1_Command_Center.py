@@ -1,10 +1,14 @@
 import streamlit as st
 import plotly.express as px
+from services.profiler import start_profile
 from services.queries import load_kpis, churn_by_region
 
+profiler = start_profile(__file__)
+
 st.title("Command Center")
 
-kpi = load_kpis().iloc[0]
+with profiler.phase("kpis"):
+    kpi = load_kpis().iloc[0]
 
 c1,c2,c3,c4,c5,c6 = st.columns(6)
 
@@ -17,17 +21,20 @@ c6.metric("Revenue Risk", f"${kpi.risk/1e6:.0f}M")
 
 st.divider()
 
-df = churn_by_region()
+with profiler.phase("query"):
+    df = churn_by_region()
 
-fig = px.bar(
-    df,
-    x="region",
-    y="churn_rate",
-    color="churn_rate",
-    color_continuous_scale="Reds"
-)
+with profiler.phase("figure"):
+    fig = px.bar(
+        df,
+        x="region",
+        y="churn_rate",
+        color="churn_rate",
+        color_continuous_scale="Reds"
+    )
 
-st.plotly_chart(fig, use_container_width=True)
+with profiler.phase("chart"):
+    st.plotly_chart(fig, use_container_width=True)
 
 st.info("""
 ### Executive Recommendation
@@ -35,3 +42,5 @@ st.info("""
 Retail-heavy regions with elevated churn represent immediate revenue leakage.
 Prioritize targeted retention programs — even a 3% reduction could protect tens of millions annually.
 """)
+
+profiler.finish()
@@ -1,17 +1,25 @@
 import streamlit as st
 import plotly.express as px
+from services.profiler import start_profile
 from services.queries import revenue_by_region
 
+profiler = start_profile(__file__)
+
 st.title("📉 Revenue Risk Radar")
 
-df = revenue_by_region()
+with profiler.phase("query"):
+    df = revenue_by_region()
+
+with profiler.phase("figure"):
+    fig = px.bar(
+        df,
+        x="region",
+        y="revenue",
+        color="revenue",
+        title="Revenue Concentration by Region"
+    )
 
-fig = px.bar(
-    df,
-    x="region",
-    y="revenue",
-    color="revenue",
-    title="Revenue Concentration by Region"
-)
+with profiler.phase("chart"):
+    st.plotly_chart(fig, use_container_width=True)
 
-st.plotly_chart(fig, use_container_width=True)
+profiler.finish()
@@ -1,4 +1,7 @@
 import streamlit as st
+from services.profiler import start_profile
+
+profiler = start_profile(__file__)
 
 st.title("Retention Strategy Simulator")
 
@@ -12,3 +15,4 @@ saved = avg_revenue_loss * (reduction / 100)
 
 st.success(f"💰 Potential Revenue Saved: ${saved:,.0f}")
 
+profiler.finish()
@@ -0,0 +1,70 @@
+import time
+
+import pandas as pd
+import streamlit as st
+from app.src.prediction_cache import get_prediction_cache
+from services.db import get_db_service
+from services.instrumentation import get_query_metrics, render_prometheus
+
+st.title("Query Diagnostics")
+
+db = get_db_service()
+metrics = get_query_metrics()
+
+st.caption(
+    f"Per-process counters since start · slow threshold {metrics.slow_seconds * 1000:.0f} ms "
+    f"(DB_SLOW_QUERY_MS) · EXPLAIN capture {'on' if metrics.explain_slow else 'off'} (DB_SLOW_QUERY_EXPLAIN)"
+)
+
+pool = db.pool_stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Queries", f"{sum(s.calls for s in metrics.snapshot()):,}")
+c2.metric("Slow queries", f"{len(metrics.slow_queries()):,}")
+c3.metric("Pool checkouts", f"{pool.get('checkouts', 0):,}")
+c4.metric("Connections created", f"{pool.get('connections_created', 0):,}")
+
+st.subheader("Queries by total time")
+
+df = pd.DataFrame(
+    [
+        {
+            "fingerprint": s.fingerprint,
+            "calls": s.calls,
+            "errors": s.errors,
+            "total_ms": round(s.latency.sum * 1000, 1),
+            "mean_ms": round(s.mean_seconds * 1000, 1),
+            "p95_ms≤": s.latency.quantile(0.95) * 1000,
+            "max_ms": round(s.max_seconds * 1000, 1),
+            "rows": s.rows,
+            "kb": round(s.bytes / 1024, 1),
+            "query": s.query[:200],
+        }
+        for s in metrics.snapshot()
+    ]
+)
+st.dataframe(df, use_container_width=True, hide_index=True)
+
+st.subheader("Slow queries")
+
+for slow in metrics.slow_queries():
+    label = f"{slow.fingerprint} · {slow.seconds * 1000:,.0f} ms · {slow.rows:,} rows · {time.strftime('%H:%M:%S', time.localtime(slow.at))}"
+    with st.expander(label):
+        st.code(slow.query, language="sql")
+        if slow.plan:
+            st.code(slow.plan)
+
+st.subheader("Prediction cache")
+
+prediction_cache = get_prediction_cache().stats()
+p1, p2, p3, p4 = st.columns(4)
+p1.metric("Hit rate", f"{prediction_cache['hit_rate']:.1%}")
+p2.metric("Hits / misses", f"{prediction_cache['hits']:,} / {prediction_cache['misses']:,}")
+p3.metric("Entries", f"{prediction_cache['entries']:,} / {prediction_cache['max_entries']:,}")
+p4.metric("Model version", prediction_cache['model_version'] or "not loaded")
+
+with st.expander("Prometheus metrics"):
+    st.code(render_prometheus(pool_stats=pool), language="text")
+
+if st.button("Reset counters"):
+    metrics.reset()
+    st.rerun()
@@ -0,0 +1,191 @@
+"""
+Image Asset Pipeline for ChurnGuard
+Builds resized WebP/AVIF variants of the landing-page screenshots once, keyed by
+content hash, and renders lazy-loading responsive <picture> markup for them
+"""
+
+import base64
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image, features
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+ASSETS_DIR = BASE_DIR / "assets"
+
+# Streamlit serves ./static at app/static/ when server.enableStaticServing is on
+STATIC_DIR = BASE_DIR / "static"
+GENERATED_DIR = STATIC_DIR / "generated"
+STATIC_URL_PREFIX = "app/static/generated"
+
+# Screenshots embedded in the main.py landing page
+LANDING_IMAGES = (
+    "architecture.png",
+    "churn_overview.jpg",
+    "churn_trends.jpg",
+    "revenue_risk.jpg",
+    "segment_deep_dive.jpg",
+)
+
+VARIANT_WIDTHS = (480, 960, 1600)
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+AVIF_SPEED = 8  # libavif 0 (smallest) .. 10 (fastest)
+
+AVIF_SUPPORTED = features.check("avif")
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """One encoded rendition of a source image"""
+
+    path: Path
+    width: int
+    height: int
+    mime: str
+
+    @property
+    def url(self) -> str:
+        return f"{STATIC_URL_PREFIX}/{self.path.name}"
+
+    def data_uri(self) -> str:
+        encoded = base64.b64encode(self.path.read_bytes()).decode()
+        return f"data:{self.mime};base64,{encoded}"
+
+
+@dataclass(frozen=True)
+class ResponsiveImage:
+    """WebP (and AVIF when available) variants of one source image, smallest first"""
+
+    name: str
+    webp: Tuple[ImageVariant, ...]
+    avif: Tuple[ImageVariant, ...]
+
+    @property
+    def largest(self) -> ImageVariant:
+        return self.webp[-1]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(variant.path.stat().st_size for variant in self.webp + self.avif)
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _encode(image: Image.Image, target: Path, fmt: str, options: Dict):
+    # write-then-rename so concurrent workers never serve a half-written file
+    tmp = target.with_suffix(f"{target.suffix}.{os.getpid()}.tmp")
+    image.save(tmp, format=fmt, **options)
+    os.replace(tmp, target)
+
+
+def build_variants(source: Path, widths=VARIANT_WIDTHS) -> ResponsiveImage:
+    """
+    Return the variants for ``source``, encoding any that are not on disk yet.
+    Files are named <stem>-<content hash>-<width>.<ext>, so an edited source image
+    gets fresh variants and unchanged ones are never re-encoded.
+    """
+    source = Path(source)
+    GENERATED_DIR.mkdir(parents=True, exist_ok=True)
+    digest = content_hash(source)
+
+    formats = [("webp", "WEBP", "image/webp", {"quality": WEBP_QUALITY, "method": 4})]
+    if AVIF_SUPPORTED:
+        formats.append(("avif", "AVIF", "image/avif", {"quality": AVIF_QUALITY, "speed": AVIF_SPEED}))
+
+    variants: Dict[str, List[ImageVariant]] = {ext: [] for ext, _, _, _ in formats}
+    with Image.open(source) as original:
+        original_width, original_height = original.size
+        targets = sorted({min(width, original_width) for width in widths})
+
+        for width in targets:
+            height = round(original_height * width / original_width)
+            resized = None
+            for ext, fmt, mime, options in formats:
+                target = GENERATED_DIR / f"{source.stem}-{digest}-{width}.{ext}"
+                if not target.exists():
+                    if resized is None:
+                        resized = original.convert("RGB").resize((width, height), Image.Resampling.LANCZOS)
+                    _encode(resized, target, fmt, options)
+                variants[ext].append(ImageVariant(target, width, height, mime))
+
+    return ResponsiveImage(
+        name=source.stem,
+        webp=tuple(variants["webp"]),
+        avif=tuple(variants.get("avif", ())),
+    )
+
+
+def build_all_variants(sources=LANDING_IMAGES) -> Dict[str, ResponsiveImage]:
+    """Build variants for several images, keyed by file stem"""
+    images = {}
+    for source in sources:
+        image = build_variants(ASSETS_DIR / source)
+        images[image.name] = image
+    return images
+
+
+# ==================== HTML ====================
+
+def _srcset(variants) -> str:
+    return ", ".join(f"{variant.url} {variant.width}w" for variant in variants)
+
+
+def picture_html(
+    image: ResponsiveImage,
+    alt: str,
+    css_class: str,
+    sizes: str = "100vw",
+    use_static_urls: bool = True,
+    eager: bool = False,
+) -> str:
+    """
+    Lazy-loading <picture> element for ``image``.
+
+    With static serving the browser picks a variant by URL and caches it across
+    reruns. Without it only the mid-size WebP is inlined as a data URI.
+    """
+    fallback = image.webp[len(image.webp) // 2]
+    sources = ""
+    if use_static_urls:
+        if image.avif:
+            sources = f'<source type="image/avif" srcset="{_srcset(image.avif)}" sizes="{sizes}">'
+        img_attrs = f'src="{fallback.url}" srcset="{_srcset(image.webp)}" sizes="{sizes}"'
+    else:
+        img_attrs = f'src="{fallback.data_uri()}"'
+
+    loading = "eager" if eager else "lazy"
+    return (
+        f'<picture>{sources}'
+        f'<img class="{css_class}" {img_attrs} width="{fallback.width}" height="{fallback.height}" '
+        f'alt="{alt}" loading="{loading}" decoding="async" />'
+        f'</picture>'
+    )
+
+
+def fullscreen_src(image: ResponsiveImage, use_static_urls: bool = True) -> str:
+    """Source for the fullscreen modal: the largest variant, fetched on demand"""
+    if use_static_urls:
+        return image.largest.url
+    return image.webp[len(image.webp) // 2].data_uri()
+
+
+def static_serving_enabled() -> bool:
+    """Whether Streamlit serves ./static (server.enableStaticServing)"""
+    import streamlit as st
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+if __name__ == "__main__":
+    # Pre-build the variants at deploy time so the first visitor does not pay for encoding
+    for name, image in build_all_variants().items():
+        print(f"✓ {name}: {len(image.webp) + len(image.avif)} variants, {image.total_bytes / 1024:,.0f} KB")
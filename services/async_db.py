@@ -0,0 +1,377 @@
+"""
+Async Database Service for ChurnGuard
+asyncio counterpart of services/db.py on a psycopg 3 AsyncConnectionPool, so a
+page's independent queries run concurrently and the page waits only for the
+slowest one instead of the sum of all round trips.
+
+The pool lives on one background event loop per process; Streamlit scripts
+stay synchronous and call ``fetch_all`` / ``run_sync``:
+
+    data = fetch_all(kpis=fetch_kpis(), reasons=fetch_churn_reasons(), risk=fetch_model_risk())
+"""
+
+import asyncio
+import atexit
+import copy
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from services import db as sync_db
+from services.cache import cached_call, make_key
+from services.engines import connect_options
+from services.instrumentation import QueryRecord, estimate_bytes, get_query_metrics
+
+logger = logging.getLogger("churnguard.db")
+
+RUN_SYNC_TIMEOUT = float(os.getenv('DB_ASYNC_TIMEOUT', '60'))
+
+
+# ==================== EVENT LOOP ====================
+
+class _LoopThread:
+    """A daemon thread running the event loop the async pool is bound to"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="churnguard-async-db", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro: Awaitable) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+_loop_thread: Optional[_LoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop_thread() -> _LoopThread:
+    global _loop_thread
+    if _loop_thread is None:
+        with _loop_lock:
+            if _loop_thread is None:
+                _loop_thread = _LoopThread()
+    return _loop_thread
+
+
+# Queries timed on the loop for a run_sync caller: (query, params, seconds, rows, bytes, error)
+_pending_queries: ContextVar[Optional[List[Tuple]]] = ContextVar("churnguard_pending_queries", default=None)
+
+
+async def _collecting(coro: Awaitable, pending: List[Tuple]) -> Any:
+    # tasks spawned by coro (gather, to_thread -> run_coroutine_threadsafe) inherit the list
+    _pending_queries.set(pending)
+    return await coro
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = RUN_SYNC_TIMEOUT) -> Any:
+    """
+    Run ``coro`` on the service loop and block the calling (script) thread for
+    its result. The queries it ran are recorded on the calling thread, so
+    thread_query_totals (and the render profiler) attribute their time to it.
+    """
+    pending: List[Tuple] = []
+    try:
+        return _get_loop_thread().submit(_collecting(coro, pending)).result(timeout)
+    finally:
+        metrics = get_query_metrics()
+        for query, params, seconds, rows, nbytes, error in pending[:]:
+            metrics.observe(query, params, seconds, rows, nbytes, error)
+
+
+# ==================== SERVICE ====================
+
+class AsyncDatabaseService:
+    """Async mirror of DatabaseService: same methods, same caching and instrumentation"""
+
+    def __init__(self):
+        db_url = os.getenv("DATABASE_URL")
+        if db_url:
+            conninfo = db_url
+        else:
+            conninfo = make_conninfo(
+                host=os.getenv('DB_HOST', 'localhost'),
+                port=os.getenv('DB_PORT', '5432'),
+                dbname=os.getenv('DB_NAME', 'telecom_churn_analytics'),
+                user=os.getenv('DB_USER', 'postgres'),
+                password=os.getenv('DB_PASSWORD', 'root')
+            )
+
+        self.pool = AsyncConnectionPool(
+            conninfo,
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            max_idle=float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            kwargs=connect_options(),
+            open=False,
+            name="churnguard-async"
+        )
+        self.metrics = get_query_metrics()
+        self._opened = False
+        self._open_lock = asyncio.Lock()
+
+    async def open(self):
+        if not self._opened:
+            async with self._open_lock:
+                if not self._opened:
+                    await self.pool.open()
+                    self._opened = True
+                    logger.info("Async database pool opened")
+
+    async def close(self):
+        if self._opened:
+            await self.pool.close()
+            self._opened = False
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.get_stats()
+
+    @contextmanager
+    def _track(self, query: str, params: tuple = None):
+        """metrics.track, deferred to the run_sync caller's thread when there is one"""
+        pending = _pending_queries.get()
+        if pending is None:
+            with self.metrics.track(query, params) as record:
+                yield record
+            return
+
+        record = QueryRecord()
+        started = time.perf_counter()
+        error = False
+        try:
+            yield record
+        except BaseException:
+            error = True
+            raise
+        finally:
+            pending.append((query, params, time.perf_counter() - started, record.rows, record.bytes, error))
+
+    async def execute_query(self, query: str, params: tuple = None,
+                            cache_ttl: Optional[float] = None, cache_tags: tuple = ()) -> List[Dict]:
+        """
+        Execute a SELECT query and return results. With ``cache_ttl`` the rows go
+        through the shared result cache under the same key and single-flight lease
+        as DatabaseService.execute_query, so sync and async callers share entries.
+        """
+        if cache_ttl is not None:
+            loop = asyncio.get_running_loop()
+
+            def compute():
+                return asyncio.run_coroutine_threadsafe(self.execute_query(query, params), loop).result()
+
+            # SQLite I/O and lease waits block: they run on a worker thread, the
+            # query itself back on this loop
+            return await asyncio.to_thread(
+                cached_call, make_key(query, params), compute, ttl=cache_ttl, tags=cache_tags
+            )
+
+        await self.open()
+        with self._track(query, params) as record:
+            async with self.pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    columns = [column.name for column in cursor.description]
+                    rows = await cursor.fetchall()
+            record.rows = len(rows)
+            record.bytes = estimate_bytes(rows)
+        return [dict(zip(columns, row)) for row in rows]
+
+    async def execute_dataframe(self, query: str, params: tuple = None, **read_csv_kwargs) -> pd.DataFrame:
+        """COPY ... TO STDOUT into pandas' C CSV reader, as DatabaseService.execute_dataframe"""
+        await self.open()
+        buffer = io.BytesIO()
+        with self._track(query, params) as record:
+            async with self.pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    select_sql = query.strip().rstrip(';')
+                    await cursor.execute(f"SELECT * FROM ({select_sql}) AS result LIMIT 0", params)
+                    description = cursor.description
+                    statement = f"COPY ({select_sql}) TO STDOUT WITH ({sync_db.COPY_OPTIONS})"
+                    async with cursor.copy(statement, params) as copy_out:
+                        async for data in copy_out:
+                            buffer.write(data)
+
+            buffer.seek(0)
+            df = pd.read_csv(buffer, **sync_db.copy_read_options(description, read_csv_kwargs))
+            df = sync_db.apply_column_types(df, description, read_csv_kwargs)
+            record.rows = len(df)
+            record.bytes = buffer.getbuffer().nbytes
+        return df
+
+    async def stream_query(self, query: str, params: tuple = None, itersize: int = 10000) -> AsyncIterator[pd.DataFrame]:
+        """Server-side cursor yielding DataFrame chunks of at most ``itersize`` rows"""
+        await self.open()
+        with self._track(query, params) as record:
+            async with self.pool.connection() as conn:
+                async with conn.cursor(name=f"churnguard_stream_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = itersize
+                    await cursor.execute(query, params)
+
+                    rows = await cursor.fetchmany(itersize)
+                    columns = [column.name for column in cursor.description]
+                    while rows:
+                        record.rows += len(rows)
+                        record.bytes += estimate_bytes(rows)
+                        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                        rows = await cursor.fetchmany(itersize)
+
+    async def execute_single(self, query: str, params: tuple = None) -> Optional[Dict]:
+        results = await self.execute_query(query, params)
+        return results[0] if results else None
+
+
+# The pool is bound to the service loop, so the service is created (and used) there
+_async_db_service: Optional[AsyncDatabaseService] = None
+
+
+def get_async_db_service() -> AsyncDatabaseService:
+    """Get or create the async service; call from coroutines running on the service loop"""
+    global _async_db_service
+    if _async_db_service is None:
+        _async_db_service = AsyncDatabaseService()
+    return _async_db_service
+
+
+@atexit.register
+def close_async_db_service():
+    global _async_db_service, _loop_thread
+    if _loop_thread is None:
+        return
+    if _async_db_service is not None:
+        try:
+            run_sync(_async_db_service.close(), timeout=5)
+        except Exception:
+            pass
+        _async_db_service = None
+    _loop_thread.stop()
+    _loop_thread = None
+
+
+# ==================== GATHER ====================
+
+async def gather(**calls: Awaitable) -> Dict[str, Any]:
+    """
+    Await every call concurrently (each on its own pooled connection) and return
+    {name: result} once the slowest has finished. The fetch_* coroutines below
+    never raise; a failing raw query re-raises after all calls complete.
+    """
+    names = list(calls)
+    results = await asyncio.gather(*calls.values(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(names, results))
+
+
+def fetch_all(timeout: Optional[float] = RUN_SYNC_TIMEOUT, **calls: Awaitable) -> Dict[str, Any]:
+    """Sync entry point for Streamlit scripts: ``gather(**calls)`` on the service loop"""
+    return run_sync(gather(**calls), timeout)
+
+
+# ==================== KPI QUERIES ====================
+# Same queries, shaping and fallbacks as the fetch_* functions in services/db.py
+
+_snapshot_lock: Optional[asyncio.Lock] = None
+
+
+async def get_dashboard_snapshot():
+    """The process dashboard snapshot (shared with services/snapshot.py), fetched at most once at a time"""
+    global _snapshot_lock
+    from services.cache import tag_generation
+    from services.snapshot import (SNAPSHOT_CACHE_TAG, SNAPSHOT_QUERY, SNAPSHOT_TTL_SECONDS,
+                                   cached_dashboard_snapshot, snapshot_from_rows, store_dashboard_snapshot)
+
+    # the freshness checks read tag generations from SQLite: off the loop
+    snapshot = await asyncio.to_thread(cached_dashboard_snapshot)
+    if snapshot is not None:
+        return snapshot
+
+    if _snapshot_lock is None:
+        _snapshot_lock = asyncio.Lock()
+    async with _snapshot_lock:
+        snapshot = await asyncio.to_thread(cached_dashboard_snapshot)
+        if snapshot is None:
+            generation = await asyncio.to_thread(tag_generation, SNAPSHOT_CACHE_TAG)
+            rows = await get_async_db_service().execute_query(
+                SNAPSHOT_QUERY,
+                cache_ttl=SNAPSHOT_TTL_SECONDS,
+                cache_tags=(SNAPSHOT_CACHE_TAG,)
+            )
+            snapshot = store_dashboard_snapshot(snapshot_from_rows(rows, generation))
+    return snapshot
+
+
+async def fetch_kpis() -> Dict[str, Any]:
+    try:
+        return sync_db.kpis_from_snapshot(await get_dashboard_snapshot())
+    except Exception as e:
+        print(f"❌ Error fetching KPIs: {str(e)}")
+        print("⚠ Using fallback dashboard data...")
+        return copy.deepcopy(sync_db.FALLBACK_KPIS)
+
+
+async def fetch_segment_data() -> Dict[str, Any]:
+    try:
+        return sync_db.segments_from_snapshot(await get_dashboard_snapshot())
+    except Exception as e:
+        print(f"Error fetching segment data: {str(e)}")
+        return copy.deepcopy(sync_db.FALLBACK_SEGMENTS)
+
+
+async def fetch_regional_data() -> Dict[str, Any]:
+    try:
+        return sync_db.regions_from_snapshot(await get_dashboard_snapshot())
+    except Exception as e:
+        print(f"Error fetching regional data: {str(e)}")
+        return copy.deepcopy(sync_db.FALLBACK_REGIONS)
+
+
+async def fetch_revenue_breakdown() -> Dict[str, float]:
+    try:
+        from services.rollups import REVENUE_BY_CHANNEL, route_query
+
+        # the rollup status lookup is a cached sync query: keep it off the loop
+        query, tags = await asyncio.to_thread(route_query, REVENUE_BY_CHANNEL, sync_db.REVENUE_BREAKDOWN_QUERY)
+        rows = await get_async_db_service().execute_query(query, cache_ttl=sync_db.QUERY_CACHE_TTL, cache_tags=tags)
+        return sync_db.revenue_from_rows(rows)
+    except Exception as e:
+        print(f"Error fetching revenue breakdown: {str(e)}")
+        return copy.deepcopy(sync_db.FALLBACK_REVENUE)
+
+
+async def fetch_churn_reasons() -> List[Dict[str, Any]]:
+    try:
+        return await get_async_db_service().execute_query(
+            sync_db.CHURN_REASONS_QUERY, cache_ttl=sync_db.QUERY_CACHE_TTL, cache_tags=('stg_churn',)
+        )
+    except Exception as e:
+        print(f"Error fetching churn reasons: {str(e)}")
+        return copy.deepcopy(sync_db.FALLBACK_CHURN_REASONS)
+
+
+async def fetch_model_risk() -> Dict[str, Dict[str, Any]]:
+    try:
+        rows = await get_async_db_service().execute_query(
+            sync_db.MODEL_RISK_QUERY, cache_ttl=sync_db.QUERY_CACHE_TTL, cache_tags=('churn_scores',)
+        )
+        return sync_db.model_risk_from_rows(rows)
+    except Exception as e:
+        print(f"Error fetching model risk: {str(e)}")
+        return {}
@@ -0,0 +1,394 @@
+"""
+Shared Result Cache for ChurnGuard
+On-disk SQLite cache shared by every Streamlit worker process on the host.
+Entries are keyed by query and parameters and support TTL, LRU eviction bounded
+by entry count and bytes, single-flight computation (one process fills a
+missing key while the others wait) and tag-based invalidation.
+
+After mart_retention_kpis is refreshed, run:
+    python -m services.cache invalidate mart_retention_kpis
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+CACHE_PATH = Path(os.getenv("CHURNGUARD_CACHE_PATH", BASE_DIR / ".cache" / "churnguard_cache.sqlite3"))
+CACHE_ENABLED = os.getenv("CHURNGUARD_CACHE", "1") != "0"
+DEFAULT_TTL = float(os.getenv("CHURNGUARD_CACHE_TTL", "300"))
+MAX_ENTRIES = int(os.getenv("CHURNGUARD_CACHE_MAX_ENTRIES", "2000"))
+MAX_BYTES = int(os.getenv("CHURNGUARD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LEASE_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    tags TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tag_generations (
+    tag TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+_MISS = object()
+
+
+def make_key(query: str, params: Any = None, namespace: str = "sql") -> str:
+    """Stable key for a query and its parameters"""
+    digest = hashlib.sha256()
+    digest.update(namespace.encode())
+    digest.update(b"\0")
+    digest.update(" ".join(query.split()).encode())
+    digest.update(b"\0")
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+class SharedCache:
+    """SQLite-backed cache safe to use from many threads and processes"""
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+        lease_timeout: float = LEASE_TIMEOUT,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lease_timeout = lease_timeout
+
+        self._local = threading.local()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+        self._owner = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; autocommit, transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ==================== ENTRIES ====================
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(True, value) for a live entry, (False, None) otherwise"""
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, expires_at, last_access FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            self.misses += 1
+            return False, None
+
+        # LRU bookkeeping, throttled so hot keys do not turn every read into a write
+        if now - row[2] > 1.0:
+            self._conn().execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL, tags: Iterable[str] = (),
+            generations: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Store ``value``. With ``generations`` (from ``generations(tags)`` taken
+        before the value was computed) the write is skipped if any of those tags
+        was invalidated in the meantime, so a fill racing an invalidation cannot
+        store pre-invalidation rows. Returns whether the entry was written.
+        """
+        tags = tuple(tags)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        tag_text = "|" + "|".join(tags) + "|"
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # checked inside the write transaction: invalidate() cannot interleave
+            if generations is not None and self._generations(conn, generations) != generations:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, tags, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, tag_text, len(blob), now + ttl, now)
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # drop least recently used entries until both bounds hold
+        excess_entries = max(count - self.max_entries, 0)
+        excess_bytes = max(total - self.max_bytes, 0)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of ``tags`` and bump their generations"""
+        conn = self._conn()
+        removed = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for tag in tags:
+                removed += conn.execute(
+                    "DELETE FROM entries WHERE tags LIKE ?", (f"%|{tag}|%",)
+                ).rowcount
+                conn.execute(
+                    "INSERT INTO tag_generations (tag, generation) VALUES (?, 1) "
+                    "ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+                    (tag,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def generation(self, tag: str) -> int:
+        """Counter bumped on every invalidation of ``tag`` (for in-process caches layered on top)"""
+        row = self._conn().execute(
+            "SELECT generation FROM tag_generations WHERE tag = ?", (tag,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        """{tag: generation} for ``tags``, to pass to ``set`` after computing a value"""
+        return self._generations(self._conn(), tags)
+
+    @staticmethod
+    def _generations(conn, tags: Iterable[str]) -> Dict[str, int]:
+        tags = list(tags)
+        found = dict(conn.execute(
+            f"SELECT tag, generation FROM tag_generations WHERE tag IN ({', '.join('?' * len(tags))})", tags
+        ).fetchall()) if tags else {}
+        return {tag: found.get(tag, 0) for tag in tags}
+
+    # ==================== SINGLE-FLIGHT ====================
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _acquire_lease(self, key: str) -> bool:
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (key, self._owner, now + self.lease_timeout, now)
+        )
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key: str):
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner))
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float = DEFAULT_TTL,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Return the cached value for ``key`` or compute and store it. Only one
+        thread per process and one process per host computes a missing key;
+        the rest wait for its result (up to the lease timeout). Exceptions from
+        ``compute`` are not cached, nor are values computed while one of ``tags``
+        was being invalidated (they are returned to this caller only).
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        with self._key_lock(key):
+            hit, value = self.get(key)
+            if hit:
+                return value
+
+            deadline = time.time() + self.lease_timeout
+            leased = self._acquire_lease(key)
+            while not leased and time.time() < deadline:
+                time.sleep(0.05)
+                hit, value = self.get(key)
+                if hit:
+                    return value
+                leased = self._acquire_lease(key)
+
+            try:
+                tags = tuple(tags)
+                generations = self.generations(tags)
+                value = compute()
+                # the value is computed: a failing store or lease release must not
+                # make the caller compute it again
+                try:
+                    if self.set(key, value, ttl, tags, generations=generations):
+                        self.fills += 1
+                except sqlite3.Error as e:
+                    print(f"⚠ Result cache store failed: {str(e)}")
+                return value
+            finally:
+                if leased:
+                    try:
+                        self._release_lease(key)
+                    except sqlite3.Error as e:
+                        # the lease expires on its own after lease_timeout
+                        print(f"⚠ Result cache lease release failed: {str(e)}")
+
+    # ==================== STATS ====================
+
+    def stats(self) -> Dict[str, Any]:
+        count, total, live = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(expires_at > ?), 0) FROM entries",
+            (time.time(),)
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.path),
+            'entries': count,
+            'live_entries': live,
+            'bytes': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'fills': self.fills,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ==================== PROCESS SINGLETON ====================
+
+_cache: Optional[SharedCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[SharedCache]:
+    """The process-wide cache, or None when CHURNGUARD_CACHE=0 or the file is unusable"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = SharedCache()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"⚠ Result cache disabled: {str(e)}")
+                    return None
+    return _cache
+
+
+def cached_call(key: str, compute: Callable[[], Any], ttl: float = DEFAULT_TTL, tags: Iterable[str] = ()) -> Any:
+    """
+    get_or_compute through the shared cache; falls back to ``compute`` if the
+    cache is unavailable or its lookup fails. ``compute`` runs at most once:
+    errors after it has started (including its own) are raised as is.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return compute()
+
+    started = False
+
+    def tracked():
+        nonlocal started
+        started = True
+        return compute()
+
+    try:
+        return cache.get_or_compute(key, tracked, ttl, tags)
+    except sqlite3.Error as e:
+        if started:
+            raise
+        print(f"⚠ Result cache error, querying directly: {str(e)}")
+        return compute()
+
+
+def invalidate(*tags: str) -> int:
+    """Invalidate ``tags`` in the shared cache (no-op when disabled)"""
+    cache = get_result_cache()
+    return cache.invalidate(*tags) if cache is not None else 0
+
+
+def tag_generation(tag: str) -> int:
+    cache = get_result_cache()
+    if cache is None:
+        return 0
+    try:
+        return cache.generation(tag)
+    except sqlite3.Error:
+        return 0
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    cache = SharedCache()
+
+    if command == "invalidate" and len(sys.argv) > 2:
+        removed = cache.invalidate(*sys.argv[2:])
+        print(f"✓ Invalidated {', '.join(sys.argv[2:])}: {removed} entries removed")
+    elif command == "clear":
+        cache.clear()
+        print(f"✓ Cleared {cache.path}")
+    elif command == "stats":
+        for name, value in cache.stats().items():
+            print(f"{name}: {value}")
+    else:
+        print("Usage: python -m services.cache [stats | clear | invalidate TAG [TAG ...]]")
+        sys.exit(1)
@@ -3,11 +3,94 @@ Database Service for ChurnGuard
 Handles all PostgreSQL database interactions
 """
 
+import io
 import os
+import atexit
+import copy
+import logging
+import threading
+import uuid
+import numpy as np
+import pandas as pd
 import psycopg2
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+
+from services.cache import cached_call, make_key
+from services.engines import connect_options, get_engine as get_shared_engine
+from services.instrumentation import estimate_bytes, get_query_metrics, start_metrics_server
+from services.pool import ConnectionPool
+
+logger = logging.getLogger("churnguard.db")
+
+# Shared-cache TTL for the dashboard fetch_* queries
+QUERY_CACHE_TTL = float(os.getenv('DB_QUERY_CACHE_TTL', '300'))
+
+# ==================== COPY → DATAFRAME TYPES ====================
+# COPY ... CSV writes every value as text; these PostgreSQL type OIDs (from
+# cursor.description) decide how each column is read back, so execute_dataframe
+# returns what pd.read_sql did instead of whatever the CSV reader infers
+PG_BOOL_OIDS = {16}
+PG_INT_OIDS = {20, 21, 23, 26}
+PG_FLOAT_OIDS = {700, 701, 1700}
+PG_DATE_OIDS = {1082}
+PG_TIMESTAMP_OIDS = {1114}
+PG_TIMESTAMPTZ_OIDS = {1184}
+
+# NULL marker for COPY, so empty strings stay ''; a text value that is literally \N
+# is the one value still read back as NULL
+COPY_NULL = r"\N"
+COPY_OPTIONS = f"FORMAT csv, HEADER true, NULL '{COPY_NULL}'"
+
+
+def copy_read_options(description, read_csv_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    pd.read_csv arguments for a COPY result with the given cursor.description.
+    Integers are left to inference (int64, or float64 with NULLs, as read_sql),
+    float and numeric columns are float64, everything else is read as text and
+    converted by ``apply_column_types``. Caller arguments take precedence.
+    """
+    dtype: Dict[str, Any] = {}
+    for column in description:
+        if column.type_code in PG_FLOAT_OIDS:
+            dtype[column.name] = "float64"
+        elif column.type_code not in PG_INT_OIDS:
+            dtype[column.name] = object
+
+    options = dict(read_csv_kwargs)
+    requested = options.get("dtype")
+    if isinstance(requested, dict):
+        options["dtype"] = {**dtype, **requested}
+    elif requested is None:
+        options["dtype"] = dtype
+    options.setdefault("keep_default_na", False)
+    options.setdefault("na_values", [COPY_NULL])
+    return options
+
+
+def apply_column_types(df: pd.DataFrame, description, read_csv_kwargs: Dict[str, Any]) -> pd.DataFrame:
+    """Convert boolean, date and timestamp columns read as text by ``copy_read_options``"""
+    requested = read_csv_kwargs.get("dtype")
+    explicit = set(read_csv_kwargs.get("converters") or ())
+    explicit |= set(requested) if isinstance(requested, dict) else set(df.columns) if requested is not None else set()
+    parse_dates = read_csv_kwargs.get("parse_dates")
+    if isinstance(parse_dates, (list, tuple, dict)):
+        explicit |= set(parse_dates)
+
+    for column in description:
+        name, oid = column.name, column.type_code
+        if name not in df.columns or name in explicit:
+            continue
+        if oid in PG_BOOL_OIDS:
+            df[name] = df[name].map({"t": True, "f": False})
+        elif oid in PG_DATE_OIDS:
+            df[name] = pd.to_datetime(df[name]).dt.date
+        elif oid in PG_TIMESTAMP_OIDS:
+            df[name] = pd.to_datetime(df[name])
+        elif oid in PG_TIMESTAMPTZ_OIDS:
+            df[name] = pd.to_datetime(df[name], utc=True)
+    return df
+
 
 class DatabaseService:
     """Service for database operations"""
@@ -24,38 +107,148 @@ class DatabaseService:
         # If DATABASE_URL is provided, psycopg2.connect will accept it instead
         db_url = os.getenv("DATABASE_URL")
         if db_url:
-            # Try to parse from URL for printing only; keep db_params as fallback
-            print(f"✓ Database configured (via DATABASE_URL)")
+            logger.info("Database configured (via DATABASE_URL)")
         else:
-            print(f"✓ Database configured: {self.db_params['user']}@{self.db_params['host']}:{self.db_params['port']}/{self.db_params['database']}")
+            logger.info("Database configured: %s@%s:%s/%s", self.db_params['user'], self.db_params['host'],
+                        self.db_params['port'], self.db_params['database'])
+
+        pool_params = {} if db_url else self.db_params
+        self.pool = ConnectionPool(
+            dsn=db_url,
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            max_idle=float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+            checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            **pool_params,
+            **connect_options()
+        )
+        self.metrics = get_query_metrics()
+
+        metrics_port = os.getenv('DB_METRICS_PORT')
+        if metrics_port:
+            start_metrics_server(int(metrics_port), pool_stats=self.pool_stats)
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """Context manager that checks a pooled connection out and returns it afterwards"""
         conn = None
+        discard = False
         try:
-            database_url = os.getenv("DATABASE_URL")
-            if database_url:
-                conn = psycopg2.connect(database_url)
-            else:
-                conn = psycopg2.connect(**self.db_params)
+            conn = self.pool.getconn()
             yield conn
             conn.commit()
         except Exception as e:
             if conn:
-                conn.rollback()
-            print(f"❌ Database connection error: {str(e)}")
+                discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)) or bool(conn.closed)
+                if not conn.closed:
+                    conn.rollback()
+            logger.error("Database connection error: %s", e)
             raise e
         finally:
             if conn:
-                conn.close()
+                self.pool.putconn(conn, discard=discard)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool metrics (checkouts, wait time, connections created)"""
+        return self.pool.stats()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
 
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
-        """Execute a SELECT query and return results"""
+    def explain_analyze(self, query, params: tuple = None) -> str:
+        """
+        Text EXPLAIN (ANALYZE, BUFFERS) of ``query``. The query really runs, so the
+        transaction is rolled back. Used to capture plans of slow queries.
+        """
         with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
+            try:
+                with conn.cursor() as cursor:
+                    if isinstance(query, bytes):
+                        query = query.decode()
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                conn.rollback()
+
+    def execute_query(self, query: str, params: tuple = None,
+                      cache_ttl: Optional[float] = None, cache_tags: tuple = ()) -> List[Dict]:
+        """
+        Execute a SELECT query and return results.
+        With ``cache_ttl`` the rows go through the shared result cache (services/cache.py),
+        keyed by query and params and invalidated by any of ``cache_tags``.
+        """
+        if cache_ttl is not None:
+            return cached_call(
+                make_key(query, params),
+                lambda: self.execute_query(query, params),
+                ttl=cache_ttl,
+                tags=cache_tags
+            )
+
+        with self.metrics.track(query, params, explain=self.explain_analyze) as record:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    columns = [column.name for column in cursor.description]
+                    rows = cursor.fetchall()
+            record.rows = len(rows)
+            record.bytes = estimate_bytes(rows)
+            return [dict(zip(columns, row)) for row in rows]
+
+    def execute_dataframe(self, query: str, params: tuple = None, **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Execute a SELECT query and return a DataFrame built column-wise.
+
+        The result is streamed with COPY ... TO STDOUT and parsed by pandas' C CSV reader,
+        so no Python object is created per row or per cell. Column types come from the
+        query's result description (a LIMIT 0 round trip): NULL stays distinct from '',
+        booleans, dates and timestamps are parsed and text is never coerced to numbers.
+        Extra keyword arguments (dtype, parse_dates, usecols, ...) are passed to pd.read_csv
+        and override that mapping for the columns they name.
+        """
+        buffer = io.BytesIO()
+        with self.metrics.track(query, params, explain=self.explain_analyze) as record:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    select_sql = cursor.mogrify(query.strip().rstrip(';'), params)
+                    cursor.execute(b"SELECT * FROM (" + select_sql + b") AS result LIMIT 0")
+                    description = cursor.description
+                    cursor.copy_expert(b"COPY (" + select_sql + b") TO STDOUT WITH (" + COPY_OPTIONS.encode() + b")",
+                                       buffer)
+
+            buffer.seek(0)
+            df = pd.read_csv(buffer, **copy_read_options(description, read_csv_kwargs))
+            df = apply_column_types(df, description, read_csv_kwargs)
+            record.rows = len(df)
+            record.bytes = buffer.getbuffer().nbytes
+        return df
+
+    def execute_columnar(self, query: str, params: tuple = None, **read_csv_kwargs) -> Dict[str, np.ndarray]:
+        """Execute a SELECT query and return one NumPy array per result column"""
+        df = self.execute_dataframe(query, params, **read_csv_kwargs)
+        return {column: df[column].to_numpy() for column in df.columns}
+
+    def stream_query(self, query: str, params: tuple = None, itersize: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Execute a SELECT query on a server-side (named) cursor and yield DataFrame chunks
+        of at most ``itersize`` rows, keeping memory bounded for large results
+        """
+        # timed from execute to the last chunk, so consumer time between chunks is included
+        with self.metrics.track(query, params) as record:
+            with self.get_connection() as conn:
+                with conn.cursor(name=f"churnguard_stream_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+
+                    rows = cursor.fetchmany(itersize)
+                    columns = [column.name for column in cursor.description]
+                    while rows:
+                        record.rows += len(rows)
+                        record.bytes += estimate_bytes(rows)
+                        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                        rows = cursor.fetchmany(itersize)
 
     def execute_single(self, query: str, params: tuple = None) -> Optional[Dict]:
         """Execute a query and return single result"""
@@ -65,223 +258,272 @@ class DatabaseService:
 
 # Singleton instance
 _db_service = None
+_db_service_lock = threading.Lock()
 
 
 def get_db_service() -> DatabaseService:
     """Get or create database service instance"""
     global _db_service
     if _db_service is None:
-        _db_service = DatabaseService()
+        with _db_service_lock:
+            if _db_service is None:
+                _db_service = DatabaseService()
     return _db_service
 
 
+@atexit.register
+def close_db_service():
+    """Shut down the shared database service and its connection pool"""
+    global _db_service
+    if _db_service is not None:
+        _db_service.close()
+        _db_service = None
+
+
 def get_engine():
     """
-    Return SQLAlchemy engine using DATABASE_URL if present, otherwise build from individual env vars.
+    Return the shared SQLAlchemy engine for DATABASE_URL (or the individual DB_* env vars).
     Used by queries.py which expects get_engine().
     """
-    database_url = os.getenv("DATABASE_URL")
-    if database_url:
-        return create_engine(database_url)
-    else:
-        user = os.getenv('DB_USER', 'postgres')
-        password = os.getenv('DB_PASSWORD', 'root')
-        host = os.getenv('DB_HOST', 'localhost')
-        port = os.getenv('DB_PORT', '5432')
-        dbname = os.getenv('DB_NAME', 'telecom_churn_analytics')
-        url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}"
-        return create_engine(url)
+    return get_shared_engine()
 
 
 # ==================== KPI QUERIES ====================
+# Each fetch_* is split into the query, a pure shaping function and the fallback
+# returned when the database is unavailable, so services/async_db.py can share them.
+
+FALLBACK_KPIS = {
+    "total_customers": 1200000,
+    "churned_customers": 222000,
+    "churn_rate": 18.5,
+    "retention_rate": 81.5,
+    "total_revenue": 1490000000,
+    "revenue_at_risk": 289310000,
+    "arpu": 1241.70
+}
+
+FALLBACK_SEGMENTS = {
+    'Retail': {
+        'count': 1052448,
+        'churn_rate': 19.0,
+        'avg_revenue': 1241.86,
+        'revenue_at_risk': 254300000
+    },
+    'SME': {
+        'count': 147552,
+        'churn_rate': 18.0,
+        'avg_revenue': 1240.51,
+        'revenue_at_risk': 34900000
+    }
+}
+
+FALLBACK_REGIONS = {
+    'South': {'customer_count': 300000, 'churn_rate': 24.63, 'total_revenue': 516220000, 'revenue_at_risk': 102000000},
+    'West': {'customer_count': 300000, 'churn_rate': 25.18, 'total_revenue': 375030000, 'revenue_at_risk': 73000000},
+    'North': {'customer_count': 300000, 'churn_rate': 24.78, 'total_revenue': 372160000, 'revenue_at_risk': 72000000},
+    'East': {'customer_count': 300000, 'churn_rate': 25.40, 'total_revenue': 226630000, 'revenue_at_risk': 43000000}
+}
+
+FALLBACK_REVENUE = {
+    'Online': 4225770000,
+    'Store': 3297930000,
+    'Agent': 1881880000
+}
+
+FALLBACK_CHURN_REASONS = [
+    {'churn_reason': 'Service Quality Issues', 'affected_customers': 71040, 'percentage': 32.0},
+    {'churn_reason': 'Competitive Pricing', 'affected_customers': 62160, 'percentage': 28.0},
+    {'churn_reason': 'Poor Customer Service', 'affected_customers': 53280, 'percentage': 24.0},
+    {'churn_reason': 'Lack of Engagement', 'affected_customers': 35520, 'percentage': 16.0}
+]
+
+
+def kpis_from_snapshot(snapshot) -> Dict[str, Any]:
+    totals = snapshot.totals
+
+    result = {
+        'total_customers': totals.total_customers,
+        'churned_customers': totals.churned_customers,
+        'churn_rate': round(totals.churn_rate, 2),
+        'retention_rate': round(totals.retention_rate, 2),
+        'total_revenue': round(totals.total_revenue, 2),
+        'revenue_at_risk': round(totals.revenue_at_risk, 2)
+    }
+
+    # Calculate ARPU
+    total_customers = result['total_customers'] or 1
+    total_revenue = result['total_revenue'] or 0
+    arpu = round(total_revenue / total_customers, 2) if total_customers else 0
+    result['arpu'] = arpu
+    return result
+
+
+def segments_from_snapshot(snapshot) -> Dict[str, Any]:
+    segments = {}
+    for segment, rollup in sorted(snapshot.segments.items(), key=lambda item: item[1].churn_rate, reverse=True):
+        segments[segment] = {
+            'count': rollup.total_customers,
+            'churn_rate': round(rollup.churn_rate, 2),
+            'avg_revenue': round(rollup.avg_revenue, 2),
+            'revenue_at_risk': round(rollup.revenue_at_risk, 2)
+        }
+    return segments
+
+
+def regions_from_snapshot(snapshot) -> Dict[str, Any]:
+    regions = {}
+    for region, rollup in sorted(snapshot.regions.items(), key=lambda item: item[1].revenue_at_risk, reverse=True):
+        regions[region] = {
+            'customer_count': rollup.total_customers,
+            'churn_rate': round(rollup.churn_rate, 2),
+            'total_revenue': round(rollup.total_revenue, 2),
+            'revenue_at_risk': round(rollup.revenue_at_risk, 2)
+        }
+    return regions
+
 
 def fetch_kpis() -> Dict[str, Any]:
     """
-    Fetch all main KPI metrics from mart_retention_kpis
+    Fetch all main KPI metrics from the dashboard snapshot of mart_retention_kpis
 
     Returns:
         Dictionary containing aggregated KPI values
     """
     try:
-        db = get_db_service()
+        from services.snapshot import get_dashboard_snapshot
 
-        query = """
-        SELECT 
-            SUM(total_customers) as total_customers,
-            SUM(churned_customers) as churned_customers,
-            ROUND(AVG(churn_rate), 2) as churn_rate,
-            ROUND(AVG(retention_rate), 2) as retention_rate,
-            ROUND(SUM(total_revenue)::numeric, 2) as total_revenue,
-            ROUND(SUM(revenue_at_risk)::numeric, 2) as revenue_at_risk
-        FROM mart_retention_kpis
-        """
+        result = kpis_from_snapshot(get_dashboard_snapshot())
+        print(f"✓ KPIs loaded: {int(result.get('total_customers', 0)):,} customers, {result.get('churn_rate')}% churn")
 
-        result = db.execute_single(query)
-
-        if result:
-            # Calculate ARPU
-            total_customers = result['total_customers'] or 1
-            total_revenue = result['total_revenue'] or 0
-            arpu = round(total_revenue / total_customers, 2) if total_customers else 0
-            result['arpu'] = arpu
-            print(f"✓ KPIs loaded: {int(result.get('total_customers', 0)):,} customers, {result.get('churn_rate')}% churn")
-
-        return result if result else {}
+        return result
 
     except Exception as e:
         print(f"❌ Error fetching KPIs: {str(e)}")
         print("⚠ Using fallback dashboard data...")
-        return {
-            "total_customers": 1200000,
-            "churned_customers": 222000,
-            "churn_rate": 18.5,
-            "retention_rate": 81.5,
-            "total_revenue": 1490000000,
-            "revenue_at_risk": 289310000,
-            "arpu": 1241.70
-        }
+        return copy.deepcopy(FALLBACK_KPIS)
 
 
 def fetch_segment_data() -> Dict[str, Any]:
     try:
-        db = get_db_service()
+        from services.snapshot import get_dashboard_snapshot
 
-        query = """
-        SELECT 
-            customer_segment,
-            SUM(total_customers) as customer_count,
-            ROUND(AVG(churn_rate), 2) as churn_rate,
-            ROUND(AVG(total_revenue / NULLIF(total_customers, 0)), 2) as avg_revenue,
-            ROUND(SUM(revenue_at_risk)::numeric, 2) as revenue_at_risk
-        FROM mart_retention_kpis
-        GROUP BY customer_segment
-        ORDER BY churn_rate DESC
-        """
-
-        results = db.execute_query(query)
-
-        segments = {}
-        for row in results:
-            segments[row['customer_segment']] = {
-                'count': row['customer_count'],
-                'churn_rate': float(row['churn_rate']),
-                'avg_revenue': float(row['avg_revenue'] or 0),
-                'revenue_at_risk': float(row['revenue_at_risk'])
-            }
-
-        return segments
+        return segments_from_snapshot(get_dashboard_snapshot())
 
     except Exception as e:
         print(f"Error fetching segment data: {str(e)}")
-        return {
-            'Retail': {
-                'count': 1052448,
-                'churn_rate': 19.0,
-                'avg_revenue': 1241.86,
-                'revenue_at_risk': 254300000
-            },
-            'SME': {
-                'count': 147552,
-                'churn_rate': 18.0,
-                'avg_revenue': 1240.51,
-                'revenue_at_risk': 34900000
-            }
-        }
+        return copy.deepcopy(FALLBACK_SEGMENTS)
 
 
 def fetch_regional_data() -> Dict[str, Any]:
     try:
-        db = get_db_service()
+        from services.snapshot import get_dashboard_snapshot
 
-        query = """
-        SELECT 
-            region,
-            SUM(total_customers) as customer_count,
-            ROUND(AVG(churn_rate), 2) as churn_rate,
-            ROUND(SUM(total_revenue)::numeric, 2) as total_revenue,
-            ROUND(SUM(revenue_at_risk)::numeric, 2) as revenue_at_risk
-        FROM mart_retention_kpis
-        GROUP BY region
-        ORDER BY revenue_at_risk DESC
-        """
+        return regions_from_snapshot(get_dashboard_snapshot())
+
+    except Exception as e:
+        print(f"Error fetching regional data: {str(e)}")
+        return copy.deepcopy(FALLBACK_REGIONS)
 
-        results = db.execute_query(query)
 
-        regions = {}
-        for row in results:
-            regions[row['region']] = {
-                'customer_count': row['customer_count'],
-                'churn_rate': float(row['churn_rate']),
-                'total_revenue': float(row['total_revenue']),
-                'revenue_at_risk': float(row['revenue_at_risk'])
-            }
+REVENUE_BREAKDOWN_QUERY = """
+SELECT 
+    dc.acquisition_channel,
+    ROUND(SUM(fb.monthly_charges)::numeric, 2) as channel_revenue
+FROM stg_billing fb
+JOIN stg_customers dc ON fb.customer_id = dc.customer_id
+GROUP BY dc.acquisition_channel
+ORDER BY channel_revenue DESC
+"""
 
-        return regions
+# One pass over the churned rows: the window total over the grouped counts is the
+# denominator (customers without a reason included, as before), replacing the
+# scalar subquery that scanned stg_churn a second time. churn_flag is compared
+# uncast so the partial index idx_stg_churn_reason_churned applies.
+CHURN_REASONS_QUERY = """
+SELECT churn_reason, affected_customers, percentage
+FROM (
+    SELECT 
+        churn_reason,
+        COUNT(*) as affected_customers,
+        ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 2) as percentage
+    FROM stg_churn
+    WHERE churn_flag = '1'
+    GROUP BY churn_reason
+) reasons
+WHERE churn_reason IS NOT NULL
+ORDER BY percentage DESC
+LIMIT 10
+"""
 
-    except Exception as e:
-        print(f"Error fetching regional data: {str(e)}")
-        return {
-            'South': {'customer_count': 300000, 'churn_rate': 24.63, 'total_revenue': 516220000, 'revenue_at_risk': 102000000},
-            'West': {'customer_count': 300000, 'churn_rate': 25.18, 'total_revenue': 375030000, 'revenue_at_risk': 73000000},
-            'North': {'customer_count': 300000, 'churn_rate': 24.78, 'total_revenue': 372160000, 'revenue_at_risk': 72000000},
-            'East': {'customer_count': 300000, 'churn_rate': 25.40, 'total_revenue': 226630000, 'revenue_at_risk': 43000000}
+
+MODEL_RISK_QUERY = """
+SELECT
+    risk_band,
+    COUNT(*) AS customers,
+    ROUND(SUM(churn_probability * monthly_revenue)::numeric, 2) AS expected_revenue_at_risk,
+    MAX(model_version) AS model_version,
+    MAX(scored_at) AS scored_at
+FROM churn_scores
+GROUP BY risk_band
+"""
+
+
+def revenue_from_rows(rows: List[Dict]) -> Dict[str, float]:
+    return {row['acquisition_channel']: float(row['channel_revenue']) for row in rows}
+
+
+def model_risk_from_rows(rows: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    return {
+        row['risk_band']: {
+            'customers': int(row['customers']),
+            'expected_revenue_at_risk': float(row['expected_revenue_at_risk'] or 0),
+            'model_version': row['model_version'],
+            'scored_at': row['scored_at']
         }
+        for row in rows
+    }
 
 
 def fetch_revenue_breakdown() -> Dict[str, float]:
     try:
-        db = get_db_service()
-
-        query = """
-        SELECT 
-            dc.acquisition_channel,
-            ROUND(SUM(fb.monthly_charges)::numeric, 2) as channel_revenue
-        FROM stg_billing fb
-        JOIN stg_customers dc ON fb.customer_id = dc.customer_id
-        GROUP BY dc.acquisition_channel
-        ORDER BY channel_revenue DESC
-        """
+        from services.rollups import REVENUE_BY_CHANNEL, route_query
 
-        results = db.execute_query(query)
+        db = get_db_service()
 
-        revenue = {}
-        for row in results:
-            revenue[row['acquisition_channel']] = float(row['channel_revenue'])
+        # mv_revenue_by_channel while it is fresh, the full join otherwise
+        query, tags = route_query(REVENUE_BY_CHANNEL, REVENUE_BREAKDOWN_QUERY)
+        results = db.execute_query(query, cache_ttl=QUERY_CACHE_TTL, cache_tags=tags)
 
-        return revenue
+        return revenue_from_rows(results)
 
     except Exception as e:
         print(f"Error fetching revenue breakdown: {str(e)}")
-        return {
-            'Online': 4225770000,
-            'Store': 3297930000,
-            'Agent': 1881880000
-        }
+        return copy.deepcopy(FALLBACK_REVENUE)
 
 
 def fetch_churn_reasons() -> List[Dict[str, Any]]:
     try:
         db = get_db_service()
 
-        query = """
-        SELECT 
-            churn_reason,
-            COUNT(*) as affected_customers,
-            ROUND(100.0 * COUNT(*) / (SELECT COUNT(*) FROM stg_churn WHERE churn_flag = '1'), 2) as percentage
-        FROM stg_churn
-        WHERE churn_flag = '1' AND churn_reason IS NOT NULL
-        GROUP BY churn_reason
-        ORDER BY percentage DESC
-        LIMIT 10
-        """
-
-        return db.execute_query(query)
+        return db.execute_query(CHURN_REASONS_QUERY, cache_ttl=QUERY_CACHE_TTL, cache_tags=('stg_churn',))
 
     except Exception as e:
         print(f"Error fetching churn reasons: {str(e)}")
-        return [
-            {'churn_reason': 'Service Quality Issues', 'affected_customers': 71040, 'percentage': 32.0},
-            {'churn_reason': 'Competitive Pricing', 'affected_customers': 62160, 'percentage': 28.0},
-            {'churn_reason': 'Poor Customer Service', 'affected_customers': 53280, 'percentage': 24.0},
-            {'churn_reason': 'Lack of Engagement', 'affected_customers': 35520, 'percentage': 16.0}
-        ]
+        return copy.deepcopy(FALLBACK_CHURN_REASONS)
+
+
+def fetch_model_risk() -> Dict[str, Dict[str, Any]]:
+    """
+    Model-based risk from churn_scores (written by src/ml/07_score_customers.py):
+    customers and expected monthly revenue at risk (probability x revenue) per band.
+    Empty when no scoring run has been loaded yet.
+    """
+    try:
+        db = get_db_service()
+
+        rows = db.execute_query(MODEL_RISK_QUERY, cache_ttl=QUERY_CACHE_TTL, cache_tags=('churn_scores',))
+        return model_risk_from_rows(rows)
+
+    except Exception as e:
+        print(f"Error fetching model risk: {str(e)}")
+        return {}
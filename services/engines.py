@@ -0,0 +1,96 @@
+"""
+Engine Registry for ChurnGuard
+One SQLAlchemy engine per DSN, shared by services/, pages/ and the ML scripts
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+from services.instrumentation import instrument_engine
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def default_database_url() -> str:
+    """
+    Return DATABASE_URL if present, otherwise build a URL from the individual DB_* env vars
+    """
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return database_url
+
+    user = os.getenv('DB_USER', 'postgres')
+    password = os.getenv('DB_PASSWORD', 'root')
+    host = os.getenv('DB_HOST', 'localhost')
+    port = os.getenv('DB_PORT', '5432')
+    dbname = os.getenv('DB_NAME', 'telecom_churn_analytics')
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}"
+
+
+def connect_options() -> Dict[str, str]:
+    """
+    libpq session settings applied to every connection (SQLAlchemy and psycopg2 pools alike)
+
+    DB_STATEMENT_TIMEOUT_MS=0 disables the server-side statement timeout.
+    """
+    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    return {
+        'application_name': os.getenv('DB_APPLICATION_NAME', 'churnguard'),
+        'options': f"-c statement_timeout={statement_timeout}",
+    }
+
+
+def _registry_key(dsn: str) -> str:
+    # Heroku-style postgres:// URLs are rejected by SQLAlchemy 2.x
+    if dsn.startswith("postgres://"):
+        dsn = "postgresql://" + dsn[len("postgres://"):]
+    url = make_url(dsn)
+    if url.drivername == "postgresql":
+        url = url.set(drivername="postgresql+psycopg2")
+    return url.render_as_string(hide_password=False)
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(
+        url,
+        pool_size=int(os.getenv('DB_ENGINE_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_ENGINE_MAX_OVERFLOW', '5')),
+        pool_recycle=int(os.getenv('DB_ENGINE_POOL_RECYCLE', '1800')),
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        connect_args=connect_options(),
+    )
+    return instrument_engine(engine)
+
+
+def get_engine(dsn: Optional[str] = None) -> Engine:
+    """
+    Return the process-wide engine for ``dsn`` (default: the configured database),
+    creating it on first use
+    """
+    key = _registry_key(dsn or default_database_url())
+
+    engine = _engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _create_engine(key)
+                _engines[key] = engine
+    return engine
+
+
+def dispose_engines():
+    """Dispose every registered engine and close their pooled connections"""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+
+    for engine in engines:
+        engine.dispose()
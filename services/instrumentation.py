@@ -0,0 +1,370 @@
+"""
+Query Instrumentation for ChurnGuard
+Per-fingerprint latency, row and byte counters for every DatabaseService query,
+a slow-query log (optionally with EXPLAIN (ANALYZE, BUFFERS) captured), and a
+Prometheus text rendering of it all for the diagnostics page or a scrape port.
+
+    DB_SLOW_QUERY_MS=500        slow-query threshold
+    DB_SLOW_QUERY_EXPLAIN=1     re-run slow SELECTs under EXPLAIN ANALYZE
+    DB_METRICS_PORT=9464        serve /metrics from each dashboard process
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("churnguard.db")
+slow_logger = logging.getLogger("churnguard.db.slow")
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "0") == "1"
+SLOW_LOG_SIZE = 50
+
+# Prometheus-style latency buckets (seconds)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ==================== FINGERPRINTS ====================
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%\(\w+\)s|%s")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: Any) -> str:
+    """Query text with comments, literals and placeholders collapsed to ?"""
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    text = _COMMENTS.sub(" ", str(query))
+    text = _STRINGS.sub("?", text)
+    text = _PARAMS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    return _SPACE.sub(" ", text).strip().lower()
+
+
+def fingerprint(query: Any) -> Tuple[str, str]:
+    """(12-char id, normalized text) shared by every instance of the same query shape"""
+    normalized = normalize_query(query)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def estimate_bytes(rows: List[Any]) -> int:
+    """Approximate wire size of fetched rows (text length of every value)"""
+    total = 0
+    for row in rows:
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, (bytes, str)):
+                total += len(value)
+            elif isinstance(value, (int, float)):
+                total += 8
+            else:
+                total += len(str(value))
+    return total
+
+
+# ==================== METRICS ====================
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def copy(self) -> "LatencyHistogram":
+        other = LatencyHistogram(self.buckets)
+        other.counts = list(self.counts)
+        other.sum = self.sum
+        other.count = self.count
+        return other
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        pairs = []
+        for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile ``q`` (bucket resolution)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return float("inf") if bound == "+Inf" else float(bound)
+        return float("inf")
+
+
+@dataclass
+class QueryStats:
+    """Counters for one query fingerprint"""
+
+    fingerprint: str
+    query: str
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    bytes: int = 0
+    max_seconds: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.latency.sum / self.calls if self.calls else 0.0
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    fingerprint: str
+    query: str
+    seconds: float
+    rows: int
+    at: float
+    plan: Optional[str] = None
+
+
+class QueryRecord:
+    """Filled in by the caller inside track_query(): rows and bytes fetched"""
+
+    __slots__ = ("rows", "bytes")
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+
+_thread_totals = threading.local()
+
+
+def thread_query_totals() -> Tuple[int, float]:
+    """(queries, seconds) recorded so far on the calling thread, e.g. one Streamlit script run"""
+    return getattr(_thread_totals, "calls", 0), getattr(_thread_totals, "seconds", 0.0)
+
+
+class QueryMetrics:
+    """Process-wide registry of QueryStats plus the recent slow queries"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, explain_slow: bool = SLOW_QUERY_EXPLAIN):
+        self.slow_seconds = slow_ms / 1000
+        self.explain_slow = explain_slow
+        self._stats: Dict[str, QueryStats] = {}
+        self._slow: Deque[SlowQuery] = deque(maxlen=SLOW_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, query, seconds: float, rows: int = 0, nbytes: int = 0, error: bool = False) -> QueryStats:
+        key, normalized = fingerprint(query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats(key, normalized)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.latency.observe(seconds)
+        _thread_totals.calls = getattr(_thread_totals, "calls", 0) + 1
+        _thread_totals.seconds = getattr(_thread_totals, "seconds", 0.0) + seconds
+        return stats
+
+    @contextmanager
+    def track(self, query, params=None, explain: Optional[Callable[[Any, Any], str]] = None):
+        """
+        Time the enclosed query. The caller sets ``record.rows`` / ``record.bytes``.
+        Slow queries are logged, and explained with ``explain(query, params)`` when enabled.
+        """
+        record = QueryRecord()
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            self.observe(query, params, time.perf_counter() - started, error=True)
+            raise
+
+        self.observe(query, params, time.perf_counter() - started, record.rows, record.bytes, explain=explain)
+
+    def observe(self, query, params, seconds: float, rows: int = 0, nbytes: int = 0, error: bool = False,
+                explain: Optional[Callable[[Any, Any], str]] = None):
+        """Record a query timed elsewhere (e.g. on the async loop) and log it if slow"""
+        stats = self.record(query, seconds, rows, nbytes, error)
+        if not error and seconds >= self.slow_seconds:
+            self._log_slow(stats, query, params, seconds, rows, explain)
+
+    def _log_slow(self, stats, query, params, seconds, rows, explain):
+        plan = None
+        if self.explain_slow and explain is not None and stats.query.startswith(("select", "with")):
+            try:
+                plan = explain(query, params)
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+
+        slow_logger.warning(
+            "slow query %s: %.0f ms, %d rows: %s%s",
+            stats.fingerprint, seconds * 1000, rows, stats.query[:300],
+            f"\n{plan}" if plan else ""
+        )
+        with self._lock:
+            self._slow.append(SlowQuery(stats.fingerprint, stats.query, seconds, rows, time.time(), plan))
+
+    # ---------- read side ----------
+
+    def snapshot(self) -> List[QueryStats]:
+        """Point-in-time copies, safe to read while other threads keep recording"""
+        with self._lock:
+            stats = [replace(s, latency=s.latency.copy()) for s in self._stats.values()]
+        return sorted(stats, key=lambda s: s.latency.sum, reverse=True)
+
+    def slow_queries(self) -> List[SlowQuery]:
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+_metrics = QueryMetrics()
+
+
+def get_query_metrics() -> QueryMetrics:
+    return _metrics
+
+
+# ==================== SQLALCHEMY ====================
+
+def instrument_engine(engine, metrics: QueryMetrics = None):
+    """
+    Record every statement run through a SQLAlchemy engine (pd.read_sql, the ML
+    scripts). Latency covers execute only; rows is the driver rowcount and bytes
+    are not measured on this path.
+    """
+    from sqlalchemy import event
+
+    metrics = metrics or _metrics
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        stats = metrics.record(statement, seconds, max(cursor.rowcount, 0))
+        if seconds >= metrics.slow_seconds:
+            metrics._log_slow(stats, statement, parameters, seconds, max(cursor.rowcount, 0), None)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            metrics.record(context.statement or "", time.perf_counter() - started.pop(), error=True)
+
+    return engine
+
+
+# ==================== PROMETHEUS TEXT ====================
+
+def render_prometheus(metrics: QueryMetrics = None, pool_stats: Optional[Dict[str, Any]] = None) -> str:
+    """Prometheus text exposition (format 0.0.4) of the query metrics and pool gauges"""
+    metrics = metrics or _metrics
+    lines = [
+        "# HELP churnguard_db_query_duration_seconds Query latency by fingerprint",
+        "# TYPE churnguard_db_query_duration_seconds histogram",
+    ]
+    snapshot = metrics.snapshot()
+    for stats in snapshot:
+        label = f'fingerprint="{stats.fingerprint}"'
+        for bound, running in stats.latency.cumulative():
+            lines.append(f'churnguard_db_query_duration_seconds_bucket{{{label},le="{bound}"}} {running}')
+        lines.append(f"churnguard_db_query_duration_seconds_sum{{{label}}} {stats.latency.sum:.6f}")
+        lines.append(f"churnguard_db_query_duration_seconds_count{{{label}}} {stats.calls}")
+
+    for name, attr, help_text in (
+        ("churnguard_db_query_rows_total", "rows", "Rows fetched by fingerprint"),
+        ("churnguard_db_query_bytes_total", "bytes", "Approximate bytes fetched by fingerprint"),
+        ("churnguard_db_query_errors_total", "errors", "Failed queries by fingerprint"),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for stats in snapshot:
+            lines.append(f'{name}{{fingerprint="{stats.fingerprint}"}} {getattr(stats, attr)}')
+
+    if pool_stats:
+        lines.append("# HELP churnguard_db_pool Connection pool gauges and counters")
+        lines.append("# TYPE churnguard_db_pool gauge")
+        for key, value in pool_stats.items():
+            if isinstance(value, (int, float)):
+                lines.append(f'churnguard_db_pool{{stat="{key}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+# ==================== SCRAPE ENDPOINT ====================
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, pool_stats: Callable[[], Dict[str, Any]] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics for this process on ``port`` from a daemon thread (once per
+    process). If the port is taken, e.g. by another worker process on the host,
+    the error is logged and None returned; the bind is not retried.
+    """
+    global _server, _server_failed
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(pool_stats=pool_stats() if pool_stats else None).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+            except OSError as e:
+                _server_failed = True
+                logger.warning("Query metrics server not started on :%d: %s", port, e)
+                return None
+            threading.Thread(target=_server.serve_forever, name="db-metrics", daemon=True).start()
+            logger.info("Query metrics served on :%d/metrics", port)
+    return _server
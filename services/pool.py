@@ -0,0 +1,303 @@
+"""
+Connection Pool for ChurnGuard
+Keeps a bounded set of warm psycopg2 connections for DatabaseService
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the checkout timeout"""
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a pool that has been closed"""
+
+
+class _PooledConnection:
+    """A pooled connection plus the bookkeeping needed for recycling"""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool
+
+    Connections are created lazily up to ``max_size`` and handed out LIFO so the
+    warmest connection is reused first. Connections idle longer than ``max_idle``
+    seconds (beyond ``min_size``) or older than ``max_lifetime`` seconds are closed
+    and replaced. A connection that sat idle for more than ``ping_after`` seconds
+    is health-checked with ``SELECT 1`` before it is handed out.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle: float = 300.0,
+        max_lifetime: float = 3600.0,
+        checkout_timeout: float = 30.0,
+        ping_after: float = 5.0,
+        **connect_kwargs: Any
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.dsn = dsn
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._opened = False
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._metrics = {
+            'checkouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+        }
+
+    # ==================== LIFECYCLE ====================
+
+    def open(self):
+        """Pre-create ``min_size`` connections (called lazily on first checkout)"""
+        with self._cond:
+            if self._opened or self._closed:
+                return
+            self._opened = True
+            missing = self.min_size - self._size
+            self._size += missing
+
+        created = []
+        try:
+            for _ in range(missing):
+                created.append(_PooledConnection(self._connect()))
+        finally:
+            with self._cond:
+                self._size -= missing - len(created)
+                self._idle.extend(created)
+                self._cond.notify_all()
+
+    def close(self):
+        """Close idle connections now; in-use connections are closed when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for pooled in idle:
+            self._close_raw(pooled.conn)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    # ==================== CHECKOUT / RETURN ====================
+
+    def getconn(self):
+        """Check out a connection, waiting up to ``checkout_timeout`` seconds"""
+        if not self._opened:
+            self.open()
+
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+
+        while True:
+            pooled = None
+            must_create = False
+
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+
+                    self._reap_idle_locked()
+
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+
+                    if self._size < self.max_size:
+                        self._size += 1
+                        must_create = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.checkout_timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if must_create:
+                try:
+                    pooled = _PooledConnection(self._connect())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(pooled):
+                self._discard(pooled)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[id(pooled.conn)] = pooled
+                self._metrics['checkouts'] += 1
+                self._metrics['wait_time_total'] += waited
+                self._metrics['wait_time_max'] = max(self._metrics['wait_time_max'], waited)
+
+            return pooled.conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool, or close it if broken or ``discard`` is set"""
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+
+        if pooled is None:
+            raise ValueError("Connection does not belong to this pool")
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        now = time.monotonic()
+        expired = now - pooled.created_at > self.max_lifetime
+
+        if discard or conn.closed or expired or self._closed:
+            self._discard(pooled)
+            return
+
+        pooled.last_used = now
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    # ==================== METRICS ====================
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters and current occupancy"""
+        with self._cond:
+            stats = dict(self._metrics)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = len(self._in_use)
+            stats['min_size'] = self.min_size
+            stats['max_size'] = self.max_size
+
+        checkouts = stats['checkouts']
+        stats['wait_time_avg'] = stats['wait_time_total'] / checkouts if checkouts else 0.0
+        return stats
+
+    # ==================== INTERNALS ====================
+
+    def _connect(self):
+        if self.dsn:
+            conn = psycopg2.connect(self.dsn, **self.connect_kwargs)
+        else:
+            conn = psycopg2.connect(**self.connect_kwargs)
+        with self._cond:
+            self._metrics['connections_created'] += 1
+        return conn
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        conn = pooled.conn
+        if conn.closed:
+            return False
+        if time.monotonic() - pooled.last_used < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            with self._cond:
+                self._metrics['health_check_failures'] += 1
+            return False
+
+    def _reap_idle_locked(self):
+        """Close idle connections past ``max_idle``/``max_lifetime`` (caller holds the lock)"""
+        if not self._idle:
+            return
+
+        now = time.monotonic()
+        keep, expired = [], []
+        # Oldest-used connections sit at the front of the LIFO list
+        for pooled in self._idle:
+            too_old = now - pooled.created_at > self.max_lifetime
+            too_idle = now - pooled.last_used > self.max_idle
+            if too_old or (too_idle and self._size - len(expired) > self.min_size):
+                expired.append(pooled)
+            else:
+                keep.append(pooled)
+
+        if expired:
+            self._idle = keep
+            self._size -= len(expired)
+            self._metrics['connections_closed'] += len(expired)
+            for pooled in expired:
+                try:
+                    pooled.conn.close()
+                except psycopg2.Error:
+                    pass
+
+    def _discard(self, pooled: _PooledConnection):
+        self._close_raw(pooled.conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _close_raw(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._metrics['connections_closed'] += 1
@@ -0,0 +1,226 @@
+"""
+Render Profiler for ChurnGuard
+Opt-in per-rerun profiling of main.py and the pages/: wall time of each phase
+(DB queries, model loading, figure construction, HTML), the DB time spent in it
+and the bytes of ForwardMsg payload shipped to the browser. Each rerun is shown
+as a waterfall in the sidebar and appended to a JSONL log.
+
+Enable with CHURNGUARD_PROFILE=1, or per session with ?profile=1 in the URL.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from services.instrumentation import thread_query_totals
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PROFILE_LOG_PATH = Path(os.getenv("CHURNGUARD_PROFILE_LOG", BASE_DIR / ".cache" / "render_profile.jsonl"))
+
+_SESSION_FLAG = "_churnguard_profile"
+_log_lock = threading.Lock()
+
+
+def profiling_enabled() -> bool:
+    """CHURNGUARD_PROFILE=1, or ?profile=1 seen earlier in this session (query params do not survive page switches)"""
+    if os.getenv("CHURNGUARD_PROFILE", "0") == "1":
+        return True
+
+    import streamlit as st
+
+    try:
+        flag = st.query_params.get("profile")
+        if flag is not None:
+            st.session_state[_SESSION_FLAG] = flag not in ("0", "false", "")
+        return bool(st.session_state.get(_SESSION_FLAG, False))
+    except Exception:
+        # not inside a script run (bare mode, imports)
+        return False
+
+
+@dataclass
+class Phase:
+    name: str
+    start_ms: float
+    duration_ms: float = 0.0
+    db_queries: int = 0
+    db_ms: float = 0.0
+    payload_bytes: int = 0
+    messages: int = 0
+
+
+@dataclass
+class RenderProfile:
+    page: str
+    started_at: float
+    phases: List[Phase] = field(default_factory=list)
+    total_ms: float = 0.0
+    payload_bytes: int = 0
+    messages: int = 0
+
+
+class RenderProfiler:
+    """
+    Times named phases of one script run. ForwardMsgs enqueued while a phase is
+    open are attributed to it; anything outside a phase counts toward the total.
+    """
+
+    enabled = True
+
+    def __init__(self, page: str):
+        self.profile = RenderProfile(page=page, started_at=time.time())
+        self._t0 = time.perf_counter()
+        self._current: Optional[Phase] = None
+        self._ctx = None
+        self._original_enqueue = None
+        self._hook_enqueue()
+
+    def _hook_enqueue(self):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is None or not hasattr(ctx, "_enqueue"):
+            return
+        # a run that raised before finish() leaves its hook installed: unwrap it
+        original = getattr(ctx._enqueue, "__wrapped__", ctx._enqueue)
+
+        def counting_enqueue(msg):
+            size = msg.ByteSize()
+            self.profile.payload_bytes += size
+            self.profile.messages += 1
+            if self._current is not None:
+                self._current.payload_bytes += size
+                self._current.messages += 1
+            original(msg)
+
+        counting_enqueue.__wrapped__ = original
+        self._ctx, self._original_enqueue = ctx, original
+        ctx._enqueue = counting_enqueue
+
+    def _unhook_enqueue(self):
+        if self._ctx is not None:
+            self._ctx._enqueue = self._original_enqueue
+            self._ctx = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        db_calls, db_seconds = thread_query_totals()
+        phase = Phase(name=name, start_ms=(started - self._t0) * 1000)
+        parent, self._current = self._current, phase
+        try:
+            yield phase
+        finally:
+            phase.duration_ms = (time.perf_counter() - started) * 1000
+            calls, seconds = thread_query_totals()
+            phase.db_queries = calls - db_calls
+            phase.db_ms = (seconds - db_seconds) * 1000
+            self._current = parent
+            self.profile.phases.append(phase)
+
+    def finish(self):
+        """Stop counting, log the run and draw the sidebar waterfall"""
+        self.profile.total_ms = (time.perf_counter() - self._t0) * 1000
+        self._unhook_enqueue()
+        self.profile.phases.sort(key=lambda p: p.start_ms)
+        write_profile(self.profile)
+        render_waterfall(self.profile)
+
+
+class _NullProfiler:
+    """Stand-in when profiling is off: phases cost a nullcontext"""
+
+    enabled = False
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def finish(self):
+        pass
+
+
+def start_profile(page: str):
+    """Profiler for the current script run (a no-op unless profiling is enabled)"""
+    if not profiling_enabled():
+        return _NullProfiler()
+    return RenderProfiler(Path(page).stem)
+
+
+# ==================== OUTPUT ====================
+
+def write_profile(profile: RenderProfile, path: Path = PROFILE_LOG_PATH):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(asdict(profile), default=str)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"⚠ Could not write render profile: {str(e)}")
+
+
+def render_waterfall(profile: RenderProfile):
+    import pandas as pd
+    import plotly.express as px
+    import streamlit as st
+
+    with st.sidebar.expander(f"⏱ Render profile · {profile.total_ms:,.0f} ms", expanded=True):
+        st.caption(f"{profile.page} · {profile.payload_bytes / 1024:,.1f} KB in {profile.messages} messages")
+        if not profile.phases:
+            return
+
+        df = pd.DataFrame([asdict(p) for p in profile.phases])
+        fig = px.bar(
+            df,
+            x="duration_ms",
+            y="name",
+            base="start_ms",
+            orientation="h",
+            color="db_ms",
+            color_continuous_scale="Reds",
+            hover_data=["db_queries", "payload_bytes"],
+        )
+        fig.update_yaxes(autorange="reversed", title=None)
+        fig.update_layout(height=60 + 32 * len(df), margin=dict(l=0, r=0, t=10, b=0), coloraxis_showscale=False)
+        st.plotly_chart(fig, use_container_width=True)
+
+        df["payload_kb"] = (df["payload_bytes"] / 1024).round(1)
+        st.dataframe(
+            df[["name", "duration_ms", "db_queries", "db_ms", "payload_kb"]].round(1),
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+def load_profiles(path: Path = PROFILE_LOG_PATH) -> List[dict]:
+    """Logged runs, oldest first, for offline analysis"""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    rows = [
+        {"page": run["page"], "phase": phase["name"], "duration_ms": phase["duration_ms"],
+         "db_ms": phase["db_ms"], "payload_bytes": phase["payload_bytes"]}
+        for run in load_profiles()
+        for phase in run["phases"]
+    ]
+    if not rows:
+        print(f"No profiles in {PROFILE_LOG_PATH}")
+    else:
+        summary = pd.DataFrame(rows).groupby(["page", "phase"]).agg(
+            runs=("duration_ms", "size"),
+            p50_ms=("duration_ms", "median"),
+            p95_ms=("duration_ms", lambda s: s.quantile(0.95)),
+            db_ms=("db_ms", "median"),
+            payload_kb=("payload_bytes", lambda s: s.median() / 1024),
+        )
+        print(summary.round(1).to_string())
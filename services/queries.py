@@ -1,51 +1,44 @@
 # queries.py file
+# Page-level views over the shared dashboard snapshot (one mart query per refresh)
 
 import pandas as pd
-from services.db import get_engine
-
-engine = get_engine()
+from services.snapshot import get_dashboard_snapshot
 
 
 def load_kpis():
-    query = """
-    SELECT
-        SUM(total_customers) as total_customers,
-        SUM(churned_customers) as churned,
-        AVG(churn_rate) as churn_rate,
-        AVG(retention_rate) as retention_rate,
-        SUM(total_revenue) as revenue,
-        SUM(revenue_at_risk) as risk
-    FROM mart_retention_kpis;
-    """
-    return pd.read_sql(query, engine)
+    totals = get_dashboard_snapshot().totals
+    return pd.DataFrame([{
+        "total_customers": totals.total_customers,
+        "churned": totals.churned_customers,
+        "churn_rate": totals.churn_rate,
+        "retention_rate": totals.retention_rate,
+        "revenue": totals.total_revenue,
+        "risk": totals.revenue_at_risk,
+    }])
 
 
 def churn_by_region():
-    query = """
-    SELECT region,
-           AVG(churn_rate) as churn_rate
-    FROM mart_retention_kpis
-    GROUP BY region;
-    """
-    return pd.read_sql(query, engine)
+    regions = get_dashboard_snapshot().regions
+    return pd.DataFrame(
+        [{"region": region, "churn_rate": rollup.churn_rate} for region, rollup in regions.items()],
+        columns=["region", "churn_rate"]
+    )
 
 
 def revenue_by_region():
-    query = """
-    SELECT region,
-           SUM(total_revenue) as revenue
-    FROM mart_retention_kpis
-    GROUP BY region;
-    """
-    return pd.read_sql(query, engine)
+    regions = get_dashboard_snapshot().regions
+    return pd.DataFrame(
+        [{"region": region, "revenue": rollup.total_revenue} for region, rollup in regions.items()],
+        columns=["region", "revenue"]
+    )
 
 
 def segment_metrics():
-    query = """
-    SELECT customer_segment,
-           SUM(total_customers) as customers,
-           SUM(revenue_at_risk) as risk
-    FROM mart_retention_kpis
-    GROUP BY customer_segment;
-    """
-    return pd.read_sql(query, engine)
\ No newline at end of file
+    segments = get_dashboard_snapshot().segments
+    return pd.DataFrame(
+        [
+            {"customer_segment": segment, "customers": rollup.total_customers, "risk": rollup.revenue_at_risk}
+            for segment, rollup in segments.items()
+        ],
+        columns=["customer_segment", "customers", "risk"]
+    )
@@ -0,0 +1,201 @@
+"""
+Materialized Rollups for ChurnGuard
+Pre-aggregated materialized views for dashboard charts that would otherwise
+scan a whole fact table per render. Refreshed CONCURRENTLY (readers are never
+blocked) by a scheduled job; fetch functions read a rollup only while it is
+fresh enough and fall back to the live query otherwise.
+
+Schedule after the staging loads, e.g. hourly:
+    python -m services.rollups refresh
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.cache import invalidate
+from services.db import get_db_service
+
+ROLLUP_MAX_STALENESS = float(os.getenv('ROLLUP_MAX_STALENESS', '3600'))
+ROLLUP_STATUS_TTL = 30
+REFRESH_LOG_TABLE = "rollup_refreshes"
+
+
+@dataclass(frozen=True)
+class Rollup:
+    """A materialized view, its unique key (needed for CONCURRENTLY) and the query that reads it"""
+
+    name: str
+    definition: str
+    unique_key: Tuple[str, ...]
+    read_query: str
+    source_tables: Tuple[str, ...]
+    max_staleness: float = ROLLUP_MAX_STALENESS
+
+
+REVENUE_BY_CHANNEL = Rollup(
+    name="mv_revenue_by_channel",
+    definition="""
+    SELECT
+        dc.acquisition_channel,
+        SUM(fb.monthly_charges)::numeric AS channel_revenue,
+        COUNT(*) AS billing_rows
+    FROM stg_billing fb
+    JOIN stg_customers dc ON fb.customer_id = dc.customer_id
+    GROUP BY dc.acquisition_channel
+    """,
+    unique_key=("acquisition_channel",),
+    read_query="""
+    SELECT
+        acquisition_channel,
+        ROUND(channel_revenue, 2) as channel_revenue
+    FROM mv_revenue_by_channel
+    ORDER BY channel_revenue DESC
+    """,
+    source_tables=("stg_billing", "stg_customers"),
+)
+
+ROLLUPS = {rollup.name: rollup for rollup in (REVENUE_BY_CHANNEL,)}
+
+
+# ==================== DDL / REFRESH ====================
+
+def ensure_rollups() -> List[str]:
+    """Create missing materialized views (populated on creation) and the refresh log"""
+    db = get_db_service()
+    created = []
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {REFRESH_LOG_TABLE} (
+                name TEXT PRIMARY KEY,
+                refreshed_at TIMESTAMPTZ NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                row_count BIGINT NOT NULL
+            )
+            """)
+            for rollup in ROLLUPS.values():
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (rollup.name,))
+                if cursor.fetchone()[0]:
+                    continue
+                started = time.perf_counter()
+                cursor.execute(f"CREATE MATERIALIZED VIEW {rollup.name} AS {rollup.definition}")
+                cursor.execute(
+                    f"CREATE UNIQUE INDEX {rollup.name}_key ON {rollup.name} ({', '.join(rollup.unique_key)})"
+                )
+                _log_refresh(cursor, rollup, started)
+                created.append(rollup.name)
+    return created
+
+
+def _log_refresh(cursor, rollup, started):
+    cursor.execute(f"SELECT COUNT(*) FROM {rollup.name}")
+    row_count = cursor.fetchone()[0]
+    cursor.execute(
+        f"""
+        INSERT INTO {REFRESH_LOG_TABLE} (name, refreshed_at, duration_ms, row_count)
+        VALUES (%s, now(), %s, %s)
+        ON CONFLICT (name) DO UPDATE SET
+            refreshed_at = EXCLUDED.refreshed_at,
+            duration_ms = EXCLUDED.duration_ms,
+            row_count = EXCLUDED.row_count
+        """,
+        (rollup.name, int((time.perf_counter() - started) * 1000), row_count)
+    )
+
+
+def refresh_rollup(name: str, concurrently: bool = True) -> float:
+    """
+    Refresh one rollup; with ``concurrently`` dashboard reads keep using the old
+    contents until the new ones are swapped in. Returns the refresh time in seconds.
+    """
+    rollup = ROLLUPS[name]
+    db = get_db_service()
+    started = time.perf_counter()
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            mode = "CONCURRENTLY " if concurrently else ""
+            cursor.execute(f"REFRESH MATERIALIZED VIEW {mode}{rollup.name}")
+            _log_refresh(cursor, rollup, started)
+
+    invalidate(rollup.name, REFRESH_LOG_TABLE)
+    return time.perf_counter() - started
+
+
+def refresh_all(concurrently: bool = True) -> Dict[str, float]:
+    ensure_rollups()
+    return {name: refresh_rollup(name, concurrently) for name in ROLLUPS}
+
+
+# ==================== ROUTING ====================
+
+def rollup_status() -> Dict[str, Dict[str, Any]]:
+    """Age in seconds and row count per rollup, from the refresh log (briefly cached)"""
+    rows = get_db_service().execute_query(
+        f"""
+        SELECT name, EXTRACT(EPOCH FROM now() - refreshed_at) AS age_seconds, duration_ms, row_count
+        FROM {REFRESH_LOG_TABLE}
+        """,
+        cache_ttl=ROLLUP_STATUS_TTL,
+        cache_tags=(REFRESH_LOG_TABLE,)
+    )
+    return {
+        row['name']: {
+            'age_seconds': float(row['age_seconds']),
+            'duration_ms': row['duration_ms'],
+            'row_count': row['row_count'],
+        }
+        for row in rows
+    }
+
+
+_status_unavailable_until = 0.0
+
+
+def fresh_rollup(rollup: Rollup) -> Optional[Rollup]:
+    """``rollup`` if it exists and was refreshed within its max staleness, else None"""
+    global _status_unavailable_until
+    if time.time() < _status_unavailable_until:
+        return None
+    try:
+        status = rollup_status().get(rollup.name)
+    except Exception:
+        # refresh log missing (rollups never built) or unreadable: use the live
+        # query, and do not retry on every render
+        _status_unavailable_until = time.time() + ROLLUP_STATUS_TTL
+        return None
+    if status is None or status['age_seconds'] > rollup.max_staleness:
+        return None
+    return rollup
+
+
+def route_query(rollup: Rollup, live_query: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    (query, cache tags) for a fetch function: the rollup's read query while it is
+    fresh, otherwise the live query over the source tables
+    """
+    if fresh_rollup(rollup) is not None:
+        return rollup.read_query, (rollup.name,)
+    return live_query, rollup.source_tables
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if command == "refresh":
+        ensure_rollups()
+        names = sys.argv[2:] or list(ROLLUPS)
+        for name in names:
+            seconds = refresh_rollup(name)
+            print(f"✓ Refreshed {name} in {seconds:.2f}s")
+    elif command == "status":
+        ensure_rollups()
+        for name, status in rollup_status().items():
+            print(f"{name}: {status['row_count']} rows, {status['age_seconds']:.0f}s old, "
+                  f"last refresh {status['duration_ms']} ms")
+    else:
+        print("Usage: python -m services.rollups [status | refresh [NAME ...]]")
+        sys.exit(1)
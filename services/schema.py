@@ -0,0 +1,270 @@
+"""
+Schema Management for ChurnGuard
+Owns the indexes the dashboard and ML queries rely on. Indexes are built with
+CREATE INDEX CONCURRENTLY (no write locks on the staging/fact tables), failed
+builds are detected and rebuilt, and EXPLAIN-based checks guard the query
+plans against regressions.
+
+    python -m services.schema migrate   # create missing / rebuild invalid indexes
+    python -m services.schema check     # EXPLAIN the dashboard queries
+"""
+
+import json
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services.db import CHURN_REASONS_QUERY, REVENUE_BREAKDOWN_QUERY, get_db_service
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One managed index"""
+
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    include: Tuple[str, ...] = ()
+    where: Optional[str] = None
+    purpose: str = ""
+
+    def ddl(self) -> str:
+        sql = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+        if self.include:
+            sql += f" INCLUDE ({', '.join(self.include)})"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        return sql
+
+
+INDEXES = (
+    # fetch_churn_reasons: only churned rows, grouped by reason
+    IndexSpec(
+        name="idx_stg_churn_reason_churned",
+        table="stg_churn",
+        columns=("churn_reason",),
+        where="churn_flag = '1'",
+        purpose="fetch_churn_reasons",
+    ),
+    # fetch_revenue_breakdown / mv_revenue_by_channel: index-only join inputs
+    IndexSpec(
+        name="idx_stg_billing_customer_charges",
+        table="stg_billing",
+        columns=("customer_id",),
+        include=("monthly_charges",),
+        purpose="fetch_revenue_breakdown",
+    ),
+    IndexSpec(
+        name="idx_stg_customers_customer_channel",
+        table="stg_customers",
+        columns=("customer_id",),
+        include=("acquisition_channel",),
+        purpose="fetch_revenue_breakdown",
+    ),
+    # 01_build_training_dataset.py windows (PARTITION BY customer_id ORDER BY month)
+    # and the feature store's "month > watermark" deltas
+    IndexSpec(
+        name="idx_fact_billing_customer_month",
+        table="fact_billing",
+        columns=("customer_id", "billing_month"),
+        include=("monthly_charges", "total_charges"),
+        purpose="training features",
+    ),
+    IndexSpec(
+        name="idx_fact_billing_month",
+        table="fact_billing",
+        columns=("billing_month",),
+        purpose="feature store deltas",
+    ),
+    IndexSpec(
+        name="idx_fact_support_customer_month",
+        table="fact_support",
+        columns=("customer_id", "month"),
+        include=("tickets_count", "csat_score"),
+        purpose="training features",
+    ),
+    IndexSpec(
+        name="idx_fact_support_month",
+        table="fact_support",
+        columns=("month",),
+        purpose="feature store deltas",
+    ),
+    IndexSpec(
+        name="idx_fact_network_quality_customer_month",
+        table="fact_network_quality",
+        columns=("customer_id", "month"),
+        include=("downtime_minutes", "avg_latency", "packet_loss"),
+        purpose="training features",
+    ),
+    IndexSpec(
+        name="idx_fact_network_quality_month",
+        table="fact_network_quality",
+        columns=("month",),
+        purpose="feature store deltas",
+    ),
+    IndexSpec(
+        name="idx_fact_churn_customer",
+        table="fact_churn",
+        columns=("customer_id",),
+        include=("churn_flag",),
+        purpose="training label",
+    ),
+)
+
+
+# ==================== MIGRATIONS ====================
+
+@contextmanager
+def _autocommit_cursor():
+    """
+    Pooled connection in autocommit mode: CREATE/DROP INDEX CONCURRENTLY cannot
+    run inside a transaction block
+    """
+    with get_db_service().pool.connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                # index builds outlive the dashboard statement timeout
+                cursor.execute("SET statement_timeout = 0")
+                yield cursor
+        finally:
+            if not conn.closed:
+                with conn.cursor() as cursor:
+                    cursor.execute("RESET statement_timeout")
+                conn.autocommit = False
+
+
+def index_state(cursor, spec: IndexSpec) -> str:
+    """'missing-table', 'missing', 'invalid' (failed concurrent build) or 'valid'"""
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (spec.table,))
+    if not cursor.fetchone()[0]:
+        return "missing-table"
+    cursor.execute(
+        """
+        SELECT i.indisvalid
+        FROM pg_class c
+        JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE c.relname = %s AND c.relkind = 'i'
+        """,
+        (spec.name,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return "missing"
+    return "valid" if row[0] else "invalid"
+
+
+def migrate(dry_run: bool = False) -> List[Tuple[str, str]]:
+    """Create missing indexes and rebuild invalid ones. Returns (index, action) pairs."""
+    actions = []
+    with _autocommit_cursor() as cursor:
+        for spec in INDEXES:
+            state = index_state(cursor, spec)
+            if state == "valid":
+                actions.append((spec.name, "exists"))
+                continue
+            if state == "missing-table":
+                actions.append((spec.name, f"skipped ({spec.table} not found)"))
+                continue
+            if dry_run:
+                actions.append((spec.name, f"would {'rebuild' if state == 'invalid' else 'create'}"))
+                continue
+
+            if state == "invalid":
+                # leftover of an interrupted concurrent build: IF NOT EXISTS would keep it
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {spec.name}")
+            cursor.execute(spec.ddl())
+            cursor.execute(f"ANALYZE {spec.table}")
+            actions.append((spec.name, "rebuilt" if state == "invalid" else "created"))
+    return actions
+
+
+# ==================== PLAN CHECKS ====================
+
+@dataclass(frozen=True)
+class PlanCheck:
+    """
+    Expectations for one query's plan. ``expect_indexes`` are checked with
+    sequential scans disabled, i.e. "the index can serve this query", which
+    holds regardless of table size.
+    """
+
+    name: str
+    query: str
+    forbid: Tuple[str, ...] = ("SubPlan", "InitPlan")
+    expect_indexes: Tuple[str, ...] = ()
+
+
+PLAN_CHECKS = (
+    PlanCheck(
+        name="fetch_churn_reasons",
+        query=CHURN_REASONS_QUERY,
+        expect_indexes=("idx_stg_churn_reason_churned",),
+    ),
+    PlanCheck(
+        name="fetch_revenue_breakdown",
+        query=REVENUE_BREAKDOWN_QUERY,
+        expect_indexes=("idx_stg_billing_customer_charges", "idx_stg_customers_customer_channel"),
+    ),
+)
+
+
+def explain(query: str, params: tuple = None, disable_seqscan: bool = False) -> Dict[str, Any]:
+    """EXPLAIN (FORMAT JSON) plan of ``query`` (not executed)"""
+    with get_db_service().get_connection() as conn:
+        with conn.cursor() as cursor:
+            if disable_seqscan:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+            plan = cursor.fetchone()[0]
+        conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def run_plan_checks(checks=PLAN_CHECKS) -> List[str]:
+    """Run every check and return failure messages (empty when all pass)"""
+    failures = []
+    for check in checks:
+        nodes = list(plan_nodes(explain(check.query)))
+        for node in nodes:
+            relationship = node.get("Parent Relationship")
+            if relationship in check.forbid:
+                failures.append(f"{check.name}: plan contains a {relationship} ({node.get('Subplan Name')})")
+
+        if check.expect_indexes:
+            used = {
+                node["Index Name"]
+                for node in plan_nodes(explain(check.query, disable_seqscan=True))
+                if "Index Name" in node
+            }
+            for index in check.expect_indexes:
+                if index not in used:
+                    failures.append(f"{check.name}: {index} not usable (plan uses {sorted(used) or 'no index'})")
+    return failures
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+
+    if command in ("migrate", "status"):
+        for name, action in migrate(dry_run=(command == "status")):
+            print(f"{'✓' if action in ('exists', 'created', 'rebuilt') else '⚠'} {name}: {action}")
+    elif command == "check":
+        failures = run_plan_checks()
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print(f"✓ {len(PLAN_CHECKS)} query plans OK")
+        sys.exit(1 if failures else 0)
+    else:
+        print("Usage: python -m services.schema [migrate | status | check]")
+        sys.exit(1)
@@ -0,0 +1,165 @@
+"""
+Dashboard Snapshot for ChurnGuard
+Totals, per-region and per-segment KPI rollups from one GROUPING SETS query
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from services.cache import tag_generation
+from services.db import get_db_service
+
+SNAPSHOT_TTL_SECONDS = 300
+SNAPSHOT_CACHE_TAG = "mart_retention_kpis"
+
+SNAPSHOT_QUERY = """
+SELECT
+    GROUPING(region) AS grouped_region,
+    GROUPING(customer_segment) AS grouped_segment,
+    region,
+    customer_segment,
+    SUM(total_customers) AS total_customers,
+    SUM(churned_customers) AS churned_customers,
+    AVG(churn_rate) AS churn_rate,
+    AVG(retention_rate) AS retention_rate,
+    SUM(total_revenue) AS total_revenue,
+    SUM(revenue_at_risk) AS revenue_at_risk,
+    AVG(total_revenue / NULLIF(total_customers, 0)) AS avg_revenue
+FROM mart_retention_kpis
+GROUP BY GROUPING SETS ((), (region), (customer_segment))
+"""
+
+
+@dataclass(frozen=True)
+class KpiRollup:
+    """Aggregated KPIs for one grouping (all rows, one region or one segment)"""
+
+    total_customers: int
+    churned_customers: int
+    churn_rate: float
+    retention_rate: float
+    total_revenue: float
+    revenue_at_risk: float
+    avg_revenue: float
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "KpiRollup":
+        return cls(
+            total_customers=int(row['total_customers'] or 0),
+            churned_customers=int(row['churned_customers'] or 0),
+            churn_rate=float(row['churn_rate'] or 0),
+            retention_rate=float(row['retention_rate'] or 0),
+            total_revenue=float(row['total_revenue'] or 0),
+            revenue_at_risk=float(row['revenue_at_risk'] or 0),
+            avg_revenue=float(row['avg_revenue'] or 0),
+        )
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Every KPI rollup the dashboard pages read, fetched in a single round trip"""
+
+    totals: KpiRollup
+    regions: Dict[str, KpiRollup]
+    segments: Dict[str, KpiRollup]
+    fetched_at: float
+    generation: int = 0  # shared-cache generation of mart_retention_kpis when fetched
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def fetch_dashboard_snapshot() -> DashboardSnapshot:
+    """
+    Run the GROUPING SETS query (through the shared result cache, so all worker
+    processes share one result) and split its rows into totals/regions/segments
+    """
+    generation = tag_generation(SNAPSHOT_CACHE_TAG)
+    rows = get_db_service().execute_query(
+        SNAPSHOT_QUERY,
+        cache_ttl=SNAPSHOT_TTL_SECONDS,
+        cache_tags=(SNAPSHOT_CACHE_TAG,)
+    )
+    return snapshot_from_rows(rows, generation)
+
+
+def snapshot_from_rows(rows, generation: int = 0) -> DashboardSnapshot:
+    """Split SNAPSHOT_QUERY rows into totals/regions/segments"""
+    totals = None
+    regions = {}
+    segments = {}
+    for row in rows:
+        rollup = KpiRollup.from_row(row)
+        if row['grouped_region'] and row['grouped_segment']:
+            totals = rollup
+        elif not row['grouped_region']:
+            regions[row['region']] = rollup
+        else:
+            segments[row['customer_segment']] = rollup
+
+    if totals is None:
+        totals = KpiRollup.from_row({key: None for key in KpiRollup.__dataclass_fields__})
+
+    return DashboardSnapshot(
+        totals=totals,
+        regions=regions,
+        segments=segments,
+        fetched_at=time.time(),
+        generation=generation,
+    )
+
+
+# ==================== PROCESS CACHE ====================
+
+_snapshot: Optional[DashboardSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_dashboard_snapshot(max_age: float = SNAPSHOT_TTL_SECONDS) -> DashboardSnapshot:
+    """
+    Return the cached snapshot, refreshing it when older than ``max_age`` seconds
+    or when mart_retention_kpis was invalidated in the shared cache.
+    Concurrent reruns wait for a single refresh instead of each querying the mart.
+    """
+    global _snapshot
+
+    snapshot = cached_dashboard_snapshot(max_age)
+    if snapshot is not None:
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = cached_dashboard_snapshot(max_age)
+        if snapshot is None:
+            snapshot = fetch_dashboard_snapshot()
+            _snapshot = snapshot
+    return snapshot
+
+
+def cached_dashboard_snapshot(max_age: float = SNAPSHOT_TTL_SECONDS) -> Optional[DashboardSnapshot]:
+    """The process snapshot if it is younger than ``max_age`` and not invalidated, else None"""
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.age < max_age
+        and snapshot.generation == tag_generation(SNAPSHOT_CACHE_TAG)
+    ):
+        return snapshot
+    return None
+
+
+def store_dashboard_snapshot(snapshot: DashboardSnapshot) -> DashboardSnapshot:
+    """Publish a snapshot fetched elsewhere (services/async_db.py) as the process snapshot"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def invalidate_dashboard_snapshot():
+    """Drop the cached snapshot so the next read hits the database"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
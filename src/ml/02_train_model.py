@@ -1,13 +1,13 @@
-import pandas as pd
-import numpy as np
+import os
+import sys
 import time
 import joblib
 from pathlib import Path
 
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score, classification_report, f1_score
+from sklearn.metrics import roc_auc_score, classification_report
 
 from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
@@ -16,7 +16,16 @@ from lightgbm import LGBMClassifier
 # CONFIG PATHS (VERY IMPORTANT)
 # =====================================================
 BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_PATH = BASE_DIR / "src/ml/data/ml_training_data.csv"
+sys.path.insert(0, str(BASE_DIR))
+
+from app.src.encoding import CATEGORICAL_COLUMNS, ENCODER_FILE, CategoricalEncoder
+from src.ml.dataset import load_training_frame, resolve_dataset_path
+from src.ml.thresholds import threshold_curve
+from src.ml.training import (
+    StageTimer, as_float32_frame, limit_blas_threads, plan_thread_budget, run_concurrently
+)
+
+DATA_PATH = resolve_dataset_path()  # Parquet from 01, legacy CSV as fallback
 MODEL_DIR = BASE_DIR / "src/ml/models"
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -28,26 +37,26 @@ print("ENSEMBLE CHURN MODEL TRAINING")
 print("=" * 70)
 
 start = time.time()
+timer = StageTimer()
+budget = plan_thread_budget()
+print("Thread budget:", budget)
 
 # =====================================================
 # LOAD DATA
 # =====================================================
 print("Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-
-# remove duplicate ids
-df = df.loc[:, ~df.columns.str.contains(r"customer_id\.")]
+with timer.stage("load dataset"):
+    df = load_training_frame(DATA_PATH)
+print("Source:", DATA_PATH)
 
 # =====================================================
 # ENCODE CATEGORICALS
 # =====================================================
 print("Encoding categorical features...")
-encoders = {}
-
-for col in ["region", "customer_segment"]:
-    le = LabelEncoder()
-    df[col] = le.fit_transform(df[col].astype(str))
-    encoders[col] = le
+# same encoder (and unseen-label policy) is used by evaluation and serving
+encoder = CategoricalEncoder.fit(df, CATEGORICAL_COLUMNS)
+df = encoder.transform(df)
+print(encoder)
 
 df = df.fillna(0)
 
@@ -55,8 +64,10 @@ df = df.fillna(0)
 # FEATURES
 # =====================================================
 print("Preparing features...")
-X = df.drop(columns=["customer_id", "churn_flag"])
+# one float32 matrix shared by every model (no per-model float64 copies)
+X = as_float32_frame(df.drop(columns=["customer_id", "churn_flag"]))
 y = df["churn_flag"]
+del df
 
 # ⭐⭐⭐ SAVE FEATURE NAMES (CRITICAL FOR PREDICTION)
 joblib.dump(list(X.columns), MODEL_DIR / "feature_names.pkl")
@@ -66,9 +77,11 @@ print("Feature names saved")
 scale_pos_weight = (y == 0).sum() / (y == 1).sum()
 
 # split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, stratify=y, random_state=42
-)
+with timer.stage("split"):
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, stratify=y, random_state=42
+    )
+del X
 
 print("Train shape:", X_train.shape)
 print("Test shape:", X_test.shape)
@@ -76,8 +89,6 @@ print("Test shape:", X_test.shape)
 # =====================================================
 # MODEL 1 — XGBOOST
 # =====================================================
-print("Training XGBoost...")
-
 xgb = XGBClassifier(
     n_estimators=800,
     max_depth=6,
@@ -86,16 +97,14 @@ xgb = XGBClassifier(
     colsample_bytree=0.85,
     scale_pos_weight=scale_pos_weight,
     eval_metric="logloss",
+    tree_method="hist",
     random_state=42,
-    n_jobs=-1
+    n_jobs=budget.xgb
 )
-xgb.fit(X_train, y_train)
 
 # =====================================================
 # MODEL 2 — LIGHTGBM
 # =====================================================
-print("Training LightGBM...")
-
 lgb = LGBMClassifier(
     n_estimators=800,
     learning_rate=0.03,
@@ -103,21 +112,42 @@ lgb = LGBMClassifier(
     subsample=0.85,
     colsample_bytree=0.85,
     class_weight="balanced",
-    random_state=42
+    random_state=42,
+    n_jobs=budget.lgb,
+    verbose=-1
 )
-lgb.fit(X_train, y_train)
 
 # =====================================================
 # MODEL 3 — LOGISTIC REGRESSION
 # =====================================================
-print("Training Logistic Regression...")
-
 scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
 lr = LogisticRegression(max_iter=1000, class_weight="balanced")
-lr.fit(X_train_scaled, y_train)
+
+
+def fit_logistic_regression():
+    lr.fit(scaler.fit_transform(X_train), y_train)
+    return lr
+
+
+# =====================================================
+# TRAIN (CONCURRENTLY WHEN THE BUDGET ALLOWS)
+# =====================================================
+print("Training XGBoost, LightGBM and Logistic Regression...")
+
+# the BLAS cap is process-wide, so it spans the whole concurrent section; only
+# logistic regression uses BLAS (the boosters run their own OpenMP pools)
+with timer.stage("train ensemble (wall)"), limit_blas_threads(budget.lr):
+    run_concurrently(
+        {
+            "XGBoost": lambda: xgb.fit(X_train, y_train),
+            "LightGBM": lambda: lgb.fit(X_train, y_train),
+            "LogisticRegression": fit_logistic_regression,
+        },
+        timer,
+        workers=budget.workers,
+    )
+
+X_test_scaled = scaler.transform(X_test)
 
 # =====================================================
 # ENSEMBLE PREDICTION
@@ -137,15 +167,22 @@ ensemble_prob = (
 # =====================================================
 # THRESHOLD OPTIMIZATION
 # =====================================================
-best_threshold = 0.5
-best_f1 = 0
+# one sort + cumulative sums over every distinct score; "net_value" weighs each
+# caught churner by their monthly charges minus CHURN_CONTACT_COST per flagged customer
+THRESHOLD_METRIC = os.getenv("CHURN_THRESHOLD_METRIC", "f1")
+CONTACT_COST = float(os.getenv("CHURN_CONTACT_COST", "0"))
+
+with timer.stage("threshold search"):
+    curve = threshold_curve(
+        y_test,
+        ensemble_prob,
+        value=X_test["avg_monthly_charges"].to_numpy(),
+        contact_cost=CONTACT_COST,
+    )
+    best_threshold, best_score = curve.best(THRESHOLD_METRIC)
 
-for t in np.arange(0.1, 0.9, 0.01):
-    preds = (ensemble_prob > t).astype(int)
-    score = f1_score(y_test, preds)
-    if score > best_f1:
-        best_f1 = score
-        best_threshold = t
+best_f1 = float(curve.f1[curve.thresholds == best_threshold][0])
+print(f"Threshold search: {len(curve.thresholds)} candidates, best {THRESHOLD_METRIC} = {best_score:.4f}")
 
 # =====================================================
 # FINAL METRICS
@@ -169,13 +206,15 @@ joblib.dump(xgb, MODEL_DIR / "xgb_model.pkl")
 joblib.dump(lgb, MODEL_DIR / "lgb_model.pkl")
 joblib.dump(lr, MODEL_DIR / "lr_model.pkl")
 joblib.dump(scaler, MODEL_DIR / "scaler.pkl")
-joblib.dump(encoders, MODEL_DIR / "label_encoders.pkl")
+joblib.dump(encoder, MODEL_DIR / ENCODER_FILE)
 joblib.dump(best_threshold, MODEL_DIR / "threshold.pkl")
+joblib.dump(curve.to_frame(), MODEL_DIR / "threshold_curve.pkl")
 
 print("Models saved to:", MODEL_DIR)
 
 # =====================================================
 # END
 # =====================================================
+timer.report()
 print("Time:", round(time.time() - start, 2), "seconds")
 print("=" * 70)
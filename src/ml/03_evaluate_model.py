@@ -1,6 +1,20 @@
-import pandas as pd
+import argparse
+import sys
 import joblib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
 from sklearn.metrics import roc_auc_score, classification_report, f1_score
+from app.src.encoding import load_encoder
+from src.ml.dataset import CHUNK_SIZE, iter_training_batches, load_training_frame
+from src.ml.streaming_metrics import StreamingEvaluator
+
+parser = argparse.ArgumentParser(description="Evaluate the churn ensemble")
+parser.add_argument("--streaming", action="store_true",
+                    help="score the dataset chunk by chunk with fixed memory")
+parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+args = parser.parse_args()
 
 print("=" * 60)
 print("EVALUATING ENSEMBLE MODEL")
@@ -13,45 +27,59 @@ xgb = joblib.load("models/xgb_model.pkl")
 lgb = joblib.load("models/lgb_model.pkl")
 lr = joblib.load("models/lr_model.pkl")
 scaler = joblib.load("models/scaler.pkl")
-encoders = joblib.load("models/label_encoders.pkl")
+encoder = load_encoder("models")
 threshold = joblib.load("models/threshold.pkl")
 
+
 # --------------------------------------------------
-# LOAD DATA
+# ENSEMBLE PREDICTION
 # --------------------------------------------------
-df = pd.read_csv("data/ml_training_data.csv")
+def score(df):
+    """Encode, fill and score one frame; returns (labels, ensemble probabilities)"""
+    # unseen labels get the same code as in serving
+    df = encoder.transform(df)
+
+    df = df.fillna(0)
 
-# remove duplicate id columns if present
-df = df.loc[:, ~df.columns.str.contains(r"customer_id\.")]
+    X = df.drop(columns=["customer_id", "churn_flag"])
+    y = df["churn_flag"]
 
-# encode categoricals
-for col, encoder in encoders.items():
-    df[col] = encoder.transform(df[col].astype(str))
+    # scale for logistic regression
+    X_scaled = scaler.transform(X)
+
+    xgb_prob = xgb.predict_proba(X)[:, 1]
+    lgb_prob = lgb.predict_proba(X)[:, 1]
+    lr_prob = lr.predict_proba(X_scaled)[:, 1]
+
+    ensemble_prob = (
+        0.4 * xgb_prob +
+        0.4 * lgb_prob +
+        0.2 * lr_prob
+    )
+    return y, ensemble_prob
 
-df = df.fillna(0)
 
 # --------------------------------------------------
-# FEATURES
+# STREAMING MODE
 # --------------------------------------------------
-X = df.drop(columns=["customer_id", "churn_flag"])
-y = df["churn_flag"]
+if args.streaming:
+    evaluator = StreamingEvaluator(threshold)
+
+    for chunk in iter_training_batches(batch_size=args.chunk_size):
+        evaluator.update(*score(chunk))
 
-# scale for logistic regression
-X_scaled = scaler.transform(X)
+    print("\nRESULTS (streaming)")
+    print("-" * 40)
+    evaluator.report()
+    sys.exit(0)
 
 # --------------------------------------------------
-# ENSEMBLE PREDICTION
+# LOAD DATA
 # --------------------------------------------------
-xgb_prob = xgb.predict_proba(X)[:, 1]
-lgb_prob = lgb.predict_proba(X)[:, 1]
-lr_prob = lr.predict_proba(X_scaled)[:, 1]
-
-ensemble_prob = (
-    0.4 * xgb_prob +
-    0.4 * lgb_prob +
-    0.2 * lr_prob
-)
+# Parquet from 01 (legacy CSV fallback), duplicate id columns already dropped
+df = load_training_frame()
 
+y, ensemble_prob = score(df)
 preds = (ensemble_prob > threshold).astype(int)
 
 # --------------------------------------------------
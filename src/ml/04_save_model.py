@@ -1,14 +1,23 @@
+import sys
+from pathlib import Path
+
 import joblib
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.src.encoding import load_encoder
+
 bundle = {
     "xgb": joblib.load("models/xgb_model.pkl"),
     "lgb": joblib.load("models/lgb_model.pkl"),
     "lr": joblib.load("models/lr_model.pkl"),
     "scaler": joblib.load("models/scaler.pkl"),
-    "encoders": joblib.load("models/label_encoders.pkl"),
-    "threshold": joblib.load("models/threshold.pkl")
+    "encoder": load_encoder("models"),
+    "threshold": joblib.load("models/threshold.pkl"),
+    "feature_names": joblib.load("models/feature_names.pkl")
 }
 
-joblib.dump(bundle, "models/churn_ensemble_bundle.pkl")
+# uncompressed so app/src/registry.py can memory-map the numeric arrays
+joblib.dump(bundle, "models/churn_ensemble_bundle.pkl", compress=0)
 
 print("Ensemble bundle saved")
@@ -1,41 +1,49 @@
-import pd
+import argparse
+import json
+import sys
+from pathlib import Path
 
+import numpy as np
 
-def predict_churn(input_dict):
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-    df = pd.DataFrame([input_dict])
+from app.src.predict import encode_row, predict_churn_batch, risk_band
+from app.src.registry import load_model_bundle
+from src.ml.dataset import load_training_frame
 
-    # SAFE categorical encoding
-    for col, encoder in encoders.items():
-        value = str(df[col].iloc[0])
+# same artifacts 03/04 read (run from src/ml); the bundle file is preferred
+MODEL_DIR = "models"
 
-        if value in encoder.classes_:
-            df[col] = encoder.transform([value])[0]
-        else:
-            df[col] = -1   # unseen category fallback
 
-    df = df.fillna(0)
+def predict_churn(input_dict, bundle):
+    """
+    Score one customer with the saved ensemble. Encoding goes through the
+    bundle's CategoricalEncoder (app/src/encoding.py): unseen categories and
+    missing values are handled exactly as in training, evaluation and serving.
+    """
+    X = encode_row(input_dict, bundle)[np.newaxis, :]
+    prob, pred = predict_churn_batch(X, bundle=bundle)
+    ensemble_prob = float(prob[0])
 
-    df_scaled = scaler.transform(df)
+    return {
+        "churn_probability": round(ensemble_prob, 4),
+        "prediction": int(pred[0]),
+        "risk_level": risk_band(ensemble_prob)
+    }
 
-    xgb_prob = xgb.predict_proba(df)[:, 1]
-    lgb_prob = lgb.predict_proba(df)[:, 1]
-    lr_prob = lr.predict_proba(df_scaled)[:, 1]
 
-    ensemble_prob = (
-        0.4 * xgb_prob +
-        0.4 * lgb_prob +
-        0.2 * lr_prob
-    )[0]
+if __name__ == "__main__":
 
-    churn_prediction = int(ensemble_prob > threshold)
+    parser = argparse.ArgumentParser(description="Score one customer (JSON) with the saved ensemble")
+    parser.add_argument("features", nargs="?", help="customer features as JSON (default: first dataset row)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
 
-    return {
-        "churn_probability": float(round(ensemble_prob, 4)),
-        "prediction": churn_prediction,
-        "risk_level": (
-            "HIGH" if ensemble_prob > 0.7 else
-            "MEDIUM" if ensemble_prob > 0.4 else
-            "LOW"
-        )
-    }
+    bundle = load_model_bundle(args.model_dir)
+
+    if args.features:
+        customer = json.loads(args.features)
+    else:
+        customer = load_training_frame().drop(columns=["customer_id", "churn_flag"]).iloc[0].to_dict()
+
+    print(json.dumps(predict_churn(customer, bundle), indent=2))
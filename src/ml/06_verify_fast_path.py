@@ -0,0 +1,129 @@
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from app.src.fast_trees import compile_ensemble
+from app.src.registry import MODEL_DIR, load_model_bundle
+
+# =====================================================
+# CONFIG
+# =====================================================
+TOLERANCE = 1e-5
+N_ROWS = 5000
+BATCH_SIZES = [1, 8, 64, 1000]
+REPEATS = 50
+
+
+# =====================================================
+# SAMPLE DATA
+# =====================================================
+def sample_features(bundle, n_rows, seed=42):
+    """Random rows shaped like the training data (scaler mean/std, valid category codes)"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(bundle.scaler.mean_, bundle.scaler.scale_, size=(n_rows, len(bundle.feature_names)))
+
+    for col in bundle.encoder.columns:
+        i = bundle.feature_names.index(col)
+        X[:, i] = rng.integers(0, bundle.encoder.n_classes(col), n_rows)
+
+    # exercise the missing-value / zero branches of the splits
+    X[: n_rows // 50, rng.integers(0, X.shape[1])] = np.nan
+    X[n_rows // 50: n_rows // 25, rng.integers(0, X.shape[1])] = 0.0
+    return X
+
+
+# =====================================================
+# REFERENCE (LIBRARY WRAPPERS)
+# =====================================================
+def reference_components(bundle, X):
+    df = pd.DataFrame(X, columns=bundle.feature_names)
+    scaled = bundle.scaler.transform(df.fillna(0))
+    return (
+        bundle.xgb.predict_proba(df)[:, 1],
+        bundle.lgb.predict_proba(df)[:, 1],
+        bundle.lr.predict_proba(scaled)[:, 1],
+    )
+
+
+def reference_proba(bundle, X):
+    xgb_prob, lgb_prob, lr_prob = reference_components(bundle, X)
+    return 0.4 * xgb_prob + 0.4 * lgb_prob + 0.2 * lr_prob
+
+
+# =====================================================
+# TIMING
+# =====================================================
+def median_latency_ms(fn, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+# =====================================================
+# MAIN
+# =====================================================
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Parity check and latency benchmark for the fast-path predictor")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--rows", type=int, default=N_ROWS)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FAST-PATH PREDICTOR: PARITY + LATENCY")
+    print("=" * 60)
+
+    bundle = load_model_bundle(args.model_dir)
+
+    start = time.time()
+    compiled = compile_ensemble(bundle)
+    print("Compiled in:", round(time.time() - start, 3), "seconds")
+    print("XGBoost trees:", compiled.xgb.n_trees, "| max depth:", compiled.xgb.max_depth)
+    print("LightGBM trees:", compiled.lgb.n_trees, "| max depth:", compiled.lgb.max_depth)
+
+    # -------------------------------------------------
+    # PARITY
+    # -------------------------------------------------
+    X = sample_features(bundle, args.rows)
+    X_lr = np.nan_to_num(X)
+
+    ref = reference_components(bundle, X)
+    fast = (
+        compiled.xgb.predict_proba(X),
+        compiled.lgb.predict_proba(X),
+        compiled.predict_components(X_lr)[2],
+    )
+
+    print("\nPARITY (max |fast - reference|)")
+    print("-" * 40)
+    failed = False
+    for name, ref_prob, fast_prob in zip(["xgb", "lgb", "lr"], ref, fast):
+        diff = float(np.max(np.abs(ref_prob - fast_prob)))
+        ok = diff <= args.tolerance
+        failed |= not ok
+        print(f"{name:<10}{diff:.3e}  {'OK' if ok else 'FAIL'}")
+
+    # -------------------------------------------------
+    # LATENCY
+    # -------------------------------------------------
+    print("\nLATENCY (median ms per call)")
+    print("-" * 40)
+    print(f"{'rows':>6}{'wrappers':>12}{'fast path':>12}{'speedup':>10}")
+    for batch_size in BATCH_SIZES:
+        batch = X_lr[:batch_size]
+        ref_ms = median_latency_ms(lambda b: reference_proba(bundle, b), batch, REPEATS)
+        fast_ms = median_latency_ms(compiled.predict_proba, batch, REPEATS)
+        print(f"{batch_size:>6}{ref_ms:>12.3f}{fast_ms:>12.3f}{ref_ms / fast_ms:>9.1f}x")
+
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
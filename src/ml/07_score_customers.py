@@ -0,0 +1,242 @@
+import argparse
+import importlib
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from app.src.predict import predict_churn_batch, risk_band
+from app.src.registry import MODEL_DIR, load_model_bundle
+from app.src.scoring_pool import ProcessScoringPool, fork_available
+from services.cache import invalidate
+from services.engines import get_engine
+from src.ml.dataset import iter_query_frames
+from src.ml.feature_store import FEATURE_VIEW
+
+# =====================================================
+# CONFIG
+# =====================================================
+CHUNK_SIZE = 50_000
+WORKERS = os.cpu_count() or 1
+
+# a run staging fewer rows than this share of churn_scores (a truncated view,
+# a failing source) merges its scores but leaves the other rows in place
+PRUNE_MIN_FRACTION = float(os.getenv("CHURN_PRUNE_MIN_FRACTION", "0.5"))
+
+SCORES_TABLE = "churn_scores"
+SCORE_COLUMNS = [
+    "customer_id",
+    "churn_probability",
+    "churn_prediction",
+    "risk_band",
+    "monthly_revenue",
+    "model_version",
+]
+
+# customer_id takes its type from dim_customers
+CREATE_SCORES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCORES_TABLE} AS
+SELECT
+    customer_id,
+    0::DOUBLE PRECISION AS churn_probability,
+    0::SMALLINT AS churn_prediction,
+    ''::TEXT AS risk_band,
+    0::NUMERIC AS monthly_revenue,
+    ''::TEXT AS model_version,
+    now() AS scored_at
+FROM dim_customers
+WITH NO DATA;
+
+CREATE UNIQUE INDEX IF NOT EXISTS {SCORES_TABLE}_customer_id ON {SCORES_TABLE} (customer_id);
+CREATE INDEX IF NOT EXISTS {SCORES_TABLE}_risk_band ON {SCORES_TABLE} (risk_band);
+"""
+
+# the run is staged in a temp table and merged (and pruned) in one transaction, so readers
+# see either the previous scores or the complete new set
+STAGE_SQL = f"""
+CREATE TEMP TABLE {SCORES_TABLE}_stage
+    (LIKE {SCORES_TABLE} INCLUDING DEFAULTS)
+    ON COMMIT DROP
+"""
+
+MERGE_SQL = f"""
+INSERT INTO {SCORES_TABLE} ({", ".join(SCORE_COLUMNS)}, scored_at)
+SELECT {", ".join(SCORE_COLUMNS)}, now()
+FROM {SCORES_TABLE}_stage
+ON CONFLICT (customer_id) DO UPDATE SET
+    churn_probability = EXCLUDED.churn_probability,
+    churn_prediction = EXCLUDED.churn_prediction,
+    risk_band = EXCLUDED.risk_band,
+    monthly_revenue = EXCLUDED.monthly_revenue,
+    model_version = EXCLUDED.model_version,
+    scored_at = EXCLUDED.scored_at
+"""
+
+# customers missing from this run would otherwise keep the previous model's
+# scores, leaving churn_scores with mixed model versions
+PRUNE_SQL = f"""
+DELETE FROM {SCORES_TABLE} s
+WHERE NOT EXISTS (
+    SELECT 1 FROM {SCORES_TABLE}_stage t WHERE t.customer_id = s.customer_id
+)
+"""
+
+
+# =====================================================
+# SCORING
+# =====================================================
+def scored_frame(df, prob, pred, bundle):
+    return pd.DataFrame({
+        "customer_id": df["customer_id"].to_numpy(),
+        "churn_probability": prob,
+        "churn_prediction": pred,
+        "risk_band": risk_band(prob),
+        "monthly_revenue": df["avg_monthly_charges"].to_numpy(),
+        "model_version": bundle.version,
+    })
+
+
+def score_chunk(df, bundle):
+    prob, pred = predict_churn_batch(df, bundle=bundle)
+    return scored_frame(df, prob, pred, bundle)
+
+
+def score_chunks(chunks, bundle, workers):
+    """
+    Score chunks on a thread pool (the boosters release the GIL), keeping at
+    most 2 x workers chunks in flight so memory stays bounded.
+    Yields scored frames in input order.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="score") as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(score_chunk, chunk, bundle))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def score_chunks_processes(chunks, bundle, workers, chunk_size):
+    """
+    Score chunks on forked worker processes sharing the loaded bundle
+    (app/src/scoring_pool.py); features and probabilities go through shared
+    memory. Yields scored frames in input order.
+    """
+    with ProcessScoringPool(bundle, workers=workers, slot_rows=chunk_size) as pool:
+        for chunk, prob, pred in pool.predict(chunks):
+            yield scored_frame(chunk, prob, pred, bundle)
+
+
+def copy_frame(cursor, df, table):
+    buffer = io.StringIO()
+    df.to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def feature_query(source):
+    if source == "feature-store":
+        return f"SELECT * FROM {FEATURE_VIEW}"
+    # same features the model was trained on
+    return importlib.import_module("src.ml.01_build_training_dataset").QUERY
+
+
+# =====================================================
+# MAIN
+# =====================================================
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Score every customer and bulk-load churn_scores")
+    parser.add_argument("--source", choices=["query", "feature-store"], default="query",
+                        help="full feature query or the incremental ml_customer_features view")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--force-prune", action="store_true",
+                        help=f"prune even when the run scored fewer than {PRUNE_MIN_FRACTION:.0%} of the stored customers")
+    parser.add_argument("--engine", choices=["auto", "processes", "threads"], default="auto",
+                        help="worker processes (fork, shared memory) or threads; auto uses processes "
+                             "when there is more than one worker")
+    args = parser.parse_args()
+
+    engine_name = args.engine
+    if engine_name == "auto":
+        engine_name = "processes" if args.workers > 1 and fork_available() else "threads"
+    elif engine_name == "processes" and not fork_available():
+        print("⚠ fork is not available on this platform, scoring on threads")
+        engine_name = "threads"
+
+    print("=" * 60)
+    print("BULK CHURN SCORING")
+    print("=" * 60)
+
+    start = time.time()
+    engine = get_engine()
+    bundle = load_model_bundle(args.model_dir)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(CREATE_SCORES_SQL)
+
+    chunks = iter_query_frames(engine, feature_query(args.source), args.chunk_size)
+    if engine_name == "processes":
+        scored_chunks = score_chunks_processes(chunks, bundle, args.workers, args.chunk_size)
+    else:
+        scored_chunks = score_chunks(chunks, bundle, args.workers)
+    print(f"Scoring on {args.workers} {engine_name[:-1] if args.workers == 1 else engine_name}")
+
+    rows = 0
+    pruned = 0
+    bands = {}
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.execute(STAGE_SQL)
+
+            for scored in scored_chunks:
+                copy_frame(cursor, scored, f"{SCORES_TABLE}_stage")
+                rows += len(scored)
+                for band, count in scored["risk_band"].value_counts().items():
+                    bands[band] = bands.get(band, 0) + int(count)
+                print(f"  scored {rows:,} customers ({time.time() - start:.1f}s)")
+
+            if rows == 0:
+                raise RuntimeError("No customers were scored; churn_scores left unchanged")
+
+            cursor.execute(f"SELECT COUNT(*) FROM {SCORES_TABLE}")
+            existing = cursor.fetchone()[0]
+
+            cursor.execute(MERGE_SQL)
+            if args.force_prune or rows >= PRUNE_MIN_FRACTION * existing:
+                cursor.execute(PRUNE_SQL)
+                pruned = cursor.rowcount
+            else:
+                print(f"⚠ Scored {rows:,} of {existing:,} stored customers (below {PRUNE_MIN_FRACTION:.0%}); "
+                      "stale scores kept, rerun with --force-prune to remove them")
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    # dashboard reads of churn_scores go through the shared result cache
+    invalidate(SCORES_TABLE)
+
+    print("\nModel version:", bundle.version)
+    print("Customers scored:", rows)
+    print("Stale scores removed:", pruned)
+    for band in ["HIGH", "MEDIUM", "LOW"]:
+        print(f"  {band:<8}{bands.get(band, 0):>10,}")
+    print("Saved →", SCORES_TABLE)
+    print("Time:", round(time.time() - start, 2), "seconds")
+    print("=" * 60)
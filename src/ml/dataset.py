@@ -0,0 +1,153 @@
+"""
+Training Dataset I/O for ChurnGuard
+Streams the feature query out of Postgres in chunks and writes it as a typed,
+compressed Parquet file one row group at a time, so peak memory is bounded by
+the chunk size rather than the customer count. Readers fall back to the legacy CSV.
+"""
+
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+PARQUET_PATH = DATA_DIR / "ml_training_data.parquet"
+CSV_PATH = DATA_DIR / "ml_training_data.csv"
+
+CHUNK_SIZE = 50_000
+COMPRESSION = "zstd"
+LABEL_COLUMN = "churn_flag"
+
+
+# =====================================================
+# STREAMING EXPORT
+# =====================================================
+def _is_numeric(values):
+    sample = next((v for v in values if v is not None), None)
+    return sample is None or isinstance(sample, (Decimal, int, float))
+
+
+def _clean_chunk(rows, columns, string_columns):
+    df = pd.DataFrame.from_records(rows, columns=columns)
+
+    # b.* / s.* / n.* repeat customer_id; keep the first occurrence
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    for col in df.columns:
+        if col == "customer_id":
+            continue
+        if col in string_columns:
+            df[col] = df[col].fillna("0").astype(str)  # same as the CSV export's fillna(0)
+        elif col == LABEL_COLUMN:
+            df[col] = pd.to_numeric(df[col]).fillna(0).astype("int8")
+        else:
+            # NUMERIC arrives as Decimal; float64 keeps the CSV's precision
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64").fillna(0.0)
+    return df
+
+
+def iter_query_frames(engine, query, chunk_size=CHUNK_SIZE):
+    """
+    Yield cleaned DataFrames of at most ``chunk_size`` rows, read through a
+    server-side cursor so the full result never sits in client memory.
+    """
+    with engine.connect() as conn:
+        # the feature build is a long batch query; lift the dashboard statement timeout
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(text(query))
+        columns = list(result.keys())
+
+        string_columns = None
+        for rows in result.partitions(chunk_size):
+            if string_columns is None:
+                # decided on the first chunk so every row group shares one schema
+                string_columns = {
+                    col for i, col in enumerate(columns)
+                    if col != "customer_id" and not _is_numeric(row[i] for row in rows)
+                }
+            yield _clean_chunk(rows, columns, string_columns)
+
+
+def export_parquet(engine, query, path=PARQUET_PATH, chunk_size=CHUNK_SIZE, compression=COMPRESSION):
+    """
+    Stream ``query`` into a Parquet file, one row group per chunk.
+    Written to a temp file and renamed, so readers never see a partial dataset.
+    Returns (rows, columns).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+
+    writer = None
+    rows = 0
+    n_columns = 0
+    try:
+        for df in iter_query_frames(engine, query, chunk_size):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(tmp, schema, compression=compression)
+                n_columns = len(schema)
+            writer.write_table(table.cast(schema), row_group_size=chunk_size)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError("Feature query returned no rows")
+
+    tmp.replace(path)
+    return rows, n_columns
+
+
+def export_csv(engine, query, path=CSV_PATH, chunk_size=CHUNK_SIZE):
+    """Legacy CSV export, appended chunk by chunk. Returns (rows, columns)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    n_columns = 0
+    for i, df in enumerate(iter_query_frames(engine, query, chunk_size)):
+        df.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(df)
+        n_columns = len(df.columns)
+    return rows, n_columns
+
+
+# =====================================================
+# READERS
+# =====================================================
+def resolve_dataset_path(path=None):
+    """The Parquet dataset if it exists, otherwise the legacy CSV"""
+    if path is not None:
+        return Path(path)
+    return PARQUET_PATH if PARQUET_PATH.exists() else CSV_PATH
+
+
+def _drop_duplicate_ids(df):
+    # pandas renames repeated CSV headers to customer_id.1, customer_id.2, ...
+    return df.loc[:, ~df.columns.str.contains(r"customer_id\.")]
+
+
+def load_training_frame(path=None, columns=None):
+    """Load the whole training dataset (Parquet, or CSV fallback)"""
+    path = resolve_dataset_path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    return _drop_duplicate_ids(pd.read_csv(path, usecols=columns))
+
+
+def iter_training_batches(path=None, batch_size=CHUNK_SIZE, columns=None):
+    """Yield the training dataset as DataFrames of at most ``batch_size`` rows"""
+    path = resolve_dataset_path(path)
+    if path.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for df in pd.read_csv(path, usecols=columns, chunksize=batch_size):
+            yield _drop_duplicate_ids(df)
@@ -0,0 +1,122 @@
+"""
+Streaming Evaluation Metrics for ChurnGuard
+Accumulates the confusion matrix, a score histogram for ROC-AUC and
+calibration bins chunk by chunk, so evaluating any number of customers
+needs a fixed amount of memory
+"""
+
+import numpy as np
+import pandas as pd
+
+AUC_BINS = 10_000
+CALIBRATION_BINS = 10
+
+
+class StreamingEvaluator:
+    """
+    Feed (labels, probabilities) chunks with update(); read metrics at any time.
+
+    ROC-AUC comes from per-class histograms over [0, 1]: scores sharing a bin
+    count as ties, so with 10k bins the error is far below reporting precision.
+    """
+
+    def __init__(self, threshold, auc_bins=AUC_BINS, calibration_bins=CALIBRATION_BINS):
+        self.threshold = float(threshold)
+        self.auc_bins = auc_bins
+        self.calibration_bins = calibration_bins
+
+        self.tp = self.fp = self.tn = self.fn = 0
+        self.pos_hist = np.zeros(auc_bins, dtype=np.int64)
+        self.neg_hist = np.zeros(auc_bins, dtype=np.int64)
+
+        self.cal_count = np.zeros(calibration_bins, dtype=np.int64)
+        self.cal_prob_sum = np.zeros(calibration_bins)
+        self.cal_label_sum = np.zeros(calibration_bins)
+        self.brier_sum = 0.0
+
+    @staticmethod
+    def _bin(prob, n_bins):
+        return np.minimum((prob * n_bins).astype(np.int64), n_bins - 1)
+
+    def update(self, y_true, prob):
+        y = np.asarray(y_true).astype(bool).ravel()
+        prob = np.clip(np.asarray(prob, dtype=np.float64).ravel(), 0.0, 1.0)
+
+        # same rule as the in-memory evaluation: churn when prob > threshold
+        pred = prob > self.threshold
+        self.tp += int(np.count_nonzero(pred & y))
+        self.fp += int(np.count_nonzero(pred & ~y))
+        self.fn += int(np.count_nonzero(~pred & y))
+        self.tn += int(np.count_nonzero(~pred & ~y))
+
+        bins = self._bin(prob, self.auc_bins)
+        self.pos_hist += np.bincount(bins[y], minlength=self.auc_bins)
+        self.neg_hist += np.bincount(bins[~y], minlength=self.auc_bins)
+
+        cal = self._bin(prob, self.calibration_bins)
+        self.cal_count += np.bincount(cal, minlength=self.calibration_bins)
+        self.cal_prob_sum += np.bincount(cal, weights=prob, minlength=self.calibration_bins)
+        self.cal_label_sum += np.bincount(cal, weights=y, minlength=self.calibration_bins)
+        self.brier_sum += float(np.sum((prob - y) ** 2))
+
+    # -------------------------------------------------
+    # METRICS
+    # -------------------------------------------------
+    @property
+    def n(self):
+        return self.tp + self.fp + self.tn + self.fn
+
+    def roc_auc(self):
+        n_pos, n_neg = self.pos_hist.sum(), self.neg_hist.sum()
+        if n_pos == 0 or n_neg == 0:
+            return float("nan")
+        # negatives strictly below each bin, plus half of the ties inside it
+        neg_below = np.cumsum(self.neg_hist) - self.neg_hist
+        pairs = np.sum(self.pos_hist * (neg_below + 0.5 * self.neg_hist))
+        return float(pairs / (n_pos * n_neg))
+
+    def precision(self):
+        return self.tp / max(self.tp + self.fp, 1)
+
+    def recall(self):
+        return self.tp / max(self.tp + self.fn, 1)
+
+    def f1(self):
+        return 2 * self.tp / max(2 * self.tp + self.fp + self.fn, 1)
+
+    def accuracy(self):
+        return (self.tp + self.tn) / max(self.n, 1)
+
+    def brier_score(self):
+        return self.brier_sum / max(self.n, 1)
+
+    def confusion_matrix(self):
+        """sklearn layout: [[tn, fp], [fn, tp]]"""
+        return np.array([[self.tn, self.fp], [self.fn, self.tp]])
+
+    def calibration_table(self) -> pd.DataFrame:
+        edges = np.linspace(0, 1, self.calibration_bins + 1)
+        count = np.maximum(self.cal_count, 1)
+        table = pd.DataFrame({
+            "bin": [f"{lo:.1f}-{hi:.1f}" for lo, hi in zip(edges[:-1], edges[1:])],
+            "customers": self.cal_count,
+            "mean_predicted": self.cal_prob_sum / count,
+            "observed_churn": self.cal_label_sum / count,
+        })
+        return table[table["customers"] > 0].reset_index(drop=True)
+
+    def report(self):
+        print("ROC-AUC:", round(self.roc_auc(), 4))
+        print("F1:", round(self.f1(), 4))
+        print("Precision:", round(self.precision(), 4))
+        print("Recall:", round(self.recall(), 4))
+        print("Accuracy:", round(self.accuracy(), 4))
+        print("Brier score:", round(self.brier_score(), 4))
+        print("Threshold:", self.threshold)
+        print("Customers scored:", self.n)
+
+        print("\nConfusion Matrix [[TN, FP], [FN, TP]]:\n")
+        print(self.confusion_matrix())
+
+        print("\nCalibration:\n")
+        print(self.calibration_table().to_string(index=False))
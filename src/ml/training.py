@@ -0,0 +1,123 @@
+"""
+Training Orchestrator for ChurnGuard
+Runs the ensemble members concurrently on one shared float32 feature matrix,
+with an explicit thread budget per model so the box is used fully but never
+oversubscribed, and reports wall time and peak RSS for every stage.
+"""
+
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+
+# =====================================================
+# THREAD BUDGET
+# =====================================================
+@dataclass(frozen=True)
+class ThreadBudget:
+    """Threads per model and how many models may train at once"""
+
+    xgb: int
+    lgb: int
+    lr: int
+    workers: int
+
+
+def plan_thread_budget(total=None) -> ThreadBudget:
+    """
+    Split ``total`` cores (CHURN_TRAIN_THREADS, default all) between the models.
+    The boosters share the cores while logistic regression, which is mostly
+    single-threaded BLAS work, gets one. Below four cores the models run one
+    after another, each with every core.
+    """
+    total = int(total or os.getenv("CHURN_TRAIN_THREADS") or os.cpu_count() or 1)
+
+    if total < 4:
+        return ThreadBudget(xgb=total, lgb=total, lr=min(total, 2), workers=1)
+
+    boosters = total - 1
+    return ThreadBudget(xgb=(boosters + 1) // 2, lgb=boosters // 2, lr=1, workers=3)
+
+
+# =====================================================
+# SHARED MATRIX
+# =====================================================
+def as_float32_frame(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    One contiguous float32 block wrapped in a DataFrame (feature names kept).
+    XGBoost and LightGBM both read it in place, so the only per-model data is
+    their own quantized bins.
+    """
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    return pd.DataFrame(values, columns=X.columns, index=X.index, copy=False)
+
+
+# =====================================================
+# STAGE TIMING
+# =====================================================
+def peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class StageTimer:
+    """Collects (stage, wall seconds, peak RSS MB) rows"""
+
+    stages: List[tuple] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start, peak_rss_mb()))
+
+    def report(self):
+        print("\nSTAGE TIMINGS")
+        print("-" * 50)
+        print(f"{'stage':<28}{'wall (s)':>10}{'peak RSS (MB)':>14}")
+        for name, seconds, rss in self.stages:
+            print(f"{name:<28}{seconds:>10.2f}{rss:>14.0f}")
+
+
+# =====================================================
+# CONCURRENT FITS
+# =====================================================
+def run_concurrently(jobs: Dict[str, Callable], timer: StageTimer, workers: int) -> Dict:
+    """
+    Run the named fit jobs on ``workers`` threads (XGBoost, LightGBM and the
+    BLAS / liblinear kernels release the GIL). Each job is timed as its own stage.
+    Returns {name: job result}; the first failure is re-raised.
+    """
+    def timed(name, job):
+        with timer.stage(f"fit {name}"):
+            return job()
+
+    if workers <= 1:
+        return {name: timed(name, job) for name, job in jobs.items()}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="train") as pool:
+        futures = {name: pool.submit(timed, name, job) for name, job in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def limit_blas_threads(n):
+    """
+    Cap BLAS threads (numpy / scipy) for the duration of a block. The limit is
+    process-wide, not per thread: set it once around the whole concurrent
+    section (the boosters use OpenMP, which it leaves alone), never inside a
+    single job while other jobs are running.
+    """
+    return threadpool_limits(limits=n, user_api="blas")